@@ -0,0 +1 @@
+print('Hello world 2.0!')
@@ -0,0 +1,108 @@
+"""
+Streaming downloads of database records, as CSV or NDJSON files.
+
+Large tables (such as access logs) are not loaded into memory: rows
+are read from the database in chunks (using a server-side cursor,
+where the database supports it) and written to the client as they
+are produced.
+"""
+
+import csv
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, StreamingHttpResponse
+
+# Content type and file name extension of each export format
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+# Approximate number of characters sent to the client at once
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+
+class _Echo:
+    """
+    Pseudo-file that returns the data written to it, so that
+    csv.writer can be used to format individual lines.
+    """
+    def write(self, value):
+        return value
+
+
+def iterate_queryset(queryset, chunk_size=None):
+    """
+    Iterate over the objects in a queryset without caching them.
+
+    Objects are fetched chunk_size (default: EXPORT_CHUNK_SIZE) at a
+    time, and any prefetch_related lookups are performed once for
+    each chunk.
+    """
+    return queryset.iterator(chunk_size=chunk_size or settings.EXPORT_CHUNK_SIZE)
+
+
+def csv_lines(headers, rows):
+    """
+    Yield the lines of a CSV file.
+
+    >>> list(csv_lines(['Name', 'Count'], [['a,b', 1]]))
+    ['Name,Count\\r\\n', '"a,b",1\\r\\n']
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def ndjson_lines(headers, rows):
+    """
+    Yield the lines of a newline-delimited JSON file, in which each
+    row is an object whose keys are the column headers.
+
+    >>> list(ndjson_lines(['Name', 'Count'], [['a,b', 1]]))
+    ['{"Name": "a,b", "Count": 1}\\n']
+    """
+    for row in rows:
+        yield json.dumps(dict(zip(headers, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+def _buffered(lines, size=EXPORT_BUFFER_SIZE):
+    buffer = []
+    length = 0
+    for line in lines:
+        buffer.append(line)
+        length += len(line)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def export_response(request, filename, headers, rows):
+    """
+    Return a streaming response for downloading a table.
+
+    The format is chosen by the 'format' query parameter ('csv', the
+    default, or 'ndjson').  filename is the name of the downloaded
+    file, without an extension.  headers is the list of column names,
+    and rows is an iterable of lists of values (which is consumed
+    while the response is being sent.)
+    """
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        raise Http404()
+    content_type, extension = EXPORT_FORMATS[export_format]
+
+    if export_format == 'ndjson':
+        lines = ndjson_lines(headers, rows)
+    else:
+        lines = csv_lines(headers, rows)
+
+    response = StreamingHttpResponse(_buffered(lines), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{extension}"'
+    return response
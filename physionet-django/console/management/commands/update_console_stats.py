@@ -0,0 +1,19 @@
+"""
+Command to:
+- Recompute the editorial, credentialing and submission statistics
+  shown in the console
+"""
+
+from django.core.management.base import BaseCommand
+
+from console.stats import update_all_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the statistics tables shown in the console'
+
+    def handle(self, *args, **options):
+        update_all_stats()
+
+        if options['verbosity'] >= 1:
+            self.stdout.write('Updated console statistics.')
@@ -0,0 +1,68 @@
+# Generated by Django 4.1.13 on 2026-10-18 03:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CredentialingStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField(unique=True)),
+                ('applications', models.PositiveIntegerField(default=0)),
+                ('accepted', models.PositiveIntegerField(default=0)),
+                ('rejected', models.PositiveIntegerField(default=0)),
+                ('median_days_to_reference', models.FloatField(null=True)),
+                ('median_days_to_reply', models.FloatField(null=True)),
+                ('median_days_to_decision', models.FloatField(null=True)),
+                ('update_datetime', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ('year',),
+                'default_permissions': (),
+            },
+        ),
+        migrations.CreateModel(
+            name='EditorialStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField(unique=True)),
+                ('published', models.PositiveIntegerField(default=0)),
+                ('median_days_to_editor', models.FloatField(null=True)),
+                ('median_days_to_publish', models.FloatField(null=True)),
+                ('update_datetime', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ('year',),
+                'default_permissions': (),
+            },
+        ),
+        migrations.CreateModel(
+            name='SubmissionStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('created', models.PositiveIntegerField(default=0)),
+                ('submitted', models.PositiveIntegerField(default=0)),
+                ('resubmitted', models.PositiveIntegerField(default=0)),
+                ('published', models.PositiveIntegerField(default=0)),
+                ('update_datetime', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ('year', 'month'),
+                'default_permissions': (),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='submissionstats',
+            constraint=models.UniqueConstraint(fields=('year', 'month'), name='unique submission stats month'),
+        ),
+    ]
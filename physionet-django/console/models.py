@@ -1,3 +1,77 @@
 from django.db import models
 
-# Create your models here.
+
+class EditorialStats(models.Model):
+    """
+    Summary of the non-legacy projects published in a given year.
+
+    Rows are computed by console.stats.update_editorial_stats.
+    """
+    year = models.PositiveSmallIntegerField(unique=True)
+    published = models.PositiveIntegerField(default=0)
+    # Median days from submission to editor assignment, and from
+    # submission to publication
+    median_days_to_editor = models.FloatField(null=True)
+    median_days_to_publish = models.FloatField(null=True)
+    update_datetime = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        default_permissions = ()
+        ordering = ('year',)
+
+
+class CredentialingStats(models.Model):
+    """
+    Summary of the credentialing applications submitted in a given
+    year.
+
+    Rows are computed by console.stats.update_credentialing_stats.
+    """
+    year = models.PositiveSmallIntegerField(unique=True)
+    applications = models.PositiveIntegerField(default=0)
+    accepted = models.PositiveIntegerField(default=0)
+    rejected = models.PositiveIntegerField(default=0)
+    # Median days from application to contacting the reference, from
+    # contacting the reference to their response, and from
+    # application to decision
+    median_days_to_reference = models.FloatField(null=True)
+    median_days_to_reply = models.FloatField(null=True)
+    median_days_to_decision = models.FloatField(null=True)
+    update_datetime = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        default_permissions = ()
+        ordering = ('year',)
+
+    @property
+    def processed(self):
+        return self.accepted + self.rejected
+
+    @property
+    def approved_percent(self):
+        if not self.processed:
+            return None
+        return round(100 * self.accepted / self.processed)
+
+
+class SubmissionStats(models.Model):
+    """
+    Number of projects created, submitted and published in a given
+    month.
+
+    Rows are computed by console.stats.update_submission_stats.
+    """
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    created = models.PositiveIntegerField(default=0)
+    submitted = models.PositiveIntegerField(default=0)
+    resubmitted = models.PositiveIntegerField(default=0)
+    published = models.PositiveIntegerField(default=0)
+    update_datetime = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        default_permissions = ()
+        ordering = ('year', 'month')
+        constraints = [
+            models.UniqueConstraint(fields=['year', 'month'], name='unique submission stats month')
+        ]
@@ -0,0 +1,189 @@
+"""
+Summary statistics shown in the console.
+
+The editorial, credentialing and submission statistics require
+scanning every project, edit log and credentialing application, so
+they are computed in advance (by the update_console_stats command,
+which is run nightly) and stored in the EditorialStats,
+CredentialingStats and SubmissionStats tables.  The console views
+only read those tables.
+
+Records are grouped by year (and month) in UTC.  Medians are computed
+by the database where it supports them (PostgreSQL), and otherwise
+in Python.
+"""
+
+import collections
+import datetime
+import statistics
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.db.models import Aggregate, Count, DurationField, F, FloatField, Q
+from django.db.models.functions import Cast, ExtractDay, ExtractMonth, ExtractYear
+
+from console.models import CredentialingStats, EditorialStats, SubmissionStats
+from project.models import ActiveProject, EditLog, PublishedProject
+from user.models import CredentialApplication
+
+_UTC = datetime.timezone.utc
+
+
+class Median(Aggregate):
+    """
+    Median of a numeric expression (PostgreSQL only.)
+    """
+    function = 'PERCENTILE_CONT'
+    name = 'Median'
+    template = '%(function)s(0.5) WITHIN GROUP (ORDER BY %(expressions)s)'
+    output_field = FloatField()
+
+
+def count_by_year(queryset, field):
+    """
+    Return a dictionary mapping each year to the number of records
+    whose datetime field falls within that year.
+    """
+    rows = (
+        queryset.order_by()
+        .annotate(stats_year=ExtractYear(field, tzinfo=_UTC))
+        .values('stats_year')
+        .annotate(n=Count('pk'))
+        .values_list('stats_year', 'n')
+    )
+    return dict(rows)
+
+
+def count_by_month(queryset, field):
+    """
+    Return a Counter mapping each (year, month) to the number of
+    records whose datetime field falls within that month.
+    """
+    rows = (
+        queryset.order_by()
+        .annotate(stats_year=ExtractYear(field, tzinfo=_UTC), stats_month=ExtractMonth(field, tzinfo=_UTC))
+        .values('stats_year', 'stats_month')
+        .annotate(n=Count('pk'))
+        .values_list('stats_year', 'stats_month', 'n')
+    )
+    return collections.Counter({(year, month): n for year, month, n in rows})
+
+
+def median_days_by_year(queryset, year_field, start_field, end_field):
+    """
+    Return a dictionary mapping each year (of year_field) to the
+    median number of whole days between start_field and end_field.
+
+    Records where either field is null, or where end_field is before
+    start_field, are ignored.
+    """
+    queryset = queryset.order_by().annotate(
+        stats_year=ExtractYear(year_field, tzinfo=_UTC),
+        duration=Cast(F(end_field) - F(start_field), DurationField()),
+    ).filter(duration__gte=datetime.timedelta(0))
+
+    if connection.vendor == 'postgresql':
+        rows = (
+            queryset.annotate(days=ExtractDay('duration'))
+            .values('stats_year')
+            .annotate(median=Median('days'))
+            .values_list('stats_year', 'median')
+        )
+        return dict(rows)
+
+    days = collections.defaultdict(list)
+    for year, duration in queryset.values_list('stats_year', 'duration'):
+        days[year].append(duration.days)
+    return {year: statistics.median(values) for year, values in days.items()}
+
+
+def _replace_rows(model, rows):
+    with transaction.atomic():
+        model.objects.all().delete()
+        model.objects.bulk_create(rows)
+
+
+def update_editorial_stats():
+    """
+    Recompute the EditorialStats table.
+    """
+    # Only non-legacy projects have the required dates (editor
+    # assignment, submission date, etc.)
+    projects = PublishedProject.objects.filter(is_legacy=False)
+    published = count_by_year(projects, 'publish_datetime')
+    to_editor = median_days_by_year(projects, 'publish_datetime', 'submission_datetime',
+                                    'editor_assignment_datetime')
+    to_publish = median_days_by_year(projects, 'publish_datetime', 'submission_datetime', 'publish_datetime')
+
+    _replace_rows(EditorialStats, [
+        EditorialStats(year=year, published=count, median_days_to_editor=to_editor.get(year),
+                       median_days_to_publish=to_publish.get(year))
+        for year, count in published.items()
+    ])
+
+
+def update_credentialing_stats():
+    """
+    Recompute the CredentialingStats table.
+    """
+    apps = CredentialApplication.objects.all()
+    counts = (
+        apps.order_by()
+        .annotate(stats_year=ExtractYear('application_datetime', tzinfo=_UTC))
+        .values('stats_year')
+        .annotate(
+            applications=Count('pk'),
+            accepted=Count('pk', filter=Q(status=CredentialApplication.Status.ACCEPTED)),
+            rejected=Count('pk', filter=Q(status=CredentialApplication.Status.REJECTED)),
+        )
+    )
+    to_reference = median_days_by_year(apps, 'application_datetime', 'application_datetime',
+                                       'reference_contact_datetime')
+    to_reply = median_days_by_year(apps, 'application_datetime', 'reference_contact_datetime',
+                                   'reference_response_datetime')
+    to_decision = median_days_by_year(apps, 'application_datetime', 'application_datetime', 'decision_datetime')
+
+    _replace_rows(CredentialingStats, [
+        CredentialingStats(year=row['stats_year'], applications=row['applications'],
+                           accepted=row['accepted'], rejected=row['rejected'],
+                           median_days_to_reference=to_reference.get(row['stats_year']),
+                           median_days_to_reply=to_reply.get(row['stats_year']),
+                           median_days_to_decision=to_decision.get(row['stats_year']))
+        for row in counts
+    ])
+
+
+def update_submission_stats():
+    """
+    Recompute the SubmissionStats table.
+    """
+    published = PublishedProject.objects.filter(is_legacy=False)
+    active = ActiveProject.objects.all()
+
+    created = count_by_month(published, 'creation_datetime') + count_by_month(active, 'creation_datetime')
+    publications = count_by_month(published, 'publish_datetime')
+
+    # Submissions of the projects above, recorded in their edit logs
+    edit_logs = EditLog.objects.filter(
+        Q(content_type=ContentType.objects.get_for_model(PublishedProject), object_id__in=published.values('id'))
+        | Q(content_type=ContentType.objects.get_for_model(ActiveProject), object_id__in=active.values('id'))
+    )
+    submissions = count_by_month(edit_logs.filter(is_resubmission=False), 'submission_datetime')
+    resubmissions = count_by_month(edit_logs.filter(is_resubmission=True), 'submission_datetime')
+
+    months = sorted(set(created) | set(publications) | set(submissions) | set(resubmissions))
+    _replace_rows(SubmissionStats, [
+        SubmissionStats(year=year, month=month, created=created[year, month],
+                        submitted=submissions[year, month], resubmitted=resubmissions[year, month],
+                        published=publications[year, month])
+        for year, month in months
+    ])
+
+
+def update_all_stats():
+    """
+    Recompute all of the console statistics tables.
+    """
+    update_editorial_stats()
+    update_credentialing_stats()
+    update_submission_stats()
@@ -1,18 +1,25 @@
+import csv
+import io
 import json
 import logging
 import os
 import pdb
+from statistics import median
 
 
 import requests_mock
 from background_task.tasks import tasks
+from console.models import EditorialStats, SubmissionStats
+from console.stats import update_all_stats
 from django.test.utils import get_runner
 from django.urls import reverse
 from events.models import EventAgreement
 from project.models import (
+    AccessLog,
     ActiveProject,
     Author,
     AuthorInvitation,
+    DUASignature,
     License,
     PublishedProject,
     StorageRequest,
@@ -810,3 +817,85 @@ def test_event_agreement_new_version_invalid_version(self):
 
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'console/event_agreement_new_version.html')
+
+
+class TestDownloads(TestMixin):
+    """
+    Test the streaming downloads of access records.
+    """
+    def setUp(self):
+        super().setUp()
+        self.client.login(username='admin', password='Tester11!')
+        self.project = PublishedProject.objects.get(slug='demoeicu', version='2.0.0')
+        self.user = User.objects.get(username='aewj')
+        DUASignature.objects.create(project=self.project, user=self.user)
+        AccessLog.objects.create(project=self.project, user=self.user, data='/files/demoeicu/2.0.0/')
+
+    def download(self, name, *args, **params):
+        response = self.client.get(reverse(name, args=args), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_credentialed_users(self):
+        response, content = self.download('download_credentialed_users')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="credentialed_users.csv"')
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0][2], 'E-mail')
+        # Each user appears once, however many DUAs they have signed
+        emails = [row[2] for row in rows[1:]]
+        self.assertEqual(emails.count(self.user.email), 1)
+        self.assertEqual(len(emails), len(set(emails)))
+
+        response, content = self.download('download_credentialed_users', format='ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(sorted(r['E-mail'] for r in records), sorted(emails))
+        user_record = next(r for r in records if r['E-mail'] == self.user.email)
+        self.assertIsNotNone(user_record['eICU approval date'])
+
+    def test_access_logs(self):
+        _, content = self.download('download_project_accesses', self.project.id)
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0], ['User', 'Email address', 'First access', 'Last access', 'Duration', 'Count'])
+        self.assertEqual([row[1] for row in rows[1:]], [self.user.email])
+
+        _, content = self.download('download_user_accesses', self.user.id, format='ndjson')
+        records = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([r['Project name'] for r in records], [str(self.project)])
+
+        response = self.client.get(reverse('download_user_accesses', args=(self.user.id,)), {'format': 'xml'})
+        self.assertEqual(response.status_code, 404)
+
+
+class TestStats(TestMixin):
+    """
+    Test the precomputed console statistics.
+    """
+    def test_editorial_stats(self):
+        update_all_stats()
+        projects = PublishedProject.objects.filter(is_legacy=False)
+        for row in EditorialStats.objects.all():
+            year_projects = [p for p in projects if p.publish_datetime.year == row.year]
+            self.assertEqual(row.published, len(year_projects))
+            days = [(p.publish_datetime - p.submission_datetime).days for p in year_projects]
+            self.assertEqual(row.median_days_to_publish, median(d for d in days if d >= 0))
+        self.assertEqual(sum(EditorialStats.objects.values_list('published', flat=True)), projects.count())
+
+    def test_stats_views(self):
+        self.client.login(username='admin', password='Tester11!')
+        for view in ('editorial_stats', 'credentialing_stats', 'submission_stats'):
+            response = self.client.get(reverse(view))
+            self.assertEqual(response.status_code, 200)
+        self.assertTrue(EditorialStats.objects.exists())
+
+        # Later requests only read the precomputed tables
+        SubmissionStats.objects.all().delete()
+        SubmissionStats.objects.create(year=2000, month=1, created=1)
+        self.client.get(reverse('submission_stats'))
+        self.assertEqual(SubmissionStats.objects.count(), 1)
+
+        update_all_stats()
+        created = sum(SubmissionStats.objects.values_list('created', flat=True))
+        self.assertEqual(created, PublishedProject.objects.filter(is_legacy=False).count()
+                         + ActiveProject.objects.count())
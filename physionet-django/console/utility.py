@@ -13,6 +13,7 @@
 from django.contrib.sites.models import Site
 from django.conf import settings
 from django.urls import reverse
+from project import pagecache
 from project.validators import validate_doi
 
 import logging
@@ -389,6 +390,8 @@ def register_doi(payload, project):
        ]
     }
     """
+    from project.models import CoreProject, PublishedProject
+
     headers = {'Content-Type': 'application/vnd.api+json'}
     request_url = settings.DATACITE_API_URL
 
@@ -425,6 +428,18 @@ def register_doi(payload, project):
         queryset = type(project).objects.filter(id=project.id, doi='PENDING')
         queryset.update(doi=doi)
 
+        # update() does not send signals, so discard the cached pages
+        # that show the DOI
+        if isinstance(project, CoreProject):
+            pagecache.invalidate_project_pages(project.id)
+        else:
+            pagecache.invalidate_project_pages(project.core_project_id)
+
+    # The version DOI is shown in the project's citations
+    if isinstance(project, PublishedProject):
+        project.doi = doi
+        project.update_citations()
+
 
 def update_doi(doi, payload):
     """
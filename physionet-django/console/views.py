@@ -1,10 +1,8 @@
-import csv
 import logging
 import os
 from collections import OrderedDict
 from datetime import datetime
 from itertools import chain
-from statistics import StatisticsError, median
 
 import notification.utility as notification
 from background_task import background
@@ -17,11 +15,10 @@
 from django.contrib.contenttypes.forms import generic_inlineformset_factory
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.redirects.models import Redirect
-from django.db.models import Count, DurationField, F, Q
-from django.db.models.functions import Cast
+from django.db.models import Count, F, Min, Prefetch, Q
 from django.forms import Select, Textarea, modelformset_factory
 from django.forms.models import model_to_dict
-from django.http import Http404, HttpResponse, JsonResponse, HttpResponseRedirect
+from django.http import Http404, JsonResponse, HttpResponseRedirect
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
@@ -44,7 +41,6 @@
     DataAccess,
     DUA,
     DataAccessRequest,
-    DUASignature,
     EditLog,
     License,
     Publication,
@@ -72,7 +68,8 @@
     CloudInformation
 )
 from physionet.enums import LogCategory
-from console import forms, utility, services
+from console import exports, forms, stats, utility, services
+from console.models import CredentialingStats, EditorialStats, SubmissionStats
 from console.forms import ProjectFilterForm, UserFilterForm
 from project.cloud.s3 import (
     create_s3_bucket,
@@ -1021,6 +1018,7 @@ def manage_published_project(request, project_slug, version):
                                                               data=request.POST)
             if legacy_author_form.is_valid():
                 legacy_author_form.save()
+                project.update_citations()
                 legacy_author_form = forms.CreateLegacyAuthorForm(project=project)
 
     data_access = DataAccess.objects.filter(project=project)
@@ -2084,42 +2082,12 @@ def editorial_stats(request):
     """
     Editorial stats for reviewers.
     """
-    # We only want the non-legacy projects since they contain the required
-    # dates (editor assignment, submission date, etc.)
-    projects = PublishedProject.objects.filter(is_legacy=False)
-    years = [i.publish_datetime.year for i in projects]
-    stats = OrderedDict()
-
-    # Number published
-    for y in sorted(set(years)):
-        stats[y] = [years.count(y)]
-
-    # Submission to editor assigned
-    sub_ed = projects.annotate(tm=Cast(F('editor_assignment_datetime') - F('submission_datetime'),
-                               DurationField())).values_list('tm', flat=True)
-
-    for y in stats:
-        y_durations = sub_ed.filter(publish_datetime__year=y)
-        days = [d.days for d in y_durations if d.days >= 0]
-        try:
-            stats[y].append(median(days))
-        except StatisticsError:
-            stats[y].append(None)
-
-    # Submission to publication
-    sub_pub = projects.annotate(tm=Cast(F('publish_datetime') - F('submission_datetime'),
-                                DurationField())).values_list('tm', flat=True)
-
-    for y in stats:
-        y_durations = sub_pub.filter(publish_datetime__year=y)
-        days = [d.days for d in y_durations if d.days >= 0]
-        try:
-            stats[y].append(median(days))
-        except StatisticsError:
-            stats[y].append(None)
+    if not EditorialStats.objects.exists():
+        stats.update_editorial_stats()
+    rows = EditorialStats.objects.all()
 
     return render(request, 'console/editorial_stats.html', {
-                  'submenu': 'editorial', 'stats': stats})
+                  'submenu': 'editorial', 'stats': rows})
 
 
 @console_permission_required('project.can_view_stats')
@@ -2127,119 +2095,50 @@ def credentialing_stats(request):
     """
     Credentialing metrics.
     """
-    apps = CredentialApplication.objects.all()
-    years = [a.application_datetime.year for a in apps]
-    stats = OrderedDict()
-
-    # Application count by year
-    for y in sorted(set(years)):
-        stats[y] = {}
-        stats[y]['count'] = years.count(y)
-
-    # Number processed (accepted or rejected) and proportion approved
-    for y in stats:
-        # accepted = 2. rejected = 1.
-        acc_and_rej = apps.filter(application_datetime__year=y)
-        a = acc_and_rej.filter(status=CredentialApplication.Status.ACCEPTED).count()
-        r = acc_and_rej.filter(status=CredentialApplication.Status.REJECTED).count()
-        stats[y]['processed'] = a + r
-        try:
-            stats[y]['approved'] = round((100 * a) / (a + r))
-        except ZeroDivisionError:
-            stats[y]['approved'] = None
-
-    # Time taken to contact the reference
-    time_to_ref = apps.annotate(tm=Cast(F('reference_contact_datetime')
-                                - F('application_datetime'),
-                                DurationField())).values_list('tm', flat=True)
-    for y in stats:
-        durations = time_to_ref.filter(application_datetime__year=y)
-        try:
-            days = [d.days for d in durations if d and d.days >= 0]
-            stats[y]['time_to_ref'] = median(days)
-        except (AttributeError, StatisticsError):
-            stats[y]['time_to_ref'] = None
-
-    # Time taken for the reference to respond
-    time_to_reply = apps.annotate(tm=Cast(F('reference_response_datetime')
-                                  - F('reference_contact_datetime'),
-                                  DurationField())).values_list('tm', flat=True)
-    for y in stats:
-        durations = time_to_reply.filter(application_datetime__year=y)
-        try:
-            days = [d.days for d in durations if d and d.days >= 0]
-            stats[y]['time_to_reply'] = median(days)
-        except (AttributeError, StatisticsError):
-            stats[y]['time_to_reply'] = None
-
-    # Time taken to process the application
-    time_to_decision = apps.annotate(tm=Cast(F('decision_datetime')
-                                     - F('application_datetime'),
-                                     DurationField())).values_list('tm', flat=True)
-    for y in stats:
-        durations = time_to_decision.filter(application_datetime__year=y)
-        try:
-            days = [d.days for d in durations if d and d.days >= 0]
-            stats[y]['time_to_decision'] = median(days)
-        except (AttributeError, StatisticsError):
-            stats[y]['time_to_decision'] = None
+    if not CredentialingStats.objects.exists():
+        stats.update_credentialing_stats()
+    rows = CredentialingStats.objects.all()
 
     return render(request, 'console/credentialing_stats.html',
                   {'submenu': 'credential',
-                   'stats': stats})
+                   'stats': rows})
 
 
 @console_permission_required('project.can_view_stats')
 def submission_stats(request):
-    stats = OrderedDict()
+    if not SubmissionStats.objects.exists():
+        stats.update_submission_stats()
+
+    table = OrderedDict()
     todays_date = datetime.today()
-    all_projects = [PublishedProject.objects.filter(is_legacy=False), ActiveProject.objects.all()]
     cur_year = todays_date.year
     cur_month = todays_date.month
 
     # Get last 18 months and initialize all counts to zero
+    months = []
     for i in range(0, 18):
-        if cur_year not in stats:
-            stats[cur_year] = OrderedDict()
+        if cur_year not in table:
+            table[cur_year] = OrderedDict()
         month = datetime(cur_year, cur_month, 1).strftime("%B")
-        stats[cur_year][month] = [0, 0, 0, 0]
+        table[cur_year][month] = [0, 0, 0, 0]
+        months.append((cur_year, cur_month, month))
         cur_month -= 1
         if cur_month == 0:
             cur_month = 12
             cur_year -= 1
 
-    # Get all active and published projects and store their milestone datetimes
-    for project_set in all_projects:
-
-        # Get times when projects were created
-        for project in project_set:
-            create_yr = project.creation_datetime.year
-            create_mo = project.creation_datetime.strftime("%B")
-            if create_yr in stats and create_mo in stats[create_yr]:
-                stats[create_yr][create_mo][0] += 1
-
-            # Get times when projects were submitted and count unique submissions vs. resubmissions
-            edit_logs = project.edit_log_history()
-            for log in edit_logs:
-                sub_date_yr = log.submission_datetime.year
-                sub_date_mo = log.submission_datetime.strftime("%B")
-                if sub_date_yr in stats and sub_date_mo in stats[sub_date_yr]:
-                    if log.is_resubmission:
-                        stats[sub_date_yr][sub_date_mo][2] += 1
-                    else:
-                        stats[sub_date_yr][sub_date_mo][1] += 1
-
-            # Get times when projects were published, if applicable
-            try:
-                pub_yr = project.publish_datetime.year
-                pub_mo = project.publish_datetime.strftime("%B")
-                if pub_yr in stats and pub_mo in stats[pub_yr]:
-                    stats[pub_yr][pub_mo][3] += 1
-            except AttributeError:
-                pass
+    counts = {
+        (row.year, row.month): row
+        for row in SubmissionStats.objects.filter(year__gte=months[-1][0], year__lte=months[0][0])
+    }
+    for year, month_number, month in months:
+        row = counts.get((year, month_number))
+        if row:
+            table[year][month] = [row.created, row.submitted, row.resubmitted, row.published]
+    updated = max((row.update_datetime for row in counts.values()), default=None)
 
     return render(request, 'console/submission_stats.html',
-                  {'submenu': 'submission', 'stats': stats})
+                  {'submenu': 'submission', 'stats': table, 'updated': updated})
 
 
 @console_permission_required('project.can_view_access_logs')
@@ -2247,10 +2146,7 @@ def download_credentialed_users(request):
     """
     CSV create and download for database access.
     """
-    # Create the HttpResponse object with the appropriate CSV header.
-    project_access = DUASignature.objects.filter(project__access_policy=AccessPolicy.CREDENTIALED)
-    added = []
-    dua_info_csv = [[
+    headers = [
         'First name',
         'Last name',
         'E-mail',
@@ -2259,49 +2155,47 @@ def download_credentialed_users(request):
         'MIMIC approval date',
         'eICU approval date',
         'General research area for which the data will be used'
-    ]]
-    for person in project_access:
-        application = person.user.credential_applications.last()
-        mimic_signature_date = eicu_signature_date = None
-        if 'mimic' in person.project.slug:
-            mimic_signature_date = person.sign_datetime
-        elif 'eicu' in person.project.slug:
-            eicu_signature_date = person.sign_datetime
-        if person.user.id in added:
-            for indx, item in enumerate(dua_info_csv):
-                if item[2] == person.user.email and item[5] == None:
-                    dua_info_csv[indx][5] = mimic_signature_date
-                elif item[2] == person.user.email and item[6] == None:
-                    dua_info_csv[indx][6] = eicu_signature_date
-        else:
-            if application:
-                dua_info_csv.append([person.user.profile.first_names,
-                                     person.user.profile.last_name, person.user.email,
-                                     application.organization_name, application.country,
-                                     mimic_signature_date, eicu_signature_date,
-                                     application.research_summary])
-                added.append(person.user.id)
-            else:
-                legacy = LegacyCredential.objects.filter(migrated_user_id=person.user.id)
-                if legacy:
-                    legacy = legacy.get()
-                    dua_info_csv.append([person.user.profile.first_names,
-                                         person.user.profile.last_name, person.user.email,
-                                         'Legacy User', legacy.country,
-                                         legacy.mimic_approval_date, legacy.eicu_approval_date,
-                                         legacy.info])
-                    added.append(person.user.id)
-                else:
-                    LOGGER.info("Failed locating information of user {}".format(
-                        person.user.id))
+    ]
 
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="credentialed_users.csv"'
-    writer = csv.writer(response)
-    for item in dua_info_csv:
-        writer.writerow(item)
+    # One row for each user who has signed the DUA of a credentialed
+    # project, with the earliest MIMIC and eICU signature dates
+    signature_date = F('dua_signatures__sign_datetime')
+    users = (
+        User.objects.filter(dua_signatures__project__access_policy=AccessPolicy.CREDENTIALED)
+        .annotate(
+            first_signature=Min(signature_date),
+            mimic_signature_date=Min(signature_date, filter=Q(dua_signatures__project__slug__contains='mimic')),
+            eicu_signature_date=Min(signature_date, filter=Q(dua_signatures__project__slug__contains='eicu')
+                                    & ~Q(dua_signatures__project__slug__contains='mimic')),
+        )
+        .order_by('first_signature', 'id')
+        .select_related('profile')
+        .prefetch_related(
+            Prefetch('credential_applications', to_attr='applications',
+                     queryset=CredentialApplication.objects.order_by('id').only(
+                         'user', 'organization_name', 'country', 'research_summary')),
+            Prefetch('legacycredential_set', to_attr='legacy_credentials'),
+        )
+    )
 
-    return response
+    def rows():
+        for user in exports.iterate_queryset(users):
+            if user.applications:
+                application = user.applications[-1]
+                yield [user.profile.first_names, user.profile.last_name, user.email,
+                       application.organization_name, application.country,
+                       user.mimic_signature_date, user.eicu_signature_date,
+                       application.research_summary]
+            elif user.legacy_credentials:
+                legacy = user.legacy_credentials[0]
+                yield [user.profile.first_names, user.profile.last_name, user.email,
+                       'Legacy User', legacy.country,
+                       legacy.mimic_approval_date, legacy.eicu_approval_date,
+                       legacy.info]
+            else:
+                LOGGER.info("Failed locating information of user {}".format(user.id))
+
+    return exports.export_response(request, 'credentialed_users', headers, rows())
 
 
 @console_permission_required('project.can_view_access_logs')
@@ -2412,27 +2306,21 @@ def download_project_accesses(request, pk):
         AccessLog.objects.filter(
             content_type=ContentType.objects.get_for_model(PublishedProject), object_id=pk
         )
+        .order_by('id')
         .select_related("user__profile")
         .annotate(duration=F("last_access_datetime") - F("creation_datetime"))
     )
 
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="project_{pk}_accesses.csv"'
-
-    writer = csv.writer(response)
-    writer.writerow(headers)
+    rows = ([
+        row.user.get_full_name(),
+        row.user.email,
+        row.creation_datetime.strftime('%m/%d/%Y, %I:%M:%S %p'),
+        row.last_access_datetime.strftime('%m/%d/%Y, %I:%M:%S %p'),
+        str(row.duration).split('.')[0],
+        row.count
+    ] for row in exports.iterate_queryset(data))
 
-    for row in data:
-        writer.writerow([
-            row.user.get_full_name(),
-            row.user.email,
-            row.creation_datetime.strftime('%m/%d/%Y, %I:%M:%S %p'),
-            row.last_access_datetime.strftime('%m/%d/%Y, %I:%M:%S %p'),
-            str(row.duration).split('.')[0],
-            row.count
-        ])
-
-    return response
+    return exports.export_response(request, f'project_{pk}_accesses', headers, rows)
 
 
 @console_permission_required('project.can_view_access_logs')
@@ -2493,26 +2381,19 @@ def download_user_accesses(request, pk):
     headers = ['Project name', 'First access', 'Last access', 'Duration', 'Count']
 
     data = (
-        AccessLog.objects.filter(user=pk).select_related('user__profile')
+        AccessLog.objects.filter(user=pk).order_by('id').prefetch_related('project')
         .annotate(duration=F('last_access_datetime') - F('creation_datetime'))
     )
 
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="user_{pk}_logs.csv"'
-
-    writer = csv.writer(response)
-    writer.writerow(headers)
+    rows = ([
+        str(row.project),
+        row.creation_datetime.strftime('%m/%d/%Y, %I:%M:%S %p'),
+        row.last_access_datetime.strftime('%m/%d/%Y, %I:%M:%S %p'),
+        str(row.duration).split('.')[0],
+        row.count
+    ] for row in exports.iterate_queryset(data))
 
-    for row in data:
-        writer.writerow([
-            row.project,
-            row.creation_datetime.strftime('%m/%d/%Y, %I:%M:%S %p'),
-            row.last_access_datetime.strftime('%m/%d/%Y, %I:%M:%S %p'),
-            str(row.duration).split('.')[0],
-            row.count
-        ])
-
-    return response
+    return exports.export_response(request, f'user_{pk}_logs', headers, rows)
 
 
 @console_permission_required('project.can_view_access_logs')
@@ -2551,28 +2432,21 @@ def download_signed_urls_logs(request, pk):
     data = GCPLog.objects.filter(
         content_type=ContentType.objects.get_for_model(ActiveProject),
         object_id=pk
-    ).select_related('user__profile').annotate(
+    ).order_by('id').select_related('user__profile').annotate(
         duration=F('last_access_datetime') - F('creation_datetime')
     )
 
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="project_{pk}_signed_urls.csv"'
-
-    writer = csv.writer(response)
-    writer.writerow(headers)
-
-    for row in data:
-        writer.writerow([
-            row.user.get_full_name(),
-            row.user.email,
-            row.creation_datetime.strftime('%m/%d/%Y, %I:%M:%S %p'),
-            row.last_access_datetime.strftime('%m/%d/%Y, %I:%M:%S %p'),
-            str(row.duration).split('.')[0],
-            row.data,
-            row.count
-        ])
-
-    return response
+    rows = ([
+        row.user.get_full_name(),
+        row.user.email,
+        row.creation_datetime.strftime('%m/%d/%Y, %I:%M:%S %p'),
+        row.last_access_datetime.strftime('%m/%d/%Y, %I:%M:%S %p'),
+        str(row.duration).split('.')[0],
+        row.data,
+        row.count
+    ] for row in exports.iterate_queryset(data))
+
+    return exports.export_response(request, f'project_{pk}_signed_urls', headers, rows)
 
 
 class UserAutocomplete(autocomplete.Select2QuerySetView):
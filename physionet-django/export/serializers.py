@@ -33,8 +33,12 @@ class Meta:
 
 
 class PublishedProjectDetailSerializer(serializers.ModelSerializer):
+    citations = serializers.DictField(source='citation_text_all', read_only=True)
+    bibtex = serializers.CharField(source='get_bibtex', read_only=True)
+    ris = serializers.CharField(source='get_ris', read_only=True)
+
     class Meta:
         model = PublishedProject
         fields = ("title", "abstract", "version", "short_description",
                   "project_home_page", "publish_datetime", "doi", "slug", "main_storage_size",
-                  "compressed_storage_size")
+                  "compressed_storage_size", "citations", "bibtex", "ris")
@@ -1,13 +1,23 @@
+import doctest
 import json
+import os
 import shutil
-from unittest import skipIf
+import sys
+import tempfile
+from unittest import mock, skipIf
 
 from django.urls import reverse
 
+from lightwave import views
 from project.models import ActiveProject
 from user.test_views import prevent_request_warnings, TestMixin
 
 
+def load_tests(loader, tests, ignore):
+    tests.addTests(doctest.DocTestSuite(views, optionflags=doctest.REPORT_NDIFF))
+    return tests
+
+
 test_queries = (
     'action=dblist',
     'action=rlist&db={db}',
@@ -17,6 +27,14 @@
 
 server = shutil.which('sandboxed-lightwave')
 
+# Minimal CGI program, which echoes its process ID and environment
+fake_server = r"""
+import json, os, sys
+sys.stdout.write('Content-Type: application/json\r\n\r\n')
+sys.stdout.flush()
+sys.stdout.write(json.dumps({'success': True, 'pid': os.getpid(), 'env': dict(os.environ)}))
+"""
+
 
 class TestPublished(TestMixin):
     """
@@ -44,6 +62,53 @@ def test_server(self):
             self.assertEqual(data['success'], True)
 
 
+class TestStreaming(TestMixin):
+    """
+    Test streaming and caching of LightWAVE responses.
+    """
+    def setUp(self):
+        super().setUp()
+        fd, server_script = tempfile.mkstemp()
+        with os.fdopen(fd, 'w') as f:
+            f.write('#!{}\n{}'.format(sys.executable, fake_server))
+        os.chmod(server_script, 0o700)
+        self.addCleanup(os.remove, server_script)
+
+        patcher = mock.patch.object(views, '_lightwave_command', (server_script,))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        views._response_cache.clear()
+        self.addCleanup(views._response_cache.clear)
+
+    def get_json(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        return response, json.loads(b''.join(response).decode())
+
+    def test_streamed(self):
+        server = reverse('lightwave_server')
+        query = '?action=fetch&db=demobsn/1.0&record=231&signal=ECG&t0=0&dt=10'
+        first_response, first = self.get_json(server + query)
+        second_response, second = self.get_json(server + query)
+
+        self.assertTrue(first_response.streaming)
+        self.assertEqual(first['env']['QUERY_STRING'], query[1:].replace('/', '%2F'))
+        self.assertEqual(first['env']['LIGHTWAVE_ROOT'], views.PUBLIC_ROOT)
+        self.assertNotIn('DJANGO_SETTINGS_MODULE', first['env'])
+        self.assertNotEqual(second['pid'], first['pid'])
+
+    def test_header_cached(self):
+        server = reverse('lightwave_server')
+        first_response, first = self.get_json(server + '?action=info&db=demobsn/1.0&record=231')
+        _, second = self.get_json(server + '?action=info&db=demobsn/1.0&record=231')
+        _, third = self.get_json(server + '?action=info&db=demobsn/1.0&record=100')
+
+        self.assertFalse(first_response.streaming)
+        self.assertEqual(second, first)
+        self.assertNotEqual(third['pid'], first['pid'])
+
+
 class TestUnpublished(TestMixin):
     """
     Test operation of LightWAVE server for active projects.
@@ -1,10 +1,13 @@
+import collections
 import os
 import re
 import shutil
 import subprocess
+import threading
+import urllib.parse
 
 from django.conf import settings
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import redirect, render
 from django.urls import reverse
 from project.models import AccessPolicy, PublishedProject
@@ -60,6 +63,122 @@ def lightwave_project_home(request, project_slug, project, **kwargs):
 _lightwave_command = (shutil.which('sandboxed-lightwave'),)
 _cgi_header = re.compile('(?ia)(Content-Type):\s*(.*)')
 
+# Actions whose responses depend only on the record header or
+# annotations, and are small enough to be cached
+_cacheable_actions = {'dblist', 'rlist', 'alist', 'info'}
+
+# Responses larger than this are never cached
+MAX_CACHED_RESPONSE_SIZE = 256 * 1024
+
+# Maximum size of each chunk of a streamed response
+RESPONSE_CHUNK_SIZE = 64 * 1024
+
+
+class ResponseCache:
+    """
+    Least-recently-used cache of complete LightWAVE responses.
+    """
+    def __init__(self, size):
+        self.size = size
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_response_cache = ResponseCache(settings.LIGHTWAVE_CACHE_SIZE)
+
+
+def is_cacheable(query_string):
+    """
+    Check whether a LightWAVE request retrieves only header or
+    annotation data.
+
+    >>> is_cacheable('action=info&db=demobsn/1.0&record=231')
+    True
+    >>> is_cacheable('action=fetch&db=demobsn/1.0&record=231&annotator=atr&t0=0&dt=10')
+    True
+    >>> is_cacheable('action=fetch&db=demobsn/1.0&record=231&signal=ECG&t0=0&dt=10')
+    False
+    """
+    params = urllib.parse.parse_qs(query_string)
+    action = params.get('action', [''])[0]
+    return (action in _cacheable_actions
+            or (action == 'fetch' and 'signal' not in params))
+
+
+def _cgi_response_headers(lines):
+    headers = {}
+    for line in lines:
+        m = _cgi_header.match(line)
+        if m:
+            headers[m.group(1)] = m.group(2)
+    return headers
+
+
+class _CGIOutput:
+    """
+    Iterator over the response body written by a CGI program.
+
+    The process is stopped when the iterator is closed (which
+    StreamingHttpResponse does once the response has been sent, or
+    the client has disconnected.)
+    """
+    def __init__(self, proc):
+        self.proc = proc
+
+    def __iter__(self):
+        while chunk := self.proc.stdout.read1(RESPONSE_CHUNK_SIZE):
+            yield chunk
+
+    def close(self):
+        if self.proc.poll() is None:
+            self.proc.kill()
+        self.proc.stdout.close()
+        self.proc.wait()
+
+
+def _run_lightwave(env):
+    """
+    Run the LightWAVE server as a CGI program, and return the response
+    headers and a _CGIOutput for reading the body.
+    """
+    proc = subprocess.Popen(_lightwave_command, close_fds=True, env=env,
+                            stdin=subprocess.DEVNULL,
+                            stdout=subprocess.PIPE)
+    output = _CGIOutput(proc)
+    try:
+        header_lines = []
+        for line in proc.stdout:
+            line = line.rstrip(b'\n\r').decode()
+            if line == '':
+                break
+            header_lines.append(line)
+        else:
+            raise Exception('no response header')
+    except BaseException:
+        output.close()
+        raise
+    return _cgi_response_headers(header_lines), output
+
 
 def serve_lightwave(query_string, root, dbpath='/', dblist=None, dbcal=None,
                     public=False):
@@ -82,6 +201,10 @@ def serve_lightwave(query_string, root, dbpath='/', dblist=None, dbcal=None,
     If public is true, the data may be accessed by any web page,
     either using XMLHttpRequest or using JSONP.  If public is false,
     the data may be accessed only by same-origin pages.
+
+    The response body is streamed to the client as it is written by
+    the server.  Header and annotation requests for public databases
+    (whose files never change) are cached.
     """
 
     # This function implements an extremely basic subset of CGI - just
@@ -90,34 +213,43 @@ def serve_lightwave(query_string, root, dbpath='/', dblist=None, dbcal=None,
     # the Content-Type header is supported.
 
     env = {
+        'QUERY_STRING': query_string,
         'WFDB': dbpath,
         'LIGHTWAVE_ROOT': root,
-        'QUERY_STRING': query_string,
         'LIGHTWAVE_WFDBCAL': (dbcal or DBCAL_FILE),
     }
+    if not public:
+        env['LIGHTWAVE_DISABLE_JSONP'] = '1'
     if dblist:
         env['LIGHTWAVE_DBLIST'] = dblist
 
-    resp = HttpResponse()
+    cache_key = None
+    if public and is_cacheable(query_string):
+        cache_key = tuple(sorted(env.items()))
+    cached = cache_key and _response_cache.get(cache_key)
+
+    body = None
+    if cached:
+        headers, body = cached
+    else:
+        headers, output = _run_lightwave(env)
+        if cache_key:
+            try:
+                body = b''.join(output)
+            finally:
+                output.close()
+            if len(body) <= MAX_CACHED_RESPONSE_SIZE:
+                _response_cache.set(cache_key, (headers, body))
+
+    if body is None:
+        resp = StreamingHttpResponse(output)
+    else:
+        resp = HttpResponse(body)
+    for name, value in headers.items():
+        resp[name] = value
     if public:
         resp['Access-Control-Allow-Origin'] = '*'
         resp['Access-Control-Allow-Headers'] = 'x-requested-with'
-    else:
-        env['LIGHTWAVE_DISABLE_JSONP'] = '1'
-
-    with subprocess.Popen(_lightwave_command, close_fds=True, env=env,
-                          stdin=subprocess.DEVNULL,
-                          stdout=subprocess.PIPE) as proc:
-        for line in proc.stdout:
-            line = line.rstrip(b'\n\r').decode()
-            if line == '':
-                break
-            m = _cgi_header.match(line)
-            if m:
-                resp[m.group(1)] = m.group(2)
-        else:
-            raise Exception('no response header')
-        resp.write(proc.stdout.read())
     return resp
 
 
@@ -3,12 +3,14 @@
 from django.conf import settings
 from google.cloud.exceptions import NotFound
 from google.cloud.storage import Client
+from physionet.gcs import gcs_clients
 from project.utility import DirectoryInfo, FileInfo, readable_size
-from storages.backends.gcloud import GoogleCloudStorage
+
+STORAGE_CLASS = 'storages.backends.gcloud.GoogleCloudStorage'
 
 
 def get_client():
-    return GoogleCloudStorage().client
+    return gcs_clients.client()
 
 
 class ObjectPath(object):
@@ -86,7 +88,7 @@ def dir_size(self):
         return sum([obj.size for obj in iterator])
 
     def open(self, mode='rb'):
-        storage = GoogleCloudStorage(bucket_name=self.bucket_name())
+        storage = gcs_clients.storage(self.bucket_name(), STORAGE_CLASS)
         return storage.open(self.key(), mode=mode)
 
     def list_dir(self):
@@ -113,7 +115,7 @@ def list_dir(self):
         return files, dirs
 
     def url(self):
-        storage = GoogleCloudStorage(bucket_name=self.bucket_name())
+        storage = gcs_clients.storage(self.bucket_name(), STORAGE_CLASS)
         return storage.url(self.key())
 
     def rm(self):
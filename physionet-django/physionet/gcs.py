@@ -1,8 +1,14 @@
+import concurrent.futures
+import hashlib
+import itertools
 import os
+import threading
 
 from django.conf import settings
+from django.core.cache import caches
 from django.core.files.storage import get_storage_class
 from physionet.settings.base import StorageTypes
+from requests.adapters import HTTPAdapter
 from storages.backends.gcloud import GoogleCloudStorage
 
 
@@ -10,6 +16,290 @@ class GCSObjectException(Exception):
     pass
 
 
+class GCSClientRegistry:
+    """
+    Process-wide registry of GCS clients and storage backends.
+
+    Setting up a client involves creating an HTTP session, TLS
+    connections and credentials, so a single client is shared by
+    everything in the process, with a connection pool large enough
+    for all of the threads that may use it at once (see pool_size.)
+    Storage backends (and their bucket handles) are also shared, one
+    per storage class and bucket name.
+
+    Connections cannot be shared between processes, so the registry
+    starts again if it is used after the process has forked (for
+    example, in each uWSGI worker.)
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Discard all clients and storage backends.
+        """
+        self._pid = os.getpid()
+        self._client = None
+        self._storages = {}
+
+    def _check_pid(self):
+        if self._pid != os.getpid():
+            self.reset()
+
+    @staticmethod
+    def pool_size():
+        """
+        Return the maximum number of connections kept open by a client.
+
+        This is GCS_HTTP_POOL_SIZE if set, or otherwise the greater of
+        the number of uWSGI threads and GCS_COPY_THREADS.
+        """
+        if settings.GCS_HTTP_POOL_SIZE:
+            return settings.GCS_HTTP_POOL_SIZE
+        try:
+            import uwsgi
+            threads = int(uwsgi.opt.get('threads', 1))
+        except (ImportError, AttributeError, ValueError):
+            threads = 1
+        return max(threads, settings.GCS_COPY_THREADS)
+
+    def _create_client(self):
+        client = GoogleCloudStorage().client
+        adapter = HTTPAdapter(pool_maxsize=self.pool_size())
+        client._http.mount('https://', adapter)
+        client._http.mount('http://', adapter)
+        return client
+
+    def client(self):
+        """
+        Return the shared client.
+        """
+        with self._lock:
+            self._check_pid()
+            if self._client is None:
+                self._client = self._create_client()
+            return self._client
+
+    def storage(self, bucket_name, storage_klass=None):
+        """
+        Return the shared storage backend for a bucket.
+
+        storage_klass is the dotted path of a GoogleCloudStorage class
+        (default: DEFAULT_FILE_STORAGE.)
+        """
+        key = (storage_klass or settings.DEFAULT_FILE_STORAGE, bucket_name)
+        client = self.client()
+        with self._lock:
+            self._check_pid()
+            storage = self._storages.get(key)
+            if storage is None:
+                storage = get_storage_class(key[0])(bucket_name=bucket_name)
+                storage._client = client
+                self._storages[key] = storage
+            return storage
+
+    def bucket(self, bucket_name):
+        """
+        Return a handle for a bucket, using the shared client.
+        """
+        return self.storage(bucket_name).bucket
+
+
+gcs_clients = GCSClientRegistry()
+
+
+class GCSBulkOperations:
+    """
+    Copy and delete many objects with as few round trips as possible.
+
+    Listings are paged lazily, so a directory is never held in memory
+    all at once.  Copies are server-side and are sent by a bounded
+    pool of threads; deletions are grouped into batch requests.
+
+    threads: number of copies to run in parallel (default:
+        GCS_COPY_THREADS)
+    batch_size: number of deletions sent in one batch request
+        (default: GCS_BATCH_SIZE, at most 100)
+    """
+    # Maximum number of calls allowed in a single batch request
+    MAX_BATCH_SIZE = 100
+
+    def __init__(self, threads=None, batch_size=None):
+        self.threads = threads or settings.GCS_COPY_THREADS
+        self.batch_size = min(batch_size or settings.GCS_BATCH_SIZE, self.MAX_BATCH_SIZE)
+
+    def iter_blobs(self, bucket, prefix, delimiter=None, fields=None, page_size=None, page_token=None):
+        """
+        Iterate over the blobs with the given prefix, one page at a time.
+
+        If fields is specified, only those properties of each blob are
+        retrieved (for example, 'items(size),nextPageToken'.)
+
+        page_size defaults to GCS_LIST_PAGE_SIZE.  If page_token is
+        specified, the listing continues from the page that it refers
+        to (see the iterator's next_page_token.)
+        """
+        return bucket.list_blobs(prefix=prefix, delimiter=delimiter, fields=fields,
+                                 page_size=page_size or settings.GCS_LIST_PAGE_SIZE, page_token=page_token)
+
+    def copy_blobs(self, copies):
+        """
+        Copy blobs in parallel.
+
+        copies: iterable of (blob, destination bucket, new name)
+            triples.  This may be a generator; at most twice as many
+            copies as there are threads are queued at any time.
+
+        Returns the number of blobs copied.  If any copy fails, the
+        first error is raised once the pending copies have finished.
+        """
+        count = 0
+        error = None
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.threads) as pool:
+            pending = set()
+            for blob, bucket, new_name in copies:
+                if len(pending) >= self.threads * 2:
+                    done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    count += len(done)
+                    error = error or self._first_error(done)
+                    if error:
+                        break
+                pending.add(pool.submit(blob.bucket.copy_blob, blob, bucket, new_name=new_name))
+            done, _ = concurrent.futures.wait(pending)
+            count += len(done)
+            error = error or self._first_error(done)
+
+        if error:
+            raise error
+        return count
+
+    def delete_blobs(self, bucket, blobs):
+        """
+        Delete blobs, sending one batch request per `batch_size` blobs.
+
+        Returns the number of blobs deleted.
+        """
+        count = 0
+        blobs = iter(blobs)
+        while chunk := list(itertools.islice(blobs, self.batch_size)):
+            if len(chunk) == 1:
+                bucket.delete_blob(chunk[0].name)
+            else:
+                with bucket.client.batch():
+                    for blob in chunk:
+                        bucket.delete_blob(blob.name)
+            count += len(chunk)
+        return count
+
+    @staticmethod
+    def _first_error(futures):
+        for future in futures:
+            if future.exception():
+                return future.exception()
+        return None
+
+
+def _prefixes(path):
+    """
+    Return the directory prefixes containing the given path.
+
+    >>> _prefixes('bucket/a/b/file.txt')
+    ['bucket/', 'bucket/a/', 'bucket/a/b/']
+    >>> _prefixes('bucket/a/')
+    ['bucket/', 'bucket/a/']
+    """
+    return [path[:i + 1] for i, c in enumerate(path) if c == '/']
+
+
+class GCSUsageCache:
+    """
+    Cache of the total size and number of objects under GCS prefixes.
+
+    Entries are updated incrementally as objects are added and removed
+    (see GCSProjectFiles), so that the storage used by a project can
+    be found without listing all of its objects.  Each entry expires
+    after GCS_USAGE_CACHE_TIMEOUT seconds, and is then recomputed.
+
+    Each prefix also has a generation token, which is incremented
+    whenever the prefix's usage changes.  Entries are stored together
+    with the token that was current when they were computed, and
+    ignored if the token has changed since, so a listing that overlaps
+    an upload is never cached as the new total.
+
+    The shared cache does not provide atomic updates across processes
+    (FileBasedCache implements incr() as a get followed by a set), so
+    if two processes update the same prefix at once, one of the
+    changes may be lost.  The cached usage is therefore only an
+    estimate; it is corrected when the entry expires, or when it is
+    invalidated (for example, after a browser upload completes.)
+
+    Entries are kept in the 'shared' cache, so that every worker
+    process sees the same usage.
+    """
+    def __init__(self):
+        self._cache = caches['shared']
+
+    @staticmethod
+    def _key(kind, path):
+        return 'gcs-{}:{}'.format(kind, hashlib.sha256(path.encode()).hexdigest())
+
+    def _generation(self, path):
+        return self._cache.get_or_set(self._key('generation', path), 0, timeout=None)
+
+    def _next_generation(self, path):
+        key = self._key('generation', path)
+        self._cache.add(key, 0, timeout=None)
+        try:
+            return self._cache.incr(key)
+        except ValueError:
+            return None
+
+    def get(self, path, compute):
+        """
+        Return the cached (size, count) of a directory path, calling
+        compute() to find it if it is not cached.
+        """
+        generation = self._generation(path)
+        entry = self._cache.get(self._key('usage', path))
+        if entry is not None and entry[0] == generation:
+            return entry[1], entry[2]
+        return self.refresh(path, compute, generation)
+
+    def refresh(self, path, compute, generation=None):
+        """
+        Call compute() to find the (size, count) of a directory path,
+        and store the result.
+        """
+        if generation is None:
+            generation = self._generation(path)
+        size, count = compute()
+        self._cache.set(self._key('usage', path), (generation, size, count), settings.GCS_USAGE_CACHE_TIMEOUT)
+        return size, count
+
+    def add(self, path, size, count):
+        """
+        Record that objects have been added at the given path (or
+        removed, if size and count are negative.)  Every cached prefix
+        containing the path is updated.
+        """
+        for prefix in _prefixes(path):
+            key = self._key('usage', prefix)
+            entry = self._cache.get(key)
+            generation = self._next_generation(prefix)
+            if entry is not None and generation is not None and entry[0] == generation - 1:
+                self._cache.set(key, (generation, entry[1] + size, entry[2] + count),
+                                settings.GCS_USAGE_CACHE_TIMEOUT)
+
+    def invalidate(self, path):
+        """
+        Discard the cached usage of every prefix containing the given
+        path, after a change of unknown size.
+        """
+        for prefix in _prefixes(path):
+            self._next_generation(prefix)
+
+
 class GCSObject:
     """
     The representation of an object in Google Cloud Storage.
@@ -71,6 +361,11 @@ def local_name(self):
         """Return the relative name inside the bucket"""
         return '' if self.name == '/' else self.name
 
+    @property
+    def path(self):
+        """Return the normalized path, including the bucket name"""
+        return f'{self.bucket.name}/{self.local_name}'
+
     def open(self, mode):
         """Open the location with the given mode"""
         return self._storage.open(self.name, mode=mode)
@@ -100,29 +395,79 @@ def mkdir(self):
     def size(self):
         """Size of the object/all objects in the dictionary, in bytes."""
         if self.is_dir():
-            return sum(obj.size for obj in self.bucket.list_blobs(prefix=self.local_name))
+            return self.usage()[0]
 
         file = self.bucket.get_blob(self.blob.name)
         if not file:
             raise GCSObjectException('The specified file does not exist')
         return file.size
 
-    def ls(self, delimiter=None):
-        """List directory contents. Returns an iterator of blobs."""
+    def usage(self):
+        """
+        Total size in bytes, and number of objects, in the directory.
+
+        Both are computed in a single listing, retrieving only the size
+        of each object.
+        """
+        if not self.is_dir():
+            raise GCSObjectException(f'The {repr(self)} is not a directory.')
+
+        size = count = 0
+        for blob in GCSBulkOperations().iter_blobs(self.bucket, self.local_name,
+                                                   fields='items(size),nextPageToken'):
+            size += blob.size
+            count += 1
+        return size, count
+
+    def cached_usage(self, refresh=False):
+        """
+        Like usage(), but the result is cached (see GCSUsageCache.)  If
+        refresh is true, the cached result is recomputed.
+        """
+        if refresh:
+            return GCSUsageCache().refresh(self.path, self.usage)
+        return GCSUsageCache().get(self.path, self.usage)
+
+    def ls(self, delimiter=None, page_size=None, page_token=None):
+        """
+        List directory contents. Returns an iterator of blobs.
+
+        The iterator fetches page_size blobs at a time, starting from
+        page_token if specified; see GCSBulkOperations.iter_blobs.
+        """
         if not self.is_dir():
             raise GCSObjectException(f'The {repr(self)} is not a directory.')
 
-        return self.bucket.list_blobs(prefix=self.local_name, delimiter=delimiter)
+        return GCSBulkOperations().iter_blobs(self.bucket, self.local_name, delimiter=delimiter,
+                                              page_size=page_size, page_token=page_token)
 
     def rm(self):
-        """Remove"""
+        """
+        Remove.  Returns the total size and number of objects removed
+        from a directory, or None when removing a single file (whose
+        size is not known without an extra request.)
+
+        Raises NotFound if a file does not exist.
+        """
         if self.is_dir():
-            self.bucket.delete_blobs(list(self.ls()))
+            # Deleting objects already listed does not disturb the
+            # page tokens, so the listing can be consumed lazily.
+            usage = [0, 0]
+
+            def blobs():
+                for blob in self.ls():
+                    usage[0] += blob.size
+                    usage[1] += 1
+                    yield blob
+
+            GCSBulkOperations().delete_blobs(self.bucket, blobs())
+            return tuple(usage)
         else:
             self.bucket.delete_blob(self.name)
+            return None
 
     def cp(self, gcs_obj, ignored_files=None):
-        """Copy"""
+        """Copy.  Returns the total size and number of objects copied."""
         if not gcs_obj.is_dir():
             raise GCSObjectException('The target path must point on directory.')
 
@@ -130,12 +475,12 @@ def cp(self, gcs_obj, ignored_files=None):
             raise GCSObjectException('`ignored_files` does not work when copying a file.')
 
         if self.is_dir():
-            self._cp_dir(gcs_obj, ignored_files)
+            return self._cp_dir(gcs_obj, ignored_files)
         else:
-            self._cp_file(gcs_obj)
+            return self._cp_file(gcs_obj)
 
     def mv(self, gcs_obj, ignored_files=None):
-        """Move"""
+        """Move.  Returns the total size and number of objects moved."""
         if not gcs_obj.is_dir():
             raise GCSObjectException(
                 'The target path must point on directory. If you want to rename a file use `.rename()` method.'
@@ -143,18 +488,20 @@ def mv(self, gcs_obj, ignored_files=None):
 
         if self.is_dir():
             self._cp_dir(gcs_obj, ignored_files=ignored_files)
+            return self.rm()
         else:
-            self._cp_file(gcs_obj)
-
-        self.rm()
+            usage = self._cp_file(gcs_obj)
+            self.rm()
+            return usage
 
     def rename(self, gcs_obj):
-        """Rename"""
+        """Rename.  Returns the total size and number of objects renamed."""
         if self.is_dir():
             self.cp_dir_content(gcs_obj, ignored_files=None)
-            self.rm()
+            return self.rm()
         else:
-            self.bucket.rename_blob(self.blob, new_name=gcs_obj.name)
+            blob = self.bucket.rename_blob(self.blob, new_name=gcs_obj.name)
+            return blob.size, 1
 
     def is_dir(self):
         """Check if the object is a directory"""
@@ -168,28 +515,32 @@ def get_filename(self):
 
     def _cp_file(self, gcs_obj):
         """Copy file"""
-        self.bucket.copy_blob(
+        blob = self.bucket.copy_blob(
             self.blob,
             gcs_obj.bucket,
             new_name=gcs_obj.name + self.get_filename(),
         )
+        return blob.size, 1
 
     def cp_dir_content(self, gcs_obj, ignored_files):
         """Copies only the content of the directory."""
-        self._cp_dir(gcs_obj, ignored_files, True)
+        return self._cp_dir(gcs_obj, ignored_files, True)
 
     def _cp_dir(self, gcs_obj, ignored_files, copy_content_only=False):
         """
         Copies a directory with its files.
         If 'copy_content_only' is True - the contents of the directory are copied rather than the directory itself.
+        Returns the total size and number of objects copied.
         """
         if ignored_files is None:
-            ignored_files = []
+            ignored_files = set()
         else:
-            ignored_files = [os.path.join(self.local_name, f) for f in ignored_files]
+            ignored_files = {os.path.join(self.local_name, f) for f in ignored_files}
 
         relative_dir = '' if copy_content_only else self.get_filename()
-        try:
+        usage = [0, 0]
+
+        def copies():
             for blob in self.ls():
                 if blob.name in ignored_files:
                     continue
@@ -200,13 +551,12 @@ def _cp_dir(self, gcs_obj, ignored_files, copy_content_only=False):
                 if new_name == '/':
                     continue
 
-                self.bucket.copy_blob(
-                    blob,
-                    gcs_obj.bucket,
-                    new_name=new_name.lstrip('/'),
-                )
-        except ValueError:
-            pass
+                usage[0] += blob.size
+                usage[1] += 1
+                yield blob, gcs_obj.bucket, new_name.lstrip('/')
+
+        GCSBulkOperations().copy_blobs(copies())
+        return tuple(usage)
 
     def _retrieve_data_from_path(self, path, storage_klass):
         """
@@ -214,9 +564,6 @@ def _retrieve_data_from_path(self, path, storage_klass):
         path="test-bucket/dir/image.jpg" -> test-bucket, "dir/image.jpg"
         path="test-bucket" -> raise GCSObjectException
         """
-        if storage_klass is None:
-            storage_klass = settings.DEFAULT_FILE_STORAGE
-
         add_slash = path.endswith('/')
         path = os.path.normpath(path).split('/', 1)
         try:
@@ -230,14 +577,11 @@ def _retrieve_data_from_path(self, path, storage_klass):
             if add_slash:
                 object_name += '/'
 
-        return (
-            get_storage_class(storage_klass)(bucket_name=bucket_name),
-            object_name,
-        )
+        return gcs_clients.storage(bucket_name, storage_klass), object_name
 
 
 def create_bucket(name):
-    client = GoogleCloudStorage().client
+    client = gcs_clients.client()
     bucket = client.bucket(name)
     bucket.location = settings.GCP_BUCKET_LOCATION
     bucket.iam_configuration.uniform_bucket_level_access_enabled = True
@@ -245,6 +589,6 @@ def create_bucket(name):
 
 
 def delete_bucket(name):
-    client = GoogleCloudStorage().client
+    client = gcs_clients.client()
     bucket = client.bucket(name)
     bucket.delete(force=True)
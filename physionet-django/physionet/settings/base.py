@@ -14,6 +14,7 @@
 import logging.config
 import os
 import sys
+import tempfile
 
 from decouple import config, UndefinedValueError
 
@@ -243,6 +244,35 @@
 # Bucket name to store logs and metrics related to project usage.
 S3_SERVER_ACCESS_LOG_BUCKET = config('S3_SERVER_ACCESS_LOG_BUCKET', default=None)
 
+# Number of files uploaded to S3 in parallel, and the part size (in
+# bytes) for multipart uploads
+S3_UPLOAD_THREADS = config('S3_UPLOAD_THREADS', cast=int, default=8)
+S3_UPLOAD_CHUNK_SIZE = config('S3_UPLOAD_CHUNK_SIZE', cast=int, default=64 * 1024 * 1024)
+
+# Directory where completed S3 uploads are recorded, so that an
+# interrupted upload can be resumed (default: MEDIA_ROOT/s3-upload-manifests)
+S3_UPLOAD_MANIFEST_DIR = config('S3_UPLOAD_MANIFEST_DIR', default=None)
+
+# Number of processes used to compute checksums of published files,
+# and the directory where computed checksums are cached (default:
+# MEDIA_ROOT/checksum-cache)
+CHECKSUM_PROCESSES = config('CHECKSUM_PROCESSES', cast=int, default=4)
+CHECKSUM_CACHE_DIR = config('CHECKSUM_CACHE_DIR', default=None)
+
+# Number of files compressed in parallel when making zip files of
+# published projects
+ZIP_THREADS = config('ZIP_THREADS', cast=int, default=4)
+
+# Size (in bytes) of the chunks in which files are uploaded to local
+# project storage (0 to upload files in a single request), the
+# directory where incomplete uploads are kept (default:
+# MEDIA_ROOT/upload-staging; must be on the same filesystem as the
+# project files), and the number of hours after which an abandoned
+# upload is removed
+CHUNKED_UPLOAD_SIZE = config('CHUNKED_UPLOAD_SIZE', cast=int, default=8 * 1024 * 1024)
+UPLOAD_STAGING_DIR = config('UPLOAD_STAGING_DIR', default=None)
+CHUNKED_UPLOAD_LIFETIME_IN_HOURS = config('CHUNKED_UPLOAD_LIFETIME_IN_HOURS', cast=int, default=48)
+
 # Header tags for the AWS lambda function that grants access to S3 storage
 AWS_HEADER_KEY = config('AWS_KEY', default=False)
 AWS_HEADER_VALUE = config('AWS_VALUE', default=False)
@@ -582,6 +612,19 @@ class StorageTypes:
 GCP_STORAGE_BUCKET_NAME = config('GCP_MEDIA_BUCKET_NAME')
 GCP_STATIC_BUCKET_NAME = config('GCP_STATIC_BUCKET_NAME')
 
+# Number of objects copied in parallel, objects deleted per batch
+# request, and objects fetched per listing page when moving,
+# copying or removing directories in GCS
+GCS_COPY_THREADS = config('GCS_COPY_THREADS', default=16, cast=int)
+GCS_BATCH_SIZE = config('GCS_BATCH_SIZE', default=100, cast=int)
+GCS_LIST_PAGE_SIZE = config('GCS_LIST_PAGE_SIZE', default=1000, cast=int)
+# Time in seconds before the cached storage usage of a GCS directory is
+# recomputed by listing its objects
+GCS_USAGE_CACHE_TIMEOUT = config('GCS_USAGE_CACHE_TIMEOUT', default=3600, cast=int)
+# Maximum number of connections kept open to GCS by each process (if
+# zero, the greater of GCS_COPY_THREADS and the number of uWSGI threads)
+GCS_HTTP_POOL_SIZE = config('GCS_HTTP_POOL_SIZE', default=0, cast=int)
+
 if STORAGE_TYPE == StorageTypes.GCP:
     DEFAULT_FILE_STORAGE = 'physionet.storage.MediaStorage'
     STATICFILES_STORAGE = 'physionet.storage.StaticStorage'
@@ -610,6 +653,89 @@ class StorageTypes:
 
 LOG_TIMEDELTA = config('LOG_TIMEDELTA', cast=int, default='10')
 
+# Seconds for which project access logs are collected in memory before
+# being written to the database (0 writes each access immediately),
+# and the number of distinct pending log entries that causes them to
+# be written sooner
+ACCESS_LOG_FLUSH_INTERVAL = config('ACCESS_LOG_FLUSH_INTERVAL', cast=int, default=0)
+ACCESS_LOG_MAX_PENDING = config('ACCESS_LOG_MAX_PENDING', cast=int, default=1000)
+
+# Directory for data that must be seen by all server processes on the
+# host, such as the generation of the search index and the revision of
+# cached project pages (default: a directory in the system temporary
+# directory.)
+SHARED_CACHE_DIR = config('SHARED_CACHE_DIR', default=os.path.join(tempfile.gettempdir(), 'physionet-cache'))
+
+# Time in seconds that a successful password check for HTTP
+# authentication (e.g. wget) is remembered, so that it does not need to
+# be repeated for each file.  0 disables this.  Results are kept in
+# files in HTTP_AUTH_CACHE_DIR (default: a subdirectory of
+# SHARED_CACHE_DIR), shared by all processes on the host.
+HTTP_AUTH_CACHE_TIMEOUT = config('HTTP_AUTH_CACHE_TIMEOUT', cast=int, default=300)
+HTTP_AUTH_CACHE_DIR = config('HTTP_AUTH_CACHE_DIR', default=os.path.join(SHARED_CACHE_DIR, 'http-auth'))
+HTTP_AUTH_CACHE_MAX_ENTRIES = config('HTTP_AUTH_CACHE_MAX_ENTRIES', cast=int, default=10000)
+
+# Time in seconds that previews of published files (rendered text and
+# tables) are cached.  0 disables this.  Previews are kept in memory by
+# each worker process, or, if FILE_PREVIEW_CACHE_DIR is set, in files
+# in that directory shared by all processes on the host; in that case,
+# previews of README and CSV files of up to FILE_PREVIEW_WARM_MAX_SIZE
+# bytes are also prepared when a project is published.
+FILE_PREVIEW_CACHE_TIMEOUT = config('FILE_PREVIEW_CACHE_TIMEOUT', cast=int, default=86400)
+FILE_PREVIEW_CACHE_DIR = config('FILE_PREVIEW_CACHE_DIR', default=None)
+FILE_PREVIEW_CACHE_MAX_ENTRIES = config('FILE_PREVIEW_CACHE_MAX_ENTRIES', cast=int, default=1000)
+FILE_PREVIEW_WARM_MAX_SIZE = config('FILE_PREVIEW_WARM_MAX_SIZE', cast=int, default=1024 * 1024)
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(SHARED_CACHE_DIR, 'shared'),
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'http-auth': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': HTTP_AUTH_CACHE_DIR,
+        'TIMEOUT': HTTP_AUTH_CACHE_TIMEOUT,
+        'OPTIONS': {'MAX_ENTRIES': HTTP_AUTH_CACHE_MAX_ENTRIES},
+    },
+    'file-previews': {
+        'BACKEND': ('django.core.cache.backends.filebased.FileBasedCache' if FILE_PREVIEW_CACHE_DIR
+                    else 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': FILE_PREVIEW_CACHE_DIR or 'file-previews',
+        'TIMEOUT': FILE_PREVIEW_CACHE_TIMEOUT,
+        'OPTIONS': {'MAX_ENTRIES': FILE_PREVIEW_CACHE_MAX_ENTRIES},
+    },
+}
+
+# Time in seconds that the user-independent parts of published project
+# pages (description, authors, citations, versions) may be cached.  0
+# disables caching.
+PUBLISHED_PROJECT_CACHE_TIMEOUT = config('PUBLISHED_PROJECT_CACHE_TIMEOUT', cast=int, default=0)
+
+# Maximum number of files and folders shown at once in a project's
+# files panel (more can then be loaded on request.)  0 shows all of
+# them.
+FILES_PANEL_PAGE_SIZE = config('FILES_PANEL_PAGE_SIZE', cast=int, default=1000)
+
+# Search backend for published projects (dotted path to a class from
+# search.backends.) By default, PostgreSQL full-text search is used if
+# available, and an in-process inverted index otherwise.
+SEARCH_BACKEND = config('SEARCH_BACKEND', default=None)
+# Maximum time in seconds before the in-process search index is rebuilt
+SEARCH_INDEX_MAX_AGE = config('SEARCH_INDEX_MAX_AGE', cast=int, default=3600)
+
+# Time in seconds that a user's project access entitlements (signed DUA,
+# approved access request, completed training) may be cached and reused
+# by later requests.  0 disables caching across requests.
+PROJECT_ACCESS_CACHE_TIMEOUT = config('PROJECT_ACCESS_CACHE_TIMEOUT', cast=int, default=0)
+
+# Number of LightWAVE header and annotation responses cached in each process
+LIGHTWAVE_CACHE_SIZE = config('LIGHTWAVE_CACHE_SIZE', cast=int, default=256)
+
 # Ticket system for user support
 TICKET_SYSTEM_URL = config('TICKET_SYSTEM_URL', default=None)
 
@@ -644,3 +770,7 @@ class StorageTypes:
 
 # Emails
 PROJECT_EDITOR_EMAIL = config('PROJECT_EDITOR_EMAIL', default='')
+
+# Number of rows read from the database at a time when streaming
+# console downloads (such as access logs)
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', cast=int, default=2000)
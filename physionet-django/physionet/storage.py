@@ -1,6 +1,7 @@
 import datetime as dt
 
 from django.conf import settings
+from physionet.gcs import gcs_clients
 from storages.backends.gcloud import GoogleCloudStorage
 
 
@@ -26,7 +27,7 @@ def generate_signed_url_helper(blob_name, size, expiration, version='v4') -> str
     Returns:
         str: The signed URL.
     """
-    storage = MediaStorage()
+    storage = gcs_clients.storage(settings.GCP_STORAGE_BUCKET_NAME, 'physionet.storage.MediaStorage')
     blob = storage.bucket.blob(blob_name)
 
     url = blob.generate_signed_url(
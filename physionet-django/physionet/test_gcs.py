@@ -1,12 +1,14 @@
-from unittest import skipIf
+import os
+from unittest import mock, skipIf
 
 from decouple import config
+from django.core.cache import caches
 from django.test import TestCase, override_settings
 from google.api_core.client_options import ClientOptions
 from google.auth.credentials import AnonymousCredentials
 from google.cloud.exceptions import NotFound
 from google.cloud.storage import Blob, Bucket, Client
-from physionet.gcs import GCSObject, GCSObjectException
+from physionet.gcs import GCSClientRegistry, GCSObject, GCSObjectException, GCSUsageCache, gcs_clients
 from physionet.settings.base import StorageTypes
 
 TEST_GCS_INTEGRATION = config('TEST_GCS_INTEGRATION', default=True, cast=bool)
@@ -33,6 +35,13 @@ def setUpTestData(cls):
         cls.bucket_name = 'test'
         cls.path = 'physionet/users/admin/profile.jpg'
 
+    def setUp(self):
+        gcs_clients.reset()
+        self.addCleanup(gcs_clients.reset)
+        patcher = mock.patch.object(gcs_clients, '_create_client', side_effect=self._get_gcs_client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def tearDown(self):
         try:
             self._clear_gcs_bucket(self.bucket_name)
@@ -129,6 +138,17 @@ def test_size_when_object_is_directory(self):
         # WHEN + THEN
         self.assertEqual(gcs_object.size(), len('content') * 2)
 
+    def test_usage_counts_size_and_objects(self):
+        # GIVEN
+        gcs_object = self._monkeypatch_gcsobject(GCSObject('test/dir1/'))
+        gcs_object.client.create_bucket('test')
+        gcs_object.mkdir()
+        for i in range(3):
+            self._monkeypatch_gcsobject(GCSObject(f'test/dir1/notes{i}.txt')).upload_from_string('content')
+
+        # WHEN + THEN
+        self.assertEqual(gcs_object.usage(), (len('content') * 3, 4))
+
     def test_rm_deletes_all_files_in_directory_when_object_is_directory(self):
         # GIVEN
         gcs_object = self._monkeypatch_gcsobject(GCSObject('test/dir1/'))
@@ -161,6 +181,15 @@ def test_rm_removes_file_when_object_is_file(self):
         dir_ = self._monkeypatch_gcsobject(self._monkeypatch_gcsobject(GCSObject('test/dir/')))
         self.assertEqual(dir_.size(), 0)
 
+    def test_rm_raises_not_found_when_file_is_missing(self):
+        # GIVEN
+        gcs_object = self._monkeypatch_gcsobject(GCSObject('test/dir/missing.jpg'))
+        gcs_object.client.create_bucket('test')
+
+        # WHEN / THEN
+        with self.assertRaises(NotFound):
+            gcs_object.rm()
+
     def test_cp_copies_file_to_directory(self):
         # GIVEN
         gcs_object = self._monkeypatch_gcsobject(GCSObject('test/dir/file.jpg'))
@@ -213,3 +242,110 @@ def test_rename_file(self):
         self.assertFalse(gcs_object.exists())
         self.assertTrue(gcs_object_renamed.exists())
         self.assertEqual(gcs_object_renamed.size(), len('content'))
+
+    @override_settings(GCS_COPY_THREADS=2, GCS_BATCH_SIZE=3, GCS_LIST_PAGE_SIZE=2)
+    def test_mv_moves_directory_larger_than_batch_and_page(self):
+        # GIVEN
+        gcs_object = self._monkeypatch_gcsobject(GCSObject('test/dir/'))
+        gcs_object.client.create_bucket('test')
+        for i in range(7):
+            self._monkeypatch_gcsobject(GCSObject(f'test/dir/sub/file{i}.txt')).upload_from_string('content')
+
+        target = self._monkeypatch_gcsobject(GCSObject('test/moved/'))
+
+        # WHEN
+        gcs_object.mv(target)
+
+        # THEN
+        self.assertEqual(gcs_object.size(), 0)
+        self.assertEqual(
+            sorted(blob.name for blob in target.ls()),
+            [f'moved/dir/sub/file{i}.txt' for i in range(7)],
+        )
+        self.assertEqual(target.size(), len('content') * 7)
+
+    def test_mv_keeps_directory_when_copy_fails(self):
+        # GIVEN
+        gcs_object = self._monkeypatch_gcsobject(GCSObject('test/dir/'))
+        gcs_object.client.create_bucket('test')
+        self._monkeypatch_gcsobject(GCSObject('test/dir/file.txt')).upload_from_string('content')
+
+        # WHEN
+        with mock.patch.object(Bucket, 'copy_blob', side_effect=ValueError('copy failed')):
+            with self.assertRaises(ValueError):
+                gcs_object.mv(self._monkeypatch_gcsobject(GCSObject('test/moved/')))
+
+        # THEN
+        self.assertEqual(gcs_object.size(), len('content'))
+
+
+@override_settings(
+    GS_PROJECT_ID='test_project_id',
+    GS_CREDENTIALS=AnonymousCredentials(),
+    GCS_HTTP_POOL_SIZE=0,
+    GCS_COPY_THREADS=12,
+)
+class TestGCSClientRegistry(TestCase):
+    def setUp(self):
+        self.registry = GCSClientRegistry()
+
+    def test_client_is_shared(self):
+        client = self.registry.client()
+        self.assertIs(self.registry.client(), client)
+        storage = self.registry.storage('test', 'physionet.storage.MediaStorage')
+        self.assertIs(storage.client, client)
+        self.assertIs(self.registry.storage('test', 'physionet.storage.MediaStorage'), storage)
+        self.assertIsNot(self.registry.storage('other', 'physionet.storage.MediaStorage'), storage)
+        self.assertEqual(storage.bucket.name, 'test')
+
+    def test_connection_pool_size(self):
+        adapter = self.registry.client()._http.get_adapter('https://storage.googleapis.com/')
+        self.assertEqual(adapter._pool_maxsize, 12)
+        with override_settings(GCS_HTTP_POOL_SIZE=40):
+            self.assertEqual(self.registry.pool_size(), 40)
+
+    def test_reset_after_fork(self):
+        client = self.registry.client()
+        storage = self.registry.storage('test', 'physionet.storage.MediaStorage')
+        with mock.patch('os.getpid', return_value=os.getpid() + 1):
+            self.assertIsNot(self.registry.client(), client)
+            self.assertIsNot(self.registry.storage('test', 'physionet.storage.MediaStorage'), storage)
+
+
+class TestGCSUsageCache(TestCase):
+    def setUp(self):
+        caches['shared'].clear()
+        self.addCleanup(caches['shared'].clear)
+        self.calls = 0
+
+    def compute(self, usage):
+        def compute():
+            self.calls += 1
+            return usage
+        return compute
+
+    def test_usage_is_cached(self):
+        usage_cache = GCSUsageCache()
+        self.assertEqual(usage_cache.get('bucket/project/', self.compute((100, 2))), (100, 2))
+        self.assertEqual(usage_cache.get('bucket/project/', self.compute((0, 0))), (100, 2))
+        self.assertEqual(self.calls, 1)
+
+    def test_add_updates_containing_prefixes(self):
+        usage_cache = GCSUsageCache()
+        usage_cache.get('bucket/project/', self.compute((100, 2)))
+        usage_cache.get('bucket/project/sub/', self.compute((40, 1)))
+        usage_cache.get('bucket/other/', self.compute((7, 1)))
+
+        usage_cache.add('bucket/project/sub/file.txt', 10, 1)
+        usage_cache.add('bucket/project/old.txt', -30, -1)
+
+        self.assertEqual(usage_cache.get('bucket/project/', self.compute(None)), (80, 2))
+        self.assertEqual(usage_cache.get('bucket/project/sub/', self.compute(None)), (50, 2))
+        self.assertEqual(usage_cache.get('bucket/other/', self.compute(None)), (7, 1))
+        self.assertEqual(self.calls, 3)
+
+    def test_invalidate(self):
+        usage_cache = GCSUsageCache()
+        usage_cache.get('bucket/project/', self.compute((100, 2)))
+        usage_cache.invalidate('bucket/project/sub/')
+        self.assertEqual(usage_cache.get('bucket/project/', self.compute((5, 1))), (5, 1))
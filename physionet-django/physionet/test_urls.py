@@ -9,6 +9,7 @@
 from django.urls import URLPattern, URLResolver, get_resolver
 from django.utils.regex_helper import normalize
 
+from project.models import PublishedProject
 from user.test_views import TestMixin
 
 
@@ -78,6 +79,11 @@ class TestURLs(TestMixin):
     def setUp(self):
         super().setUp()
 
+        # The file manifest of a project is normally recorded when it
+        # is published (and is needed for downloading folders)
+        for project in PublishedProject.objects.filter(deprecated_files=False):
+            project.files.make_file_manifest(project)
+
         # If this environment variable is set, we will store the
         # rendered contents of each view in this directory.  For
         # example, if PHYSIONET_TEST_HTML_DIR is '/tmp/example-html',
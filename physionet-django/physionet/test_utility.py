@@ -1,12 +1,11 @@
 import os
-import shutil
 import tempfile
-import unittest
 import zipfile
+from unittest import mock
 
-from django.test import TestCase
+from django.test import RequestFactory, TestCase, override_settings
 
-from physionet import utility
+from physionet import utility, zipwriter
 
 
 class TestZipFile(TestCase):
@@ -47,8 +46,6 @@ def test_zip(self):
             self.assertEqual(zf.namelist(),
                              ['one', 'three/abc', 'three/def', 'two'])
 
-    @unittest.skipIf(shutil.which('zipdetails') is None,
-                     "zipdetails is not installed")
     def test_zip_permissions(self):
         """
         Test that ZIP files not retain file permissions.
@@ -77,3 +74,135 @@ def test_zip_permissions(self):
         with open(zip_path2, 'rb') as zf2:
             contents2 = zf2.read()
         self.assertEqual(contents1, contents2)
+
+    def test_zip_contents(self):
+        """
+        Test that files are compressed or stored as appropriate, and
+        that files from a previous archive are reused.
+        """
+        with open(self.file1, 'w') as f:
+            f.write('hello world\n' * 1000)
+        data_file = os.path.join(self.files_dir, 'signal.dat')
+        with open(data_file, 'wb') as f:
+            f.write(b'\x00' * 1000)
+        os.chmod(self.file2, 0o755)
+
+        zip_path1 = os.path.join(self.tmp_dir.name, "files1.zip")
+        utility.zip_dir(zip_path1, self.files_dir, 'files-1.0')
+
+        with zipfile.ZipFile(zip_path1, 'r') as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(zf.read('files-1.0/one'), b'hello world\n' * 1000)
+            self.assertEqual(zf.getinfo('files-1.0/one').compress_type, zipfile.ZIP_DEFLATED)
+            self.assertEqual(zf.getinfo('files-1.0/signal.dat').compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(zf.getinfo('files-1.0/one').external_attr >> 16, 0o100644)
+            self.assertEqual(zf.getinfo('files-1.0/two').external_attr >> 16, 0o100755)
+
+        # Make a new version with one hard-linked file and one new file
+        new_dir = os.path.join(self.tmp_dir.name, 'files2')
+        os.mkdir(new_dir)
+        os.link(self.file1, os.path.join(new_dir, 'one'))
+        with open(os.path.join(new_dir, 'two'), 'w') as f:
+            f.write('new file')
+
+        zip_path2 = os.path.join(self.tmp_dir.name, "files2.zip")
+        with mock.patch.object(zipwriter, '_compress_file', wraps=zipwriter._compress_file) as compress:
+            utility.zip_dir(zip_path2, new_dir, 'files-2.0',
+                            previous=(zip_path1, self.files_dir, 'files-1.0'))
+        compress.assert_called_once_with(os.path.join(new_dir, 'two'), self.tmp_dir.name)
+
+        with zipfile.ZipFile(zip_path2, 'r') as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(zf.namelist(), ['files-2.0/one', 'files-2.0/two'])
+            self.assertEqual(zf.read('files-2.0/one'), b'hello world\n' * 1000)
+            self.assertEqual(zf.read('files-2.0/two'), b'new file')
+
+
+@override_settings(MEDIA_X_ACCEL_ALIAS=None)
+class TestServeFile(TestCase):
+    """
+    Test serving files without X-Accel-Redirect.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.data = bytes(range(256)) * 4096
+        self.path = os.path.join(self.tmp_dir.name, 'data.dat')
+        with open(self.path, 'wb') as f:
+            f.write(self.data)
+        self.factory = RequestFactory()
+
+    def get(self, **headers):
+        request = self.factory.get('/', **headers)
+        return utility.serve_file(self.path, request=request)
+
+    def test_full(self):
+        """
+        Test that the whole file is streamed in bounded chunks.
+        """
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Length'], str(len(self.data)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename=data.dat')
+        chunks = list(response.streaming_content)
+        response.close()
+        self.assertEqual(b''.join(chunks), self.data)
+        self.assertLessEqual(max(len(c) for c in chunks), utility.FILE_BLOCK_SIZE)
+
+    def test_range(self):
+        """
+        Test that a single range of the file can be requested.
+        """
+        response = self.get(HTTP_RANGE='bytes=1000-299999')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 1000-299999/{}'.format(len(self.data)))
+        chunks = list(response.streaming_content)
+        self.assertEqual(b''.join(chunks), self.data[1000:300000])
+        self.assertLessEqual(max(len(c) for c in chunks), utility.FILE_BLOCK_SIZE)
+
+        response = self.get(HTTP_RANGE='bytes={}-'.format(len(self.data)))
+        self.assertEqual(response.status_code, 416)
+
+        # If-Range that does not match the current version: send the
+        # whole file
+        response = self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"old"')
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+    def test_conditional(self):
+        """
+        Test that unchanged files are not sent again.
+        """
+        response = self.get()
+        response.close()
+        etag = response['ETag']
+        last_modified = response['Last-Modified']
+
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.get(HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+        response = self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), self.data[:10])
+
+    def test_directory(self):
+        """
+        Test that a directory listing is streamed.
+        """
+        response = utility.serve_file(self.tmp_dir.name + '/', allow_directory=True)
+        self.assertTrue(response.streaming)
+        self.assertIn(b'<a href="data.dat">data.dat</a>', b''.join(response.streaming_content))
+
+        with self.assertRaises(FileNotFoundError):
+            utility.serve_file(os.path.join(self.tmp_dir.name, 'missing') + '/', allow_directory=True)
+
+    def test_attachment_disposition(self):
+        """
+        Test that download file names are quoted and encoded.
+        """
+        self.assertEqual(utility.attachment_disposition('a b, c.zip'), 'attachment; filename="a b, c.zip"')
+        self.assertEqual(utility.attachment_disposition('a"b\\c.zip'), 'attachment; filename="a\\"b\\\\c.zip"')
+        self.assertEqual(utility.attachment_disposition('données.zip'),
+                         "attachment; filename*=utf-8''donn%C3%A9es.zip")
@@ -1,9 +1,10 @@
 import doctest
 
-from physionet import utility
+from physionet import gcs, utility
 
 # Automatically run documentation tests in these modules.
 DOCTEST_MODULES = [
+    gcs,
     utility,
 ]
 
@@ -1,19 +1,22 @@
 import logging
 import os
 import re
-import shutil
-import struct
-import subprocess
-import tempfile
 import urllib.parse
+import zipfile
 
 from django.conf import settings
-from django.http import HttpResponse, Http404, BadHeaderError
+from django.http import FileResponse, HttpResponse, Http404, BadHeaderError, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
 from django.utils.html import format_html
+from django.utils.http import http_date
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from physionet import zipwriter
 
 LOGGER = logging.getLogger(__name__)
 
+# Maximum number of bytes read at once when sending a file
+FILE_BLOCK_SIZE = 256 * 1024
+
 CONTENT_TYPE = {
     '.html': 'text/html',
     '.htm': 'text/html',
@@ -100,13 +103,18 @@ def _file_x_accel_path(file_path):
             return media_alias + file_path[len(media_root):]
 
 
-def serve_file(file_path, attach=True, allow_directory=False, sandbox=True):
+def serve_file(file_path, attach=True, allow_directory=False, sandbox=True, request=None):
     """
     Serve a file to download. file_path is the real path of the file on
     the server.
 
     If allow_directory is true and file_path ends with a slash, serve
     a simple HTML directory listing.
+
+    If the file cannot be served by the web server (using
+    X-Accel-Redirect), it is read and sent in chunks.  In that case,
+    if the request is given, conditional requests (If-None-Match,
+    If-Modified-Since) and single-range Range requests are supported.
     """
     accel_path = _file_x_accel_path(file_path)
     if accel_path:
@@ -115,15 +123,13 @@ def serve_file(file_path, attach=True, allow_directory=False, sandbox=True):
         response['Content-Type'] = ''
     else:
         if file_path.endswith('/') and allow_directory:
-            html = '<!DOCTYPE html><html><body><ul>\n'
-            for f in sorted(os.listdir(file_path)):
-                html += format_html('<li><a href="{0}">{0}</a></li>\n', f)
-            html += '</ul></body></html>'
-            return HttpResponse(html)
+            # List the directory now, so that errors are raised
+            # before the response is started
+            return StreamingHttpResponse(_directory_listing(sorted(os.listdir(file_path))))
         else:
-            with open(file_path, 'rb') as f:
-                response = HttpResponse(f.read())
-                response['Content-Type'] = file_content_type(file_path)
+            response = _file_response(request, file_path)
+            if response.status_code not in (200, 206):
+                return response
     base = os.path.basename(file_path)
     try:
         if sandbox:
@@ -137,6 +143,160 @@ def serve_file(file_path, attach=True, allow_directory=False, sandbox=True):
     return response
 
 
+def _directory_listing(names):
+    """
+    Generate a simple HTML listing of the files in a directory.
+    """
+    yield '<!DOCTYPE html><html><body><ul>\n'
+    for f in names:
+        yield format_html('<li><a href="{0}">{0}</a></li>\n', f)
+    yield '</ul></body></html>'
+
+
+def _file_response(request, file_path):
+    """
+    Return a response that streams the contents of a file, honoring
+    conditional and Range headers if a request is given.
+    """
+    f = open(file_path, 'rb')
+    try:
+        st = os.fstat(f.fileno())
+        size = st.st_size
+        etag = '"{:x}-{:x}"'.format(st.st_mtime_ns, size)
+        last_modified = http_date(st.st_mtime)
+
+        byte_range = None
+        if request is not None:
+            response = get_conditional_response(request, etag=etag, last_modified=int(st.st_mtime))
+            if response is not None:
+                f.close()
+                response['ETag'] = etag
+                response['Last-Modified'] = last_modified
+                return response
+
+            # Only send part of the file if it has not changed since
+            # the client received the other parts
+            if_range = request.headers.get('If-Range')
+            if not if_range or if_range in (etag, last_modified):
+                try:
+                    byte_range = parse_range_header(request.headers.get('Range'), size)
+                except ValueError:
+                    f.close()
+                    response = HttpResponse(status=416)
+                    response['Content-Range'] = 'bytes */{}'.format(size)
+                    return response
+    except BaseException:
+        f.close()
+        raise
+
+    content_type = file_content_type(file_path)
+    if byte_range:
+        start, stop = byte_range
+        response = StreamingHttpResponse(_iter_file_range(f, start, stop), status=206,
+                                         content_type=content_type)
+        response['Content-Range'] = 'bytes {}-{}/{}'.format(start, stop - 1, size)
+        response['Content-Length'] = str(stop - start)
+    else:
+        # FileResponse lets the WSGI server send the file itself (e.g.
+        # using sendfile) if it is able to
+        response = FileResponse(f, content_type=content_type)
+        response.block_size = FILE_BLOCK_SIZE
+        response['Content-Length'] = str(size)
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = last_modified
+    return response
+
+
+def _iter_file_range(f, start, stop):
+    """
+    Generate the bytes from start to stop of a file, in chunks of at
+    most FILE_BLOCK_SIZE bytes, then close the file.
+    """
+    with f:
+        f.seek(start)
+        remaining = stop - start
+        while remaining > 0:
+            data = f.read(min(remaining, FILE_BLOCK_SIZE))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+
+
+def parse_range_header(value, size):
+    """
+    Parse the value of an HTTP Range header.
+
+    Only a single range of bytes is supported.  Return a (start, stop)
+    pair (where stop is exclusive), or None if the header is missing
+    or cannot be parsed, in which case the whole resource should be
+    sent.  Raise ValueError if the range cannot be satisfied.
+
+    >>> parse_range_header('bytes=0-99', 1000)
+    (0, 100)
+    >>> parse_range_header('bytes=900-', 1000)
+    (900, 1000)
+    >>> parse_range_header('bytes=-100', 1000)
+    (900, 1000)
+    >>> parse_range_header('bytes=0-1,5-6', 1000)
+    >>> parse_range_header('bytes=1000-', 1000)
+    Traceback (most recent call last):
+    ...
+    ValueError: unsatisfiable range
+    """
+    m = re.fullmatch(r'\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*', value or '')
+    if not m or m.group(1) == m.group(2) == '':
+        return None
+    if m.group(1) == '':
+        start, stop = max(size - int(m.group(2)), 0), size
+    else:
+        start = int(m.group(1))
+        stop = size if m.group(2) == '' else min(int(m.group(2)) + 1, size)
+    if start >= stop:
+        raise ValueError('unsatisfiable range')
+    return start, stop
+
+
+def attachment_disposition(filename):
+    """
+    Return a Content-Disposition header value for downloading a file,
+    quoted and encoded so that the name may contain spaces, commas, or
+    non-ASCII characters.
+    """
+    try:
+        filename.encode('ascii')
+    except UnicodeEncodeError:
+        return "attachment; filename*=utf-8''{}".format(urllib.parse.quote(filename))
+    return 'attachment; filename="{}"'.format(filename.replace('\\', '\\\\').replace('"', r'\"'))
+
+
+def serve_zip_stream(request, stream, filename):
+    """
+    Serve a zipwriter.StoredZipStream as a file to download, honoring
+    a single-range Range header.
+    """
+    try:
+        byte_range = parse_range_header(request.headers.get('Range'), stream.size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = 'bytes */{}'.format(stream.size)
+        return response
+
+    if byte_range:
+        start, stop = byte_range
+        response = StreamingHttpResponse(stream.iter_range(start, stop), status=206,
+                                         content_type='application/zip')
+        response['Content-Range'] = 'bytes {}-{}/{}'.format(start, stop - 1, stream.size)
+    else:
+        start, stop = 0, stream.size
+        response = StreamingHttpResponse(stream.iter_range(), content_type='application/zip')
+    response['Content-Length'] = str(stop - start)
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = attachment_disposition(filename)
+    return response
+
+
 def sorted_tree_files(directory, *, prefix=''):
     """
     Return the recursive contents of a directory in order.
@@ -169,7 +329,7 @@ def sorted_tree_files(directory, *, prefix=''):
             yield path
 
 
-def zip_dir(zip_name, target_dir, enclosing_folder=''):
+def zip_dir(zip_name, target_dir, enclosing_folder='', previous=None, files=None, file_mode=None):
     """
     Recursively zip contents in a directory.
 
@@ -178,141 +338,47 @@ def zip_dir(zip_name, target_dir, enclosing_folder=''):
     zip_name : file name of the output zip file.
     target_dir : full path of directory to zip.
     enclosed_folder : enclosing folder name to write within zip file.
+    previous : optional (zip_name, target_dir, enclosing_folder) of an
+        earlier version of the same directory.  Files that are hard
+        links to files in the earlier version are copied from its zip
+        file rather than compressed again.
+    files : optional iterable of the relative paths of the files to
+        zip (default: all files within target_dir, in order.)
+    file_mode : optional function returning the mode to be recorded
+        for each file (see zipwriter.write_tree.)
     """
+    prefix = enclosing_folder + '/' if enclosing_folder else ''
 
-    # We use the 'zip' command here, rather than the zipfile library,
-    # because:
-    #  * zip supports multiple compression levels
-    #  * zip will automatically store files uncompressed if "deflate"
-    #    doesn't give any benefit
-
-    tmp_dir = None
-    try:
-        # If enclosing_folder is specified, temporarily create a
-        # symbolic link with that name that can be passed to 'zip'
-        if enclosing_folder:
-            tmp_dir = tempfile.mkdtemp()
-            os.symlink(os.path.realpath(target_dir),
-                       os.path.join(tmp_dir, enclosing_folder))
-            working_dir = tmp_dir
-            prefix = enclosing_folder + '/'
-        else:
-            working_dir = target_dir
-            prefix = ''
-
-        # Write the archive to a temporary file; delete that file if
-        # it already exists so that 'zip' won't try to update an
-        # existing archive
-        tmp_zip_name = zip_name + '.tmp'
+    previous_archive = None
+    if previous and os.path.isfile(previous[0]):
+        previous_zip_name, previous_dir, previous_folder = previous
         try:
-            os.remove(tmp_zip_name)
-        except FileNotFoundError:
-            pass
-
-        # Invoke 'zip' and pass the sorted list of files to its
-        # standard input
-        command = ('zip', '-q', '-X', '-9',
-                   os.path.realpath(tmp_zip_name), '-@')
-        with subprocess.Popen(command, cwd=working_dir,
-                              stdin=subprocess.PIPE) as proc:
-            for path in sorted_tree_files(target_dir, prefix=prefix):
-                # File names that include \n or \r (which could be
-                # used to trick 'zip' into reading files from
-                # elsewhere on the system) are silently ignored.
-                if '\n' not in path and '\r' not in path:
-                    proc.stdin.write(path.encode() + b'\n')
-            proc.stdin.close()
-            if proc.wait() != 0:
-                raise subprocess.CalledProcessError(proc.returncode, command)
-
-        # Fix up permission bits inside the zip file
-        normalize_zip_permissions(tmp_zip_name)
-
-        # Rename the temporary file to the target filename
+            previous_archive = zipwriter.PreviousArchive(
+                previous_zip_name, previous_dir,
+                previous_folder + '/' if previous_folder else '')
+        except (OSError, zipfile.BadZipFile) as exc:
+            LOGGER.warning('cannot read {}: {}'.format(previous_zip_name, exc))
+
+    # Write the archive to a temporary file, and rename it once it is
+    # complete
+    tmp_zip_name = zip_name + '.tmp'
+    try:
+        with open(tmp_zip_name, 'wb') as zip_file:
+            if files is None:
+                files = sorted_tree_files(target_dir)
+            zipwriter.write_tree(
+                zip_file, target_dir, files, prefix=prefix, previous=previous_archive,
+                spool_dir=os.path.dirname(os.path.abspath(zip_name)), file_mode=file_mode)
         os.rename(tmp_zip_name, zip_name)
-
     finally:
-        # Remove the temporary directory and/or temporary zip file
-        if tmp_dir:
-            shutil.rmtree(tmp_dir, ignore_errors=True)
+        if previous_archive:
+            previous_archive.close()
         try:
             os.remove(tmp_zip_name)
         except FileNotFoundError:
             pass
 
 
-def normalize_zip_permissions(zip_name):
-    """
-    Normalize file permissions in a ZIP archive.
-
-    If the archive was created by a program that stores the original
-    Unix file permissions, then for each file in the archive, the
-    permissions are changed to a default value:
-
-    - If the file is executable, it is set to mode 0755 (readable and
-      executable by everyone, writable by the owner).
-
-    - Otherwise, it it set to mode 0644 (readable by everyone,
-      writable by the owner).
-
-    The "DOS read-only bit" is also cleared.
-
-    This can be used to clean a ZIP file, if the original files that
-    were copied into the archive had inconsistent permissions.
-    (Published project files are stored read-only to avoid accidental
-    modification, but when creating an archive for distribution, the
-    permissions should be read/write, as this is more convenient for
-    the user.)
-
-    This relies on the zipdetails program, which is part of the perl
-    package in Debian.
-    """
-
-    command = ('zipdetails', zip_name)
-    try:
-        proc = subprocess.Popen(command, stdin=subprocess.DEVNULL,
-                                stdout=subprocess.PIPE)
-    except FileNotFoundError as exc:
-        LOGGER.warning('cannot execute zipdetails: {}'.format(exc))
-        return
-
-    # Use the output of zipdetails to identify the start of each entry
-    # in the central directory.  Once we've found an entry, patch the
-    # "external file attributes" field.
-
-    # This is a kludge, but the Python zipfile library does not
-    # provide an API to manipulate these bits, nor do the Info-Zip
-    # command line tools.
-
-    with proc, open(zip_name, 'r+b') as zip_file:
-        pattern = re.compile(b'([0-9A-Fa-f]+) CENTRAL HEADER')
-        for line in proc.stdout:
-            m = pattern.match(line)
-            if m:
-                offset = int(m.group(1), 16)
-                zip_file.seek(offset)
-                header = zip_file.read(42)
-                # [0:4] = signature
-                # [5] = original OS (3 = Unix)
-                # [38] = DOS attributes
-                # [40:41] = Unix file mode
-                if len(header) == 42 and header[0:4] == b'\x50\x4B\x01\x02':
-                    if header[5] == 3:
-                        (attrs,) = struct.unpack('<I', header[38:42])
-                        if attrs & (0o111 << 16):
-                            attrs = (attrs & 0xf000fffe) | (0o755 << 16)
-                        else:
-                            attrs = (attrs & 0xf000fffe) | (0o644 << 16)
-                        header = header[0:38] + struct.pack('<I', attrs)
-                        zip_file.seek(offset)
-                        zip_file.write(header)
-                else:
-                    raise Exception('cannot find central directory entry'
-                                    ' at {}'.format(offset))
-        if proc.wait() != 0:
-            raise subprocess.CalledProcessError(proc.returncode, command)
-
-
 def paginate(request, to_paginate, maximum):
     """
     Function to split an array into pages of a specified size.
@@ -0,0 +1,474 @@
+"""
+Writing ZIP archives of project files.
+"""
+
+import bisect
+import collections
+import concurrent.futures
+import os
+import struct
+import tempfile
+import time
+import zipfile
+import zlib
+
+from django.conf import settings
+
+# Files with these extensions are usually compressed already, so they
+# are stored in the archive without trying to compress them.
+STORED_EXTENSIONS = frozenset({
+    '.7z', '.bz2', '.dat', '.gif', '.gz', '.jpeg', '.jpg', '.mp3', '.mp4',
+    '.npz', '.png', '.tgz', '.xz', '.zip', '.zst',
+})
+
+# Compression level used for other files (equivalent to 'zip -9')
+COMPRESSION_LEVEL = 9
+
+# Size of the buffer used for reading and copying files
+BUFFER_SIZE = 1024 * 1024
+
+# Compressed data smaller than this is kept in memory until it is
+# written to the archive, rather than in a temporary file
+SPOOL_SIZE = 8 * 1024 * 1024
+
+ZIP64_LIMIT = 0xffffffff
+ZIP64_COUNT_LIMIT = 0xffff
+
+LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+CENTRAL_HEADER = struct.Struct('<4s4B4H3L5H2L')
+END_RECORD = struct.Struct('<4s4H2LH')
+ZIP64_END_RECORD = struct.Struct('<4sQ2H2L4Q')
+ZIP64_END_LOCATOR = struct.Struct('<4sLQL')
+
+# General purpose flag: file name is encoded in UTF-8
+FLAG_UTF8 = 0x800
+
+
+def dos_date_time(timestamp):
+    """
+    Convert a Unix timestamp into MS-DOS (date, time) fields, in
+    local time.
+    """
+    year, month, day, hour, minute, second = time.localtime(timestamp)[:6]
+    if year < 1980:
+        year, month, day, hour, minute, second = 1980, 1, 1, 0, 0, 0
+    return ((year - 1980) << 9 | month << 5 | day,
+            hour << 11 | minute << 5 | second // 2)
+
+
+def external_attributes(st_mode):
+    """
+    Return the external file attributes for a regular file.
+
+    Permissions are normalized, so that the archive does not depend on
+    the permissions of the original files: executable files are given
+    mode 0755 and other files mode 0644.
+    """
+    mode = 0o100755 if st_mode & 0o111 else 0o100644
+    return mode << 16
+
+
+class ZipEntry:
+    """
+    Description of one file in a ZIP archive.
+    """
+    def __init__(self, name, mtime, st_mode, crc, compress_type, compress_size, file_size):
+        self.name = name
+        self.mtime = mtime
+        self.st_mode = st_mode
+        self.crc = crc
+        self.compress_type = compress_type
+        self.compress_size = compress_size
+        self.file_size = file_size
+        self.header_offset = None
+
+
+def local_header(entry):
+    """
+    Return the local file header that precedes the data of a member.
+    """
+    name = entry.name.encode()
+    flags = 0 if name.isascii() else FLAG_UTF8
+    date, time_ = dos_date_time(entry.mtime)
+    zip64 = entry.compress_size >= ZIP64_LIMIT or entry.file_size >= ZIP64_LIMIT
+
+    if zip64:
+        extra = struct.pack('<2H2Q', 1, 16, entry.file_size, entry.compress_size)
+        compress_size = file_size = ZIP64_LIMIT
+    else:
+        extra = b''
+        compress_size, file_size = entry.compress_size, entry.file_size
+
+    return LOCAL_HEADER.pack(
+        b'PK\x03\x04', _extract_version(entry, zip64), flags, entry.compress_type, time_, date,
+        entry.crc, compress_size, file_size, len(name), len(extra)) + name + extra
+
+
+def central_header(entry):
+    """
+    Return the central directory header of a member.
+    """
+    name = entry.name.encode()
+    flags = 0 if name.isascii() else FLAG_UTF8
+    date, time_ = dos_date_time(entry.mtime)
+
+    zip64_fields = []
+    file_size, compress_size, header_offset = entry.file_size, entry.compress_size, entry.header_offset
+    if file_size >= ZIP64_LIMIT:
+        zip64_fields.append(file_size)
+        file_size = ZIP64_LIMIT
+    if compress_size >= ZIP64_LIMIT:
+        zip64_fields.append(compress_size)
+        compress_size = ZIP64_LIMIT
+    if header_offset >= ZIP64_LIMIT:
+        zip64_fields.append(header_offset)
+        header_offset = ZIP64_LIMIT
+    if zip64_fields:
+        extra = struct.pack('<2H{}Q'.format(len(zip64_fields)), 1, 8 * len(zip64_fields), *zip64_fields)
+    else:
+        extra = b''
+
+    version = _extract_version(entry, bool(zip64_fields))
+    return CENTRAL_HEADER.pack(
+        b'PK\x01\x02', version, 3, version, 0, flags, entry.compress_type, time_, date,
+        entry.crc, compress_size, file_size, len(name), len(extra), 0, 0, 0,
+        external_attributes(entry.st_mode), header_offset) + name + extra
+
+
+def end_records(count, cd_offset, cd_size):
+    """
+    Return the records that follow the central directory.
+    """
+    records = b''
+    if count >= ZIP64_COUNT_LIMIT or cd_size >= ZIP64_LIMIT or cd_offset >= ZIP64_LIMIT:
+        zip64_end_offset = cd_offset + cd_size
+        records += ZIP64_END_RECORD.pack(
+            b'PK\x06\x06', ZIP64_END_RECORD.size - 12, 45, 45, 0, 0, count, count, cd_size, cd_offset)
+        records += ZIP64_END_LOCATOR.pack(b'PK\x06\x07', 0, zip64_end_offset, 1)
+
+    return records + END_RECORD.pack(
+        b'PK\x05\x06', 0, 0, min(count, ZIP64_COUNT_LIMIT), min(count, ZIP64_COUNT_LIMIT),
+        min(cd_size, ZIP64_LIMIT), min(cd_offset, ZIP64_LIMIT), 0)
+
+
+def _extract_version(entry, zip64):
+    if zip64:
+        return 45
+    return 20 if entry.compress_type == zipfile.ZIP_DEFLATED else 10
+
+
+class ZipWriter:
+    """
+    Write a ZIP archive sequentially to a file object.
+
+    The output only needs to support write(), so the archive may be
+    written to a pipe or a network stream.  ZIP64 extensions are used
+    when an archive or any of its members is too large for the
+    original format.
+
+    The caller supplies the CRC, sizes and (possibly compressed) data
+    of each member, so members can be compressed by other threads, or
+    copied verbatim from another archive.
+    """
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.offset = 0
+        self.entries = []
+
+    def _write(self, data):
+        self.fileobj.write(data)
+        self.offset += len(data)
+
+    def add(self, entry, chunks):
+        """
+        Add a member to the archive.
+
+        entry: a ZipEntry
+        chunks: iterable of bytes objects, whose total length must be
+            entry.compress_size
+        """
+        entry.header_offset = self.offset
+        self._write(local_header(entry))
+
+        written = 0
+        for chunk in chunks:
+            self._write(chunk)
+            written += len(chunk)
+        if written != entry.compress_size:
+            raise ValueError('{}: expected {} bytes of data, got {}'.format(
+                entry.name, entry.compress_size, written))
+
+        self.entries.append(entry)
+
+    def close(self):
+        """
+        Write the central directory.  This does not close the
+        underlying file object.
+        """
+        cd_offset = self.offset
+        for entry in self.entries:
+            self._write(central_header(entry))
+        self._write(end_records(len(self.entries), cd_offset, self.offset - cd_offset))
+
+
+class StoredZipStream:
+    """
+    A ZIP archive of uncompressed files, generated on demand.
+
+    Since the files are stored rather than compressed, and their CRCs
+    are known in advance, the size of the archive and the position of
+    every byte can be computed without reading the files.  Any range
+    of the archive can then be generated while holding only one
+    buffer in memory.
+
+    root: directory containing the files
+    files: iterable of (relative path, os.stat result, crc32) tuples
+    prefix: path of the directory within the archive
+    """
+    def __init__(self, root, files, prefix=''):
+        self.root = root
+        self.paths = []
+        self.entries = []
+        self.offsets = []
+
+        offset = 0
+        for path, stat, crc in files:
+            entry = ZipEntry(prefix + path, stat.st_mtime, stat.st_mode, crc, zipfile.ZIP_STORED,
+                             stat.st_size, stat.st_size)
+            entry.header_offset = offset
+            offset += len(local_header(entry)) + entry.file_size
+            self.paths.append(path)
+            self.entries.append(entry)
+            self.offsets.append(entry.header_offset)
+
+        self.cd_offset = offset
+        self.cd_size = sum(len(central_header(entry)) for entry in self.entries)
+        self.end = end_records(len(self.entries), self.cd_offset, self.cd_size)
+        self.size = self.cd_offset + self.cd_size + len(self.end)
+
+    def iter_range(self, start=0, stop=None):
+        """
+        Iterate over the bytes of the archive from start to stop
+        (exclusive.)
+        """
+        stop = self.size if stop is None else min(stop, self.size)
+        if start >= stop:
+            return
+
+        index = max(bisect.bisect_right(self.offsets, start) - 1, 0)
+        for path, entry in zip(self.paths[index:], self.entries[index:]):
+            if entry.header_offset >= stop:
+                return
+            header = local_header(entry)
+            yield from _slice(header, entry.header_offset, start, stop)
+
+            data_offset = entry.header_offset + len(header)
+            if data_offset + entry.file_size <= start or data_offset >= stop:
+                continue
+            skip = max(start - data_offset, 0)
+            size = min(stop - data_offset, entry.file_size) - skip
+            with open(os.path.join(self.root, path), 'rb') as f:
+                f.seek(skip)
+                for chunk in _read_chunks(f, size):
+                    yield chunk
+                    size -= len(chunk)
+            if size:
+                raise ValueError('{}: file is shorter than expected'.format(path))
+
+        offset = self.cd_offset
+        if offset < stop:
+            for entry in self.entries:
+                header = central_header(entry)
+                yield from _slice(header, offset, start, stop)
+                offset += len(header)
+                if offset >= stop:
+                    return
+        yield from _slice(self.end, offset, start, stop)
+
+
+def _slice(data, offset, start, stop):
+    """
+    Yield the part of data (located at offset in the archive) that
+    lies between start and stop.
+    """
+    if offset + len(data) > start and offset < stop:
+        yield data[max(start - offset, 0):stop - offset]
+
+
+def _read_chunks(fileobj, size=None):
+    """Iterate over the contents of a file, or the next size bytes."""
+    while size is None or size > 0:
+        chunk = fileobj.read(BUFFER_SIZE if size is None else min(BUFFER_SIZE, size))
+        if not chunk:
+            break
+        if size is not None:
+            size -= len(chunk)
+        yield chunk
+
+
+def _compress_file(path, spool_dir):
+    """
+    Compute the CRC of a file and, unless its extension is listed in
+    STORED_EXTENSIONS, compress it.
+
+    Returns (crc, file size, compressed size, spool), where spool is a
+    temporary file containing the deflated data, or None if the file
+    should be stored without compression.
+    """
+    crc = 0
+    size = 0
+    compress = os.path.splitext(path)[1].lower() not in STORED_EXTENSIONS
+    spool = None
+    if compress:
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE, dir=spool_dir)
+        compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+
+    with open(path, 'rb') as f:
+        for chunk in _read_chunks(f):
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+            if spool:
+                spool.write(compressor.compress(chunk))
+    if spool:
+        spool.write(compressor.flush())
+        # As with 'zip', store the file if compression does not
+        # make it smaller
+        if spool.tell() >= size:
+            spool.close()
+            spool = None
+        else:
+            compress_size = spool.tell()
+            spool.seek(0)
+            return crc, size, compress_size, spool
+    return crc, size, size, None
+
+
+class PreviousArchive:
+    """
+    An existing archive of an earlier version of the same files.
+
+    Members of the archive can be copied into a new archive without
+    being compressed again, if the corresponding file in the new
+    version is a hard link to the file in the earlier version.
+
+    zip_name: path of the existing archive
+    target_dir: directory containing the files of the earlier version
+    prefix: path of that directory within the archive
+    """
+    def __init__(self, zip_name, target_dir, prefix=''):
+        self.fileobj = open(zip_name, 'rb')
+        self.mtime_ns = os.fstat(self.fileobj.fileno()).st_mtime_ns
+        self.target_dir = target_dir
+        self.prefix = prefix
+        with zipfile.ZipFile(self.fileobj) as zf:
+            self.members = {info.filename: info for info in zf.infolist()}
+
+    def close(self):
+        self.fileobj.close()
+
+    def find(self, path, stat):
+        """
+        Find the member that holds the same data as the given file.
+
+        path: relative path of the file
+        stat: os.stat result of the file
+
+        Returns a ZipInfo object, or None.
+        """
+        info = self.members.get(self.prefix + path)
+        if (info is None or info.file_size != stat.st_size
+                or info.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED)
+                or stat.st_mtime_ns > self.mtime_ns):
+            return None
+        try:
+            old_stat = os.stat(os.path.join(self.target_dir, path))
+        except OSError:
+            return None
+        if (old_stat.st_dev, old_stat.st_ino) != (stat.st_dev, stat.st_ino):
+            return None
+        return info
+
+    def read_member(self, info):
+        """
+        Iterate over the raw (compressed) data of a member.
+        """
+        self.fileobj.seek(info.header_offset)
+        header = LOCAL_HEADER.unpack(self.fileobj.read(LOCAL_HEADER.size))
+        if header[0] != b'PK\x03\x04':
+            raise zipfile.BadZipFile('Bad local file header for {}'.format(info.filename))
+        name_length, extra_length = header[-2:]
+        self.fileobj.seek(name_length + extra_length, os.SEEK_CUR)
+        return _read_chunks(self.fileobj, info.compress_size)
+
+
+def write_tree(fileobj, target_dir, files, prefix='', previous=None, threads=None, spool_dir=None,
+               file_mode=None):
+    """
+    Write a ZIP archive of files within a directory.
+
+    Files are compressed in parallel by a pool of threads (zlib
+    releases the GIL while compressing), and written to the archive
+    in the given order.
+
+    fileobj: file object to which the archive is written
+    target_dir: directory containing the files
+    files: relative paths of the files to be archived
+    prefix: path of the directory within the archive
+    previous: a PreviousArchive whose members may be reused
+    threads: number of files compressed in parallel (default:
+        ZIP_THREADS)
+    spool_dir: directory for temporary files holding compressed data
+    file_mode: function that returns the mode to be recorded for a
+        file, given its full path and os.stat result (default: the
+        file's current mode)
+    """
+    threads = threads or settings.ZIP_THREADS
+    writer = ZipWriter(fileobj)
+
+    def prepare(path):
+        full_path = os.path.join(target_dir, path)
+        stat = os.stat(full_path)
+        mode = file_mode(full_path, stat) if file_mode else stat.st_mode
+        info = previous.find(path, stat) if previous else None
+        if info:
+            return stat, mode, info.CRC, info.compress_type, info.compress_size, info
+        crc, size, compress_size, spool = _compress_file(full_path, spool_dir)
+        if spool:
+            return stat, mode, crc, zipfile.ZIP_DEFLATED, compress_size, spool
+        return stat, mode, crc, zipfile.ZIP_STORED, size, None
+
+    def add(path, prepared):
+        stat, mode, crc, compress_type, compress_size, data = prepared
+        full_path = os.path.join(target_dir, path)
+        entry = ZipEntry(prefix + path, stat.st_mtime, mode, crc, compress_type,
+                         compress_size, stat.st_size)
+        if isinstance(data, zipfile.ZipInfo):
+            writer.add(entry, previous.read_member(data))
+        elif data is not None:
+            with data:
+                writer.add(entry, _read_chunks(data))
+        else:
+            with open(full_path, 'rb') as f:
+                writer.add(entry, _read_chunks(f, compress_size))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as pool:
+        pending = collections.deque()
+        try:
+            for path in files:
+                pending.append((path, pool.submit(prepare, path)))
+                if len(pending) >= threads * 2:
+                    done_path, future = pending.popleft()
+                    add(done_path, future.result())
+            while pending:
+                done_path, future = pending.popleft()
+                add(done_path, future.result())
+        finally:
+            for _, future in pending:
+                future.cancel()
+                if not future.cancelled() and not future.exception():
+                    data = future.result()[-1]
+                    if hasattr(data, 'close'):
+                        data.close()
+
+    writer.close()
+    return writer.entries
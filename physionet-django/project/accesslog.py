@@ -0,0 +1,203 @@
+"""
+Buffered recording of project access logs.
+
+Each time a user views a project's files (or requests a signed URL),
+the access is recorded as a Log.  Accesses by the same user to the
+same project (and with the same data) are merged into a single Log,
+as long as each one is within LOG_TIMEDELTA minutes of the previous
+one; the Log records the first and last access times and the number
+of accesses.
+
+Rather than updating the database on every request, accesses are
+collected in memory and written in bulk every
+ACCESS_LOG_FLUSH_INTERVAL seconds, by a timer thread (or sooner, if
+ACCESS_LOG_MAX_PENDING different log entries are waiting.)  If the
+timer thread cannot run (for example, if uWSGI is not configured with
+enable-threads), pending accesses are written by the next request
+after the interval has elapsed.  If ACCESS_LOG_FLUSH_INTERVAL is zero,
+each access is written immediately.
+
+If writing fails, the accesses are kept and retried at the next flush.
+Pending accesses are also written when the process exits normally;
+accesses may be lost if the process is killed.
+"""
+
+import atexit
+import datetime
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+LOGGER = logging.getLogger(__name__)
+
+
+class _Session:
+    """
+    A sequence of accesses that will be recorded as a single Log.
+    """
+    __slots__ = ('first', 'last', 'count')
+
+    def __init__(self, time):
+        self.first = self.last = time
+        self.count = 1
+
+
+class AccessLogRecorder:
+    """
+    Collects accesses in memory, and writes them to the database.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (category, content type ID, object ID, user ID, data) ->
+        # list of _Sessions, oldest first
+        self._pending = {}
+        self._timer = None
+        # time.monotonic() value after which pending accesses are
+        # written by the next call to record()
+        self._flush_due = None
+
+    def record(self, category, project, user, data=''):
+        """
+        Record an access by a user to a project.
+        """
+        from project.models import Log
+
+        now = timezone.now()
+        # The category as it is stored in the database
+        category = Log._meta.get_field('category').get_prep_value(category)
+        key = (category, ContentType.objects.get_for_model(project).id, project.id, user.id, data)
+        max_gap = datetime.timedelta(minutes=settings.LOG_TIMEDELTA)
+        interval = settings.ACCESS_LOG_FLUSH_INTERVAL
+
+        with self._lock:
+            sessions = self._pending.setdefault(key, [])
+            if sessions and now - sessions[-1].last < max_gap:
+                sessions[-1].last = now
+                sessions[-1].count += 1
+            else:
+                sessions.append(_Session(now))
+            flush_now = (interval <= 0
+                         or len(self._pending) >= settings.ACCESS_LOG_MAX_PENDING
+                         or (self._flush_due is not None and time.monotonic() >= self._flush_due))
+            if not flush_now:
+                self._schedule_flush(interval)
+
+        if flush_now:
+            self._flush_quietly()
+
+    def _schedule_flush(self, interval):
+        # Must be called with self._lock held
+        if self._flush_due is None:
+            self._flush_due = time.monotonic() + interval
+        if self._timer is None:
+            self._timer = threading.Timer(interval, self._flush_from_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_quietly(self):
+        try:
+            self.flush()
+        except Exception:
+            LOGGER.exception('unable to write access logs')
+
+    def _flush_from_timer(self):
+        try:
+            self._flush_quietly()
+        finally:
+            # The timer thread has its own database connections
+            connections.close_all()
+
+    def flush(self):
+        """
+        Write all pending accesses to the database.
+
+        If this fails, the accesses remain pending (merged with any
+        that were recorded in the meantime) and the exception is
+        raised.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flush_due = None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if pending:
+            try:
+                self._write(pending)
+            except Exception:
+                self._requeue(pending)
+                raise
+
+    def _requeue(self, pending):
+        """
+        Return accesses that could not be written to the pending set.
+        """
+        max_gap = datetime.timedelta(minutes=settings.LOG_TIMEDELTA)
+        with self._lock:
+            for key, sessions in pending.items():
+                newer = self._pending.get(key)
+                if newer and newer[0].first - sessions[-1].last < max_gap:
+                    sessions[-1].last = newer[0].last
+                    sessions[-1].count += newer[0].count
+                    newer = newer[1:]
+                self._pending[key] = sessions + (newer or [])
+            self._schedule_flush(max(settings.ACCESS_LOG_FLUSH_INTERVAL, 1))
+
+    def _write(self, pending):
+        from project.models import Log
+
+        max_gap = datetime.timedelta(minutes=settings.LOG_TIMEDELTA)
+        earliest = min(sessions[0].first for sessions in pending.values())
+
+        with transaction.atomic():
+            # The most recent existing Log for each key, if it may be
+            # continued by the pending accesses
+            latest = {}
+            candidates = Log.objects.select_for_update().filter(
+                last_access_datetime__gt=earliest - max_gap,
+                user_id__in={key[3] for key in pending},
+                object_id__in={key[2] for key in pending},
+            ).order_by('creation_datetime')
+            for log in candidates:
+                latest[log.category, log.content_type_id, log.object_id, log.user_id, log.data] = log
+
+            updated = []
+            created = []
+            for key, sessions in pending.items():
+                log = latest.get(key)
+                if log and log.last_access_datetime + max_gap > sessions[0].first:
+                    log.count = F('count') + sessions[0].count
+                    log.last_access_datetime = max(log.last_access_datetime, sessions[0].last)
+                    updated.append(log)
+                    sessions = sessions[1:]
+                category, content_type_id, object_id, user_id, data = key
+                for session in sessions:
+                    created.append((Log(category=category, content_type_id=content_type_id,
+                                        object_id=object_id, user_id=user_id, data=data,
+                                        count=session.count), session))
+
+            Log.objects.bulk_update(updated, ['count', 'last_access_datetime'])
+            logs = Log.objects.bulk_create([log for log, _ in created])
+            # bulk_create sets the auto_now fields to the current time
+            for log, (_, session) in zip(logs, created):
+                log.creation_datetime = session.first
+                log.last_access_datetime = session.last
+            Log.objects.bulk_update(logs, ['creation_datetime', 'last_access_datetime'])
+
+
+recorder = AccessLogRecorder()
+atexit.register(recorder._flush_quietly)
+
+
+def record_access(category, project, user, data=''):
+    """
+    Record an access by a user to a project, as a Log of the given
+    category.  See AccessLogRecorder.
+    """
+    recorder.record(category, project, user, data)
@@ -53,6 +53,14 @@ class PublishedProjectAdmin(admin.ModelAdmin):
         PublishedAuthorInline]
     list_display = ('title', 'version', 'is_legacy', 'publish_datetime')
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # The search vector and citations include the title, DOI and
+        # authors, which may have been changed by the form or the
+        # inlines
+        form.instance.update_search_vector()
+        form.instance.update_citations()
+
 
 class PublishedAffiliationInline(admin.TabularInline):
     """
@@ -3,3 +3,10 @@
 
 class ProjectConfig(AppConfig):
     name = 'project'
+
+    def ready(self):
+        from project.authorization import access
+        from project import pagecache
+
+        pagecache.connect_signals()
+        access.connect_signals()
@@ -1,10 +1,17 @@
+import uuid
 from datetime import datetime
 
-from django.db.models import Q
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q, Subquery
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
 
 from events.models import Event, EventDataset
 from project.authorization.events import has_access_to_event_dataset
 from project.models import AccessPolicy, DUASignature, DataAccessRequest, PublishedProject
+from project.pagecache import page_revision
 from user.models import Training, TrainingType
 
 
@@ -86,6 +93,180 @@ def get_accessible_projects(user):
     return PublishedProject.objects.filter(query).distinct()
 
 
+class ProjectAccess:
+    """
+    A user's entitlements for a published project.
+
+    The signed DUA, accepted access request and required training
+    checks are resolved together in a single query, the first time
+    any of them is needed (no query is needed for open projects.)
+
+    If PROJECT_ACCESS_CACHE_TIMEOUT is set, the result is also kept in
+    the shared cache for that many seconds (or until a training or
+    access request that it depends on expires, if sooner), so that it
+    can be reused by subsequent requests (for example, when
+    downloading many files.)  The cache key includes a revision that
+    is discarded whenever the user's DUA signatures, access requests
+    or trainings change (see connect_signals), and the revision of the
+    project's pages, which changes along with its required trainings.
+    """
+    def __init__(self, project, user):
+        self.project = project
+        self.user = user
+        self._entitlements = None
+
+    @staticmethod
+    def _user_revision_key(user_id):
+        return 'project-access-revision:{}'.format(user_id)
+
+    @classmethod
+    def cache_key(cls, project, user):
+        cache = caches['shared']
+        revision_key = cls._user_revision_key(user.pk)
+        revision = cache.get(revision_key)
+        if revision is None:
+            cache.add(revision_key, uuid.uuid4().hex, None)
+            revision = cache.get(revision_key)
+        return 'project-access:{}:{}:{}:{}'.format(project.pk, user.pk, revision, page_revision(project))
+
+    @classmethod
+    def for_request(cls, request, project):
+        """
+        Return the ProjectAccess object for the current user, shared by
+        all checks within the same request.
+        """
+        if not hasattr(request, '_project_access'):
+            request._project_access = {}
+        if project.pk not in request._project_access:
+            request._project_access[project.pk] = cls(project, request.user)
+        return request._project_access[project.pk]
+
+    @classmethod
+    def invalidate(cls, user_id):
+        """
+        Discard a user's cached entitlements for all projects, after
+        they have changed.
+
+        The revision is discarded immediately, and again when the
+        current transaction (if any) is committed, so that entitlements
+        queried from data that was not yet committed are not kept.
+        """
+        cache = caches['shared']
+        key = cls._user_revision_key(user_id)
+        cache.delete(key)
+        transaction.on_commit(lambda: cache.delete(key))
+
+    def _query_entitlements(self):
+        user = self.user
+        valid_training = Training.objects.get_valid().filter(user=user, training_type=OuterRef('pk'))
+        missing_training = self.project.required_trainings.filter(~Exists(valid_training))
+        expiring_training = Training.objects.get_valid().filter(
+            user=user,
+            training_type__in=self.project.required_trainings.all(),
+            training_type__valid_duration__isnull=False,
+        ).order_by('valid_datetime')
+        accepted_requests = DataAccessRequest.objects.get_active(
+            project=OuterRef('pk'),
+            requester=user,
+            status=DataAccessRequest.ACCEPT_REQUEST_VALUE,
+        )
+        return PublishedProject.objects.filter(pk=self.project.pk).values(
+            has_signed_dua=Exists(DUASignature.objects.filter(project=OuterRef('pk'), user=user)),
+            has_accepted_access_request=Exists(accepted_requests),
+            requires_training=Exists(self.project.required_trainings.all()),
+            has_required_training=~Exists(missing_training),
+            training_expires=Subquery(expiring_training.values('valid_datetime')[:1]),
+            access_request_expires=Subquery(
+                accepted_requests.filter(duration__isnull=False).order_by('valid_until').values('valid_until')[:1]),
+        ).get()
+
+    def _cached_entitlements(self):
+        cache = caches['shared']
+        key = self.cache_key(self.project, self.user)
+        entitlements = cache.get(key)
+        if entitlements is None:
+            entitlements = self._query_entitlements()
+            timeout = settings.PROJECT_ACCESS_CACHE_TIMEOUT
+            for expires in (entitlements.pop('training_expires'), entitlements.pop('access_request_expires')):
+                if expires is not None:
+                    timeout = min(timeout, (expires - timezone.now()).total_seconds())
+            if timeout >= 1:
+                cache.set(key, entitlements, int(timeout))
+        return entitlements
+
+    @property
+    def entitlements(self):
+        """
+        Dictionary of the user's entitlements for the project.
+        """
+        if self._entitlements is None:
+            if not self.user.is_authenticated:
+                self._entitlements = {
+                    'has_signed_dua': False,
+                    'has_accepted_access_request': False,
+                    'requires_training': self.project.required_trainings.exists(),
+                    'has_required_training': False,
+                }
+            elif settings.PROJECT_ACCESS_CACHE_TIMEOUT:
+                self._entitlements = self._cached_entitlements()
+            else:
+                self._entitlements = self._query_entitlements()
+        return self._entitlements
+
+    @property
+    def has_signed_dua(self):
+        return self.entitlements['has_signed_dua']
+
+    @property
+    def has_accepted_access_request(self):
+        return self.entitlements['has_accepted_access_request']
+
+    @property
+    def requires_training(self):
+        return self.entitlements['requires_training']
+
+    @property
+    def has_required_training(self):
+        return self.entitlements['has_required_training']
+
+    def can_access(self):
+        """
+        Check if the project is accessible by the user (see
+        can_access_project.)
+        """
+        project = self.project
+        user = self.user
+        if project.deprecated_files:
+            return False
+
+        if project.access_policy == AccessPolicy.OPEN:
+            return True
+        elif project.access_policy == AccessPolicy.RESTRICTED:
+            return user.is_authenticated and self.has_signed_dua
+        elif project.access_policy == AccessPolicy.CREDENTIALED:
+            return (
+                user.is_authenticated
+                and user.is_credentialed
+                and self.has_signed_dua
+                and self.has_required_training
+            )
+        elif project.access_policy == AccessPolicy.CONTRIBUTOR_REVIEW:
+            return (
+                user.is_authenticated
+                and user.is_credentialed
+                and self.has_accepted_access_request
+                and self.has_required_training
+            )
+        return False
+
+    def can_view_files(self):
+        """
+        Check if the project files are directly accessible by the user
+        (see can_view_project_files.)
+        """
+        return self.can_access() and self.project.allow_file_downloads
+
+
 def can_access_project(project, user):
     """
     Checks if the project is accessible by the user
@@ -94,38 +275,7 @@ def can_access_project(project, user):
     This function only checks access to the project in general, users might still not be able to access the files
     even if they can access the project.
     """
-    if project.deprecated_files:
-        return False
-
-    if project.access_policy == AccessPolicy.OPEN:
-        return True
-    elif project.access_policy == AccessPolicy.RESTRICTED:
-        return user.is_authenticated and DUASignature.objects.filter(project=project, user=user).exists()
-    elif project.access_policy == AccessPolicy.CREDENTIALED:
-        return (
-            user.is_authenticated
-            and user.is_credentialed
-            and DUASignature.objects.filter(project=project, user=user).exists()
-            and Training.objects.get_valid()
-            .filter(training_type__in=project.required_trainings.all(), user=user)
-            .count()
-            == project.required_trainings.count()
-        )
-    elif project.access_policy == AccessPolicy.CONTRIBUTOR_REVIEW:
-        return (
-            user.is_authenticated
-            and user.is_credentialed
-            and DataAccessRequest.objects.get_active(
-                project=project,
-                requester=user,
-                status=DataAccessRequest.ACCEPT_REQUEST_VALUE
-            ).exists()
-            and Training.objects.get_valid()
-            .filter(training_type__in=project.required_trainings.all(), user=user)
-            .count()
-            == project.required_trainings.count()
-        )
-    return False
+    return ProjectAccess(project, user).can_access()
 
 
 def can_view_project_files(project, user):
@@ -133,4 +283,23 @@ def can_view_project_files(project, user):
     Checks if the project files are  directly accessible by the user
     Currently used to allow direct file downloads and to show project files on the platform
     """
-    return can_access_project(project, user) and project.allow_file_downloads
+    return ProjectAccess(project, user).can_view_files()
+
+
+def _user_entitlements_changed(sender, instance, **kwargs):
+    ProjectAccess.invalidate(instance.user_id)
+
+
+def _access_request_changed(sender, instance, **kwargs):
+    ProjectAccess.invalidate(instance.requester_id)
+
+
+def connect_signals():
+    """
+    Discard cached entitlements when a DUA signature, training or
+    access request is created, reviewed, revoked or deleted.
+    """
+    for signal in (post_save, post_delete):
+        signal.connect(_user_entitlements_changed, sender=DUASignature)
+        signal.connect(_user_entitlements_changed, sender=Training)
+        signal.connect(_access_request_changed, sender=DataAccessRequest)
@@ -0,0 +1,198 @@
+"""
+Computing checksums of published project files.
+"""
+
+import concurrent.futures
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+
+from django.conf import settings
+
+# Size of the buffer used for reading files while hashing them
+HASH_BUFFER_SIZE = 1024 * 1024
+
+
+def file_sha256(path):
+    """
+    Return the hexadecimal SHA-256 digest of a file.
+    """
+    return file_digests(path)[0]
+
+
+def file_digests(path):
+    """
+    Return the hexadecimal SHA-256 digest and the CRC-32 of a file.
+    """
+    h = hashlib.sha256()
+    crc = 0
+    buf = bytearray(HASH_BUFFER_SIZE)
+    view = memoryview(buf)
+    with open(path, 'rb', buffering=0) as f:
+        while n := f.readinto(buf):
+            h.update(view[:n])
+            crc = zlib.crc32(view[:n], crc)
+    return h.hexdigest(), crc
+
+
+class DigestCache:
+    """
+    Persistent cache of file digests, keyed by inode.
+
+    Each entry records the device, inode number, size and modification
+    time of a file along with its SHA-256 digest and CRC-32 (which is
+    needed for building ZIP archives.)  A file whose inode,
+    size and modification time all match an entry is not hashed again.
+    Files that are hard-linked into a new project version keep their
+    inode and modification time, so only files that are new in that
+    version need to be read.
+
+    Each entry also records the last path at which the file was seen,
+    so that entries for files that have since been deleted can be
+    dropped when the cache is saved.
+
+    The cache is stored as a file of JSON lines.  If path is None, the
+    cache is only kept in memory.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self.modified = False
+
+        if path and os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.entries[(entry['dev'], entry['ino'])] = entry
+
+    @classmethod
+    def for_project(cls, slug):
+        """
+        Return the cache shared by all versions of a project, stored in
+        CHECKSUM_CACHE_DIR (by default, the 'checksum-cache' directory
+        within MEDIA_ROOT.)
+        """
+        cache_dir = settings.CHECKSUM_CACHE_DIR or os.path.join(settings.MEDIA_ROOT, 'checksum-cache')
+        return cls(os.path.join(cache_dir, slug + '.jsonl'))
+
+    def get(self, path, stat):
+        """
+        Return the cached (sha256, crc32) digests of the file at the
+        given absolute path, with the given os.stat result, or None if
+        the file has not been hashed.
+        """
+        entry = self.entries.get((stat.st_dev, stat.st_ino))
+        if (entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns
+                and 'crc32' in entry):
+            if entry.get('path') != path:
+                entry['path'] = path
+                self.modified = True
+            return entry['sha256'], entry['crc32']
+        return None
+
+    def set(self, path, stat, digests):
+        """
+        Record the (sha256, crc32) digests of the file at the given
+        absolute path, with the given os.stat result.
+        """
+        self.entries[(stat.st_dev, stat.st_ino)] = {
+            'dev': stat.st_dev,
+            'ino': stat.st_ino,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': digests[0],
+            'crc32': digests[1],
+            'path': path,
+        }
+        self.modified = True
+
+    def prune(self):
+        """
+        Drop entries for files that no longer exist at their recorded
+        path.
+        """
+        for key, entry in list(self.entries.items()):
+            try:
+                stat = os.stat(entry['path'])
+            except (KeyError, OSError):
+                stat = None
+            if stat is None or (stat.st_dev, stat.st_ino) != key:
+                del self.entries[key]
+                self.modified = True
+
+    def save(self, prune=False):
+        """
+        Write the cache to disk, replacing the previous contents.
+
+        If prune is true, entries for deleted files are dropped first.
+        """
+        if not self.path or not self.modified:
+            return
+        if prune:
+            self.prune()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(self.path), delete=False) as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry) + '\n')
+        os.replace(f.name, self.path)
+        self.modified = False
+
+
+def tree_digests(root, files, cache=None, processes=None):
+    """
+    Compute the SHA-256 digests and CRC-32s of files within a directory.
+
+    root: the directory containing the files
+    files: relative paths of the files to be hashed
+    cache: a DigestCache; files found in the cache are not read, and
+        the digests of all other files are added to it
+    processes: number of worker processes used to hash files that are
+        not cached (default: CHECKSUM_PROCESSES)
+
+    Returns a list of (relative path, os.stat result, (sha256, crc32))
+    tuples, in the same order as files.
+    """
+    cache = cache or DigestCache()
+    processes = processes or settings.CHECKSUM_PROCESSES
+
+    digests = {}
+    uncached = []
+    stats = {}
+    for f in files:
+        path = os.path.join(root, f)
+        stat = os.stat(path)
+        stats[f] = stat
+        digests[f] = cache.get(path, stat)
+        if digests[f] is None:
+            uncached.append(f)
+
+    paths = [os.path.join(root, f) for f in uncached]
+    if processes > 1 and len(paths) > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(processes, len(paths))) as pool:
+            results = pool.map(file_digests, paths)
+            for f, result in zip(uncached, results):
+                digests[f] = result
+    else:
+        for f, path in zip(uncached, paths):
+            digests[f] = file_digests(path)
+
+    for f, path in zip(uncached, paths):
+        cache.set(path, stats[f], digests[f])
+    cache.save(prune=True)
+
+    return [(f, stats[f], digests[f]) for f in stats]
+
+
+def tree_sha256(root, files, cache=None, processes=None):
+    """
+    Compute the SHA-256 digests of files within a directory.
+
+    Returns a list of (relative path, digest) pairs, in the same order
+    as files.  See tree_digests.
+    """
+    return [(f, digests[0]) for f, _, digests in tree_digests(root, files, cache, processes)]
@@ -0,0 +1,199 @@
+"""
+Rendering of project citations.
+
+A project's citation text (in each of the styles shown on the project
+page), BibTeX entry and RIS record are all produced from the same
+list of author names.  The names are loaded once, and the results are
+stored for published projects (see PublishedProject.update_citations)
+so that they don't need to be rendered on every request.
+"""
+
+from collections import namedtuple
+
+from django.utils.html import format_html
+
+CITATION_STYLES = ('MLA', 'APA', 'Chicago', 'Harvard', 'Vancouver')
+
+_STYLE_FORMATS = {
+    'MLA': (
+        '{author}. "{title}" (version {version}). <i>{platform_name}</i> ({year})',
+        ', <a href="https://doi.org/{doi}">https://doi.org/{doi}</a>.',
+    ),
+    'APA': (
+        '{author} ({year}). {title} (version {version}). <i>{platform_name}</i>',
+        '. <a href="https://doi.org/{doi}">https://doi.org/{doi}</a>.',
+    ),
+    'Chicago': (
+        '{author}. "{title}" (version {version}). <i>{platform_name}</i> ({year})',
+        '. <a href="https://doi.org/{doi}">https://doi.org/{doi}</a>.',
+    ),
+    'Harvard': (
+        "{author} ({year}) '{title}' (version {version}), <i>{platform_name}</i>",
+        ". Available at: <a href='https://doi.org/{doi}'>https://doi.org/{doi}</a>.",
+    ),
+    'Vancouver': (
+        '{author}. {title} (version {version}). {platform_name}. {year}',
+        '. Available from: <a href="https://doi.org/{doi}">https://doi.org/{doi}</a>.',
+    ),
+}
+
+# Characters that must be escaped in BibTeX field values
+_BIBTEX_SPECIAL = {c: '\\' + c for c in '&%$#_{}'}
+_BIBTEX_SPECIAL['\\'] = '\\textbackslash{}'
+_BIBTEX_SPECIAL['~'] = '\\textasciitilde{}'
+_BIBTEX_SPECIAL['^'] = '\\textasciicircum{}'
+
+
+class CitationAuthor(namedtuple('CitationAuthor', ('first_names', 'last_name'))):
+    """
+    The name of an author, as it appears in citations.
+    """
+    __slots__ = ()
+
+    def get_full_name(self, reverse=False):
+        """
+        Return the full name, as 'firstnames lastname', or as
+        'lastname, firstnames' if reverse is true.
+
+        >>> CitationAuthor('Ada M.', 'Lovelace').get_full_name(reverse=True)
+        'Lovelace, Ada M.'
+        """
+        if reverse:
+            return ', '.join([self.last_name, self.first_names])
+        return ' '.join([self.first_names, self.last_name])
+
+    def initialed_name(self, commas=True, periods=True):
+        """
+        Return the last name followed by initials.
+
+        >>> CitationAuthor('Ada Mary', 'Lovelace').initialed_name()
+        'Lovelace, A. M.'
+        >>> CitationAuthor('Ada Mary', 'Lovelace').initialed_name(commas=False, periods=False)
+        'Lovelace A M'
+        """
+        final_string = '{}, {}'.format(self.last_name, ' '.join('{}.'.format(i[0]) for i in self.first_names.split()))
+        if not commas:
+            final_string = final_string.replace(',', '')
+        if not periods:
+            final_string = final_string.replace('.', '')
+        return final_string
+
+
+def _author_list(style, authors):
+    """
+    Format the list of authors for a citation style.
+    """
+    if not authors:
+        return ''
+    last = authors[-1]
+
+    if style == 'MLA':
+        if len(authors) == 1:
+            return authors[0].get_full_name(reverse=True)
+        if len(authors) == 2:
+            return authors[0].get_full_name(reverse=True) + ', and ' + last.get_full_name()
+        return authors[0].get_full_name(reverse=True) + ', et al'
+
+    if style == 'APA':
+        if len(authors) == 1:
+            return authors[0].initialed_name()
+        if len(authors) == 2:
+            return authors[0].initialed_name() + ', & ' + last.initialed_name()
+        if len(authors) > 20:
+            return ', '.join(a.initialed_name() for a in authors[0:19]) + ', ... ' + last.initialed_name()
+        return ', '.join(a.initialed_name() for a in authors[:-1]) + ', & ' + last.initialed_name()
+
+    if style == 'Chicago':
+        if len(authors) == 1:
+            return authors[0].get_full_name(reverse=True)
+        return ', '.join(a.get_full_name(reverse=True) for a in authors[:-1]) + ', and ' + last.get_full_name()
+
+    if style == 'Harvard':
+        if len(authors) == 1:
+            return authors[0].initialed_name()
+        return ', '.join(a.initialed_name() for a in authors[:-1]) + ', and ' + last.initialed_name()
+
+    if style == 'Vancouver':
+        return ', '.join(a.initialed_name(commas=False, periods=False) for a in authors)
+
+    raise ValueError('Unknown citation style: {}'.format(style))
+
+
+def render_citation(style, authors, title, version, year, doi, platform_name):
+    """
+    Return the citation text (as safe HTML) in one of the
+    CITATION_STYLES.
+
+    >>> authors = [CitationAuthor('Ada', 'Lovelace'), CitationAuthor('Charles', 'Babbage')]
+    >>> print(render_citation('APA', authors, 'Engine', '1.0', 1843, None, 'PhysioNet'))
+    Lovelace, A., &amp; Babbage, C. (1843). Engine (version 1.0). <i>PhysioNet</i>.
+    """
+    style_format, doi_format = _STYLE_FORMATS[style]
+    if doi:
+        style_format += doi_format
+    else:
+        style_format += '.'
+    return format_html(style_format, author=_author_list(style, authors), doi=doi, year=year,
+                       title=title, version=version, platform_name=platform_name)
+
+
+def render_citations(authors, title, version, year, doi, platform_name):
+    """
+    Return a dictionary of the citation text in each of the
+    CITATION_STYLES.
+    """
+    return {style: render_citation(style, authors, title, version, year, doi, platform_name)
+            for style in CITATION_STYLES}
+
+
+def _bibtex_escape(value):
+    """
+    >>> _bibtex_escape('50% of {x}')
+    '50\\\\% of \\\\{x\\\\}'
+    """
+    return ''.join(_BIBTEX_SPECIAL.get(c, c) for c in str(value))
+
+
+def render_bibtex(key, authors, title, version, year, doi, url, publisher):
+    """
+    Return a BibTeX entry for a project.
+
+    >>> print(render_bibtex('engine-1.0', [CitationAuthor('Ada', 'Lovelace')], 'Engine',
+    ...                     '1.0', 1843, '10.13026/abcd', 'https://example.org/', 'PhysioNet'))
+    @misc{engine-1.0,
+      author = {Lovelace, Ada},
+      title = {{Engine}},
+      version = {1.0},
+      publisher = {PhysioNet},
+      year = {1843},
+      doi = {10.13026/abcd},
+      url = {https://example.org/}
+    }
+    <BLANKLINE>
+    """
+    fields = [
+        ('author', ' and '.join(a.get_full_name(reverse=True) for a in authors)),
+        ('title', '{' + _bibtex_escape(title) + '}'),
+        ('version', version),
+        ('publisher', publisher),
+        ('year', year),
+        ('doi', doi),
+        ('url', url),
+    ]
+    lines = ['  {} = {{{}}}'.format(name, value if name == 'title' else _bibtex_escape(value))
+             for name, value in fields if value]
+    return '@misc{{{},\n{}\n}}\n'.format(key, ',\n'.join(lines))
+
+
+def render_ris(record_type, authors, title, version, year, doi, url, publisher):
+    """
+    Return an RIS record for a project.
+
+    >>> render_ris('DATA', [CitationAuthor('Ada', 'Lovelace')], 'Engine', None, 1843, None, None, '')
+    'TY  - DATA\\r\\nAU  - Lovelace, Ada\\r\\nTI  - Engine\\r\\nPY  - 1843\\r\\nER  - \\r\\n'
+    """
+    lines = [('TY', record_type)]
+    lines += [('AU', a.get_full_name(reverse=True)) for a in authors]
+    lines += [('TI', title), ('ET', version), ('PY', year), ('PB', publisher), ('DO', doi), ('UR', url)]
+    text = ''.join('{}  - {}\r\n'.format(tag, ' '.join(str(value).split())) for tag, value in lines if value)
+    return text + 'ER  - \r\n'
@@ -1,5 +1,7 @@
 import boto3
 import botocore
+import itertools
+import logging
 import re
 import os
 import json
@@ -7,6 +9,9 @@
 from project.models import PublishedProject, AccessPolicy, AWS
 from user.models import User
 from project.authorization.access import can_view_project_files
+from project.cloud.s3upload import S3Uploader, UploadManifest, UploadStats, iter_directory_keys
+
+LOGGER = logging.getLogger(__name__)
 
 
 # Manage AWS buckets and objects
@@ -69,6 +74,9 @@ def create_s3_client():
     Key) are properly configured in the AWS CLI profile.
     - The AWS_PROFILE should be defined in the settings module.
 
+    The client's connection pool is large enough for each of the
+    S3_UPLOAD_THREADS threads used by S3Uploader to hold a connection.
+
     Returns:
         botocore.client.S3: An initialized AWS S3 client object.
 
@@ -79,7 +87,10 @@ def create_s3_client():
         session = boto3.Session(
             profile_name=settings.AWS_PROFILE
         )
-        s3 = session.client("s3", region_name="us-east-1")
+        config = botocore.config.Config(
+            max_pool_connections=max(settings.S3_UPLOAD_THREADS, 10)
+        )
+        s3 = session.client("s3", region_name="us-east-1", config=config)
         return s3
     raise botocore.exceptions.NoCredentialsError("S3 credentials are undefined.")
 
@@ -339,15 +350,17 @@ def put_bucket_logging(s3, bucket_name, target_bucket, target_prefix):
     )
 
 
-def send_files_to_s3(folder_path, s3_prefix, bucket_name, project):
+def send_files_to_s3(folder_path, s3_prefix, bucket_name, project, resume=True):
     """
     Upload files from a local folder to an AWS S3 bucket with
     a specified prefix.
 
     This function walks through the files in the local
     'folder_path' and uploads each file to the specified AWS S3
-    'bucket_name' under the 's3_prefix' directory. It uses an
-    initialized AWS S3 client to perform the file uploads.
+    'bucket_name' under the 's3_prefix' directory. Files are
+    uploaded in parallel by an S3Uploader, which records completed
+    uploads in a manifest so that an interrupted upload can be
+    resumed.
 
     Args:
         folder_path (str): The local folder containing the
@@ -356,6 +369,11 @@ def send_files_to_s3(folder_path, s3_prefix, bucket_name, project):
         where files will be stored.
         bucket_name (str): The name of the AWS S3 bucket where
         files will be uploaded.
+        resume (bool): If false, upload all files even if they
+        were uploaded previously.
+
+    Returns:
+        UploadStats: Summary of the files uploaded.
 
     Raises:
         ValueError: If AWS_PROFILE is undefined.
@@ -368,17 +386,11 @@ def send_files_to_s3(folder_path, s3_prefix, bucket_name, project):
         raise ValueError("AWS_PROFILE is undefined. Please set it in your settings.")
 
     s3 = create_s3_client()
-    for root, _, files in os.walk(folder_path):
-        for file_name in files:
-            local_file_path = os.path.join(root, file_name)
-            s3_key = os.path.join(
-                s3_prefix, os.path.relpath(local_file_path, folder_path)
-            )
-            s3.upload_file(
-                Filename=local_file_path,
-                Bucket=bucket_name,
-                Key=s3_key,
-            )
+    manifest = UploadManifest.for_prefix(bucket_name, s3_prefix)
+    if not resume:
+        manifest.clear()
+
+    files = iter_directory_keys(folder_path, s3_prefix)
 
     # If project has a ZIP file, upload it as well
     if project.compressed_storage_size:
@@ -388,12 +400,10 @@ def send_files_to_s3(folder_path, s3_prefix, bucket_name, project):
             s3_key = os.path.join(f"{project.slug}/", zip_name)
         else:
             s3_key = zip_name
+        files = itertools.chain(files, [(zip_file_path, s3_key)])
 
-        s3.upload_file(
-            Filename=zip_file_path,
-            Bucket=bucket_name,
-            Key=s3_key,
-        )
+    uploader = S3Uploader(s3, bucket_name, manifest=manifest)
+    return uploader.upload_files(files)
 
 
 def get_aws_accounts_for_dataset(dataset_name):
@@ -640,7 +650,7 @@ def upload_project_to_S3(project):
         to upload files to S3.
 
     Returns:
-        None
+        UploadStats: Summary of the files uploaded.
 
     Note:
     - Ensure that AWS credentials (Access Key and Secret Key)
@@ -651,6 +661,8 @@ def upload_project_to_S3(project):
     - The 's3_prefix' is set only for projects with an 'OPEN'
     access policy, providing an optional prefix within the
     S3 bucket.
+    - Files recorded as uploaded by a previous call are skipped,
+    unless the bucket did not exist.
     """
     bucket_name = get_bucket_name(project)
     # create bucket if it does not exist
@@ -658,6 +670,8 @@ def upload_project_to_S3(project):
     if s3 is None or bucket_name is None:
         return
 
+    # Previous uploads are only resumed if the bucket already exists
+    new_bucket = not check_s3_bucket_exists(project)
     try:
         create_s3_bucket(s3, bucket_name)
     except s3.exceptions.BucketAlreadyExists:
@@ -675,9 +689,11 @@ def upload_project_to_S3(project):
         s3_prefix = f"{project.slug}/{project.version}/"
     else:
         s3_prefix = f"{project.version}/"
-    send_files_to_s3(folder_path, s3_prefix, bucket_name, project)
+    stats = send_files_to_s3(folder_path, s3_prefix, bucket_name, project,
+                             resume=not new_bucket)
     # update bucket's policy for projects
     update_bucket_policy(project, bucket_name)
+    return stats
 
 
 def upload_list_of_projects(projects):
@@ -727,8 +743,12 @@ def upload_all_projects():
     'upload_project_to_S3' function.
     """
     published_projects = PublishedProject.objects.all()
+    total = UploadStats()
     for project in published_projects:
-        upload_project_to_S3(project)
+        stats = upload_project_to_S3(project)
+        if stats:
+            total.add(stats)
+    LOGGER.info('Uploaded all projects to S3: %s', total)
 
 
 def create_s3_server_access_log_bucket():
@@ -0,0 +1,269 @@
+"""
+Parallel, resumable uploads of local files to S3.
+"""
+
+import concurrent.futures
+import json
+import logging
+import os
+import threading
+import time
+import urllib.parse
+
+from boto3.s3.transfer import TransferConfig
+from django.conf import settings
+from project.checksums import file_sha256
+
+LOGGER = logging.getLogger(__name__)
+
+
+class UploadManifest:
+    """
+    Record of files that have been uploaded to an S3 bucket.
+
+    The manifest is stored as a file of JSON lines, each describing
+    one uploaded object (key, size, modification time and SHA-256
+    digest of the source file.)  Each entry is written as soon as the
+    upload completes, so an interrupted upload can be resumed without
+    sending the same files again.
+
+    Args:
+        path (str): The manifest file. If None, the manifest is only
+        kept in memory.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self._lines = 0
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    self._lines += 1
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Last line may be truncated after a crash
+                        continue
+                    self.entries[entry['key']] = entry
+
+    @classmethod
+    def for_prefix(cls, bucket_name, s3_prefix):
+        """
+        Return the manifest of uploads to a given bucket and prefix,
+        stored in S3_UPLOAD_MANIFEST_DIR (by default, the
+        's3-upload-manifests' directory within MEDIA_ROOT.)
+        """
+        manifest_dir = (settings.S3_UPLOAD_MANIFEST_DIR
+                        or os.path.join(settings.MEDIA_ROOT, 's3-upload-manifests'))
+        name = urllib.parse.quote(s3_prefix, safe='') + '.jsonl'
+        return cls(os.path.join(manifest_dir, bucket_name, name))
+
+    def is_uploaded(self, key, stat):
+        """
+        Check whether a file, with the given os.stat result, has
+        already been uploaded with the given key.
+
+        Published files are read-only, so a file whose size and
+        modification time are unchanged is not hashed again.
+        """
+        entry = self.entries.get(key)
+        return (entry is not None
+                and entry['size'] == stat.st_size
+                and entry['mtime_ns'] == stat.st_mtime_ns)
+
+    def add(self, key, stat, sha256):
+        """
+        Record that a file has been uploaded.
+        """
+        entry = {
+            'key': key,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': sha256,
+        }
+        with self._lock:
+            self.entries[key] = entry
+            if self.path:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, 'a') as f:
+                    f.write(json.dumps(entry) + '\n')
+                self._lines += 1
+
+    def compact(self):
+        """
+        Rewrite the manifest file with only the latest entry for each
+        key, if any key has been recorded more than once.
+        """
+        with self._lock:
+            if not self.path or self._lines <= len(self.entries):
+                return
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                for entry in self.entries.values():
+                    f.write(json.dumps(entry) + '\n')
+            os.replace(tmp_path, self.path)
+            self._lines = len(self.entries)
+
+    def clear(self):
+        """
+        Forget all previously uploaded files.
+        """
+        with self._lock:
+            self.entries = {}
+            self._lines = 0
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
+
+
+class UploadStats:
+    """
+    Summary of the work done by an S3Uploader.
+    """
+    def __init__(self):
+        self.files_uploaded = 0
+        self.files_skipped = 0
+        self.bytes_uploaded = 0
+        self.elapsed = 0.0
+
+    @property
+    def throughput(self):
+        """Average upload speed in bytes per second."""
+        return self.bytes_uploaded / self.elapsed if self.elapsed else 0.0
+
+    def add(self, other):
+        """Add the totals from another UploadStats object."""
+        self.files_uploaded += other.files_uploaded
+        self.files_skipped += other.files_skipped
+        self.bytes_uploaded += other.bytes_uploaded
+        self.elapsed += other.elapsed
+
+    def __str__(self):
+        return '{} files ({} bytes) uploaded in {:.1f} s ({:.1f} MB/s), {} already uploaded'.format(
+            self.files_uploaded, self.bytes_uploaded, self.elapsed,
+            self.throughput / 1e6, self.files_skipped)
+
+
+class S3Uploader:
+    """
+    Upload files to an S3 bucket using a bounded pool of threads.
+
+    Files larger than the chunk size are sent as multipart uploads,
+    one part at a time, so that each thread uses one connection from
+    the client's pool (see create_s3_client.)  Files listed in the
+    manifest are skipped, and each file is added to the manifest once
+    its upload is complete.
+
+    Args:
+        s3 (boto3.client.S3): An initialized AWS S3 client object.
+        bucket_name (str): The name of the destination bucket.
+        manifest (UploadManifest): Record of completed uploads.
+        threads (int): Number of files to upload in parallel
+        (default: S3_UPLOAD_THREADS.)
+        chunk_size (int): Multipart upload part size in bytes
+        (default: S3_UPLOAD_CHUNK_SIZE.)
+    """
+    def __init__(self, s3, bucket_name, manifest=None, threads=None, chunk_size=None):
+        self.s3 = s3
+        self.bucket_name = bucket_name
+        self.manifest = manifest or UploadManifest()
+        self.threads = threads or settings.S3_UPLOAD_THREADS
+        chunk_size = chunk_size or settings.S3_UPLOAD_CHUNK_SIZE
+        self.transfer_config = TransferConfig(
+            multipart_threshold=chunk_size,
+            multipart_chunksize=chunk_size,
+            max_concurrency=1,
+        )
+        self.stats = UploadStats()
+        self._lock = threading.Lock()
+
+    def upload_file(self, path, key):
+        """
+        Upload a single file, unless it was uploaded previously.
+
+        The SHA-256 digest of the file is stored in the object's
+        metadata, as well as in the manifest.
+        """
+        stat = os.stat(path)
+        if self.manifest.is_uploaded(key, stat):
+            with self._lock:
+                self.stats.files_skipped += 1
+            return
+
+        sha256 = file_sha256(path)
+        self.s3.upload_file(
+            Filename=path,
+            Bucket=self.bucket_name,
+            Key=key,
+            ExtraArgs={'Metadata': {'sha256': sha256}},
+            Config=self.transfer_config,
+        )
+        self.manifest.add(key, stat, sha256)
+        with self._lock:
+            self.stats.files_uploaded += 1
+            self.stats.bytes_uploaded += stat.st_size
+
+    def upload_files(self, files):
+        """
+        Upload a sequence of files in parallel.
+
+        Args:
+            files (iterable): Pairs of (local path, S3 key). This may
+            be a generator; at most twice as many files as there are
+            threads are queued at any time.
+
+        Returns:
+            UploadStats: Summary of the files uploaded by this object.
+            If all uploads succeed, the manifest is then compacted.
+
+        Raises:
+            Exception: The first error raised by any upload, after
+            all other pending uploads have finished.
+        """
+        start = time.monotonic()
+        error = None
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.threads) as pool:
+            pending = set()
+            for path, key in files:
+                if len(pending) >= self.threads * 2:
+                    done, pending = concurrent.futures.wait(
+                        pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    error = error or self._first_error(done)
+                    if error:
+                        break
+                pending.add(pool.submit(self.upload_file, path, key))
+            done, _ = concurrent.futures.wait(pending)
+            error = error or self._first_error(done)
+
+        self.stats.elapsed += time.monotonic() - start
+        LOGGER.info('s3://%s: %s', self.bucket_name, self.stats)
+        if error:
+            raise error
+        self.manifest.compact()
+        return self.stats
+
+    def upload_directory(self, folder_path, s3_prefix):
+        """
+        Upload all files within a local directory, using keys formed
+        by appending each file's relative path to the given prefix.
+        """
+        return self.upload_files(iter_directory_keys(folder_path, s3_prefix))
+
+    @staticmethod
+    def _first_error(futures):
+        for future in futures:
+            if future.exception():
+                return future.exception()
+        return None
+
+
+def iter_directory_keys(folder_path, s3_prefix):
+    """
+    Generate (local path, S3 key) pairs for all files in a directory.
+    """
+    for root, _, files in os.walk(folder_path):
+        for file_name in files:
+            local_file_path = os.path.join(root, file_name)
+            s3_key = os.path.join(s3_prefix, os.path.relpath(local_file_path, folder_path))
+            yield local_file_path, s3_key
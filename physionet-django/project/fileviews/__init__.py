@@ -1 +1 @@
-from project.fileviews.main import display_project_file
+from project.fileviews.main import display_project_file, warm_preview_cache
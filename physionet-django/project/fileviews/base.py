@@ -1,6 +1,9 @@
 import gzip
+import hashlib
 import os
 
+from django.conf import settings
+from django.core.cache import caches
 from django.shortcuts import redirect, render
 from django.urls import reverse
 from physionet.utility import file_content_type
@@ -68,6 +71,35 @@ def render(self, request, template='project/file_view.html',
                                            + self._basename + '.html')
         return response
 
+    def preview(self):
+        """
+        Return the arguments to render() for displaying the content of
+        the file.
+
+        Subclasses that need to read the file to display it override
+        this.  The result is cached for published projects (see
+        cached_preview), so it must be picklable.
+        """
+        return {}
+
+    def cached_preview(self):
+        """
+        Return the result of preview(), which is cached (for up to
+        FILE_PREVIEW_CACHE_TIMEOUT seconds) if the project is
+        published and its files therefore cannot change.
+        """
+        if not hasattr(self.project, 'publish_datetime') or settings.FILE_PREVIEW_CACHE_TIMEOUT <= 0:
+            return self.preview()
+
+        cache = caches['file-previews']
+        key = 'file-preview:{}:{}:{}:{}'.format(self.project.pk, type(self).__name__, self.size(),
+                                                hashlib.sha256(self.path.encode()).hexdigest())
+        preview = cache.get(key)
+        if preview is None:
+            preview = self.preview()
+            cache.set(key, preview)
+        return preview
+
     def basename(self):
         """
         Return the basename of the file.
@@ -125,10 +157,12 @@ class GzippedFileView:
     Mix-in class for displaying gzip-compressed file content.
     """
 
-    def render(self, request, *args, **kwargs):
+    def preview(self):
         self.compressed_file = self.file
         try:
             with gzip.GzipFile(fileobj=self.compressed_file) as self.file:
-                return super().render(request, *args, **kwargs)
+                return super().preview()
         except OSError:
-            return FileView.render(self, request, show_plain=False)
+            return {'show_plain': False}
+        finally:
+            self.file = self.compressed_file
@@ -1,9 +1,10 @@
+import codecs
 import csv
 
-import chardet
+from django.template.loader import render_to_string
 
 from project.fileviews.base import FileView, GzippedFileView
-from project.fileviews.text import probably_binary
+from project.fileviews.text import ENCODING_SAMPLE_SIZE, detect_encoding, probably_binary
 
 MAX_ROWS = 500
 MAX_COLUMNS = 50
@@ -19,32 +20,37 @@ class CSVFileView(FileView):
     be truncated to avoid overloading the browser.
 
     The character encoding is heuristically determined by the chardet
-    library.  Format variations are heuristically determined by the
-    csv library.
+    library, from the first 64 kilobytes of the file.  Format
+    variations are heuristically determined by the csv library.
     """
 
-    def render(self, request, delimiters=[',']):
+    def render(self, request):
+        return super().render(request, **self.cached_preview())
+
+    def preview(self, delimiters=[',']):
         # Read an initial chunk of the file and check if it looks binary
-        text = self.file.read(16384)
-        if probably_binary(text) or b'\n' not in text:
-            return super().render(request)
+        data = self.file.read(ENCODING_SAMPLE_SIZE)
+        if probably_binary(data[:16384]) or b'\n' not in data[:16384]:
+            return {}
 
-        detector = chardet.UniversalDetector()
-        detector.feed(text)
+        encoding = detect_encoding(data)
+        if not encoding:
+            return {}
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        text = decoder.decode(data)
 
-        # Decode initial text as Latin-1 and try to detect format
-        text = text.decode('ISO-8859-1')
+        # Try to detect format from the initial text
         s = csv.Sniffer()
         try:
-            dialect = s.sniff(text, delimiters=delimiters)
-            has_header = s.has_header(text)
+            dialect = s.sniff(text[:16384], delimiters=delimiters)
+            has_header = s.has_header(text[:16384])
         except csv.Error:
             dialect = None
             has_header = False
 
         # Read lines from input, stopping after reading at most MAX_BYTES
         def wrapper(file, text):
-            limit = MAX_BYTES - len(text)
+            limit = MAX_BYTES - len(data)
             while text:
                 lines = text.split('\n')
                 text = lines.pop()
@@ -56,8 +62,7 @@ def wrapper(file, text):
                 if not ntext and text:
                     yield text
                     raise MissingNewline()
-                detector.feed(ntext)
-                text += ntext.decode('ISO-8859-1')
+                text += decoder.decode(ntext, final=not ntext)
 
         # Read data and parse at most MAX_ROWS
         truncated_rows = None
@@ -78,16 +83,8 @@ def wrapper(file, text):
         except MissingNewline:
             missing_newline = True
 
-        # Try to guess encoding
-        detector.close()
-        encoding = detector.result['encoding']
-        if not encoding or not rows:
-            return super().render(request)
-
-        # If encoding is not Latin-1, recode the parsed strings
-        if encoding.upper() not in ('ISO-8859-1', 'ASCII'):
-            rows = ((v.encode('ISO-8859-1').decode(encoding) for v in r)
-                    for r in rows)
+        if not rows:
+            return {}
 
         rows = iter(rows)
         if has_header:
@@ -95,12 +92,17 @@ def wrapper(file, text):
         else:
             header_row = None
 
-        return super().render(request, 'project/file_view_csv.html',
-                              header_row=header_row,
-                              data_rows=rows,
-                              missing_newline=missing_newline,
-                              truncated_rows=truncated_rows,
-                              truncated_columns=truncated_columns)
+        content = render_to_string('project/file_preview_csv.html', {
+            'header_row': header_row,
+            'data_rows': rows,
+        })
+        return {
+            'template': 'project/file_view_csv.html',
+            'content': content,
+            'missing_newline': missing_newline,
+            'truncated_rows': truncated_rows,
+            'truncated_columns': truncated_columns,
+        }
 
 
 class GzippedCSVFileView(GzippedFileView, CSVFileView):
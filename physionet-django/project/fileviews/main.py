@@ -1,9 +1,11 @@
+import logging
 import os
 from errno import ENAMETOOLONG
 
+from django.conf import settings
 from django.http import Http404
 from django.shortcuts import redirect
-from project.fileviews.base import RawFileView
+from project.fileviews.base import FileView, RawFileView
 from project.fileviews.csv import CSVFileView, GzippedCSVFileView
 from project.fileviews.image import ImageFileView
 from project.fileviews.inline import InlineFileView
@@ -22,6 +24,21 @@
     '.svg': ImageFileView,
 }
 
+# Maximum number of files previewed by warm_preview_cache
+MAX_WARM_FILES = 100
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _view_class(file_path):
+    """
+    Return the FileView class used to display a file.
+    """
+    if file_path.endswith('.csv.gz'):
+        return GzippedCSVFileView
+    (_, suffix) = os.path.splitext(file_path)
+    return _suffixes.get(suffix, TextFileView)
+
 
 def display_project_file(request, project, file_path):
     """
@@ -42,10 +59,42 @@ def display_project_file(request, project, file_path):
     except (IOError, OSError) as err:
         raise (Http404() if err.errno == ENAMETOOLONG else err)
 
-    if file_path.endswith('.csv.gz'):
-        cls = GzippedCSVFileView
-    else:
-        (_, suffix) = os.path.splitext(file_path)
-        cls = _suffixes.get(suffix, TextFileView)
-    view = cls(project, file_path, infile)
+    view = _view_class(file_path)(project, file_path, infile)
     return view.render(request)
+
+
+def warm_preview_cache(project, file_paths):
+    """
+    Prepare the cached previews of a published project's README and
+    CSV files (see FileView.cached_preview), so that they can be
+    displayed at once.
+
+    file_paths are the names of files relative to project.file_root().
+    Files larger than FILE_PREVIEW_WARM_MAX_SIZE are skipped, and at
+    most MAX_WARM_FILES files are previewed.  Previews are only
+    prepared if they are shared between processes (that is, if
+    FILE_PREVIEW_CACHE_DIR is set.)  Returns the number of files
+    previewed.
+    """
+    if not settings.FILE_PREVIEW_CACHE_DIR or settings.FILE_PREVIEW_CACHE_TIMEOUT <= 0:
+        return 0
+
+    count = 0
+    for file_path in file_paths:
+        name = os.path.basename(file_path).lower()
+        if not (name.startswith('readme') or name.endswith('.csv') or name.endswith('.csv.gz')):
+            continue
+        cls = _view_class(file_path)
+        if cls.preview is FileView.preview:
+            continue
+        if count >= MAX_WARM_FILES:
+            break
+        try:
+            with project.files.open(os.path.join(project.file_root(), file_path)) as infile:
+                if infile.size > settings.FILE_PREVIEW_WARM_MAX_SIZE:
+                    continue
+                cls(project, file_path, infile).cached_preview()
+        except Exception:
+            LOGGER.exception('unable to preview {} in {}'.format(file_path, project))
+        count += 1
+    return count
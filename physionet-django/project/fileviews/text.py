@@ -1,9 +1,18 @@
+import codecs
+
 import chardet
+from django.template.loader import render_to_string
 
 from project.fileviews.base import FileView
 
 MAX_SIZE = 1024 * 1024
 
+# Number of bytes at the start of a file used to guess its encoding
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
+# Number of bytes decoded at a time
+READ_SIZE = 64 * 1024
+
 
 class TextFileView(FileView):
     """
@@ -12,7 +21,7 @@ class TextFileView(FileView):
     This class is the default view for unknown file types.
 
     The character encoding is heuristically determined by the chardet
-    library.
+    library, from the first 64 kilobytes of the file.
 
     The file contents will be displayed inline if:
     - it is at most 1 MB in size
@@ -21,30 +30,57 @@ class TextFileView(FileView):
     """
 
     def render(self, request):
-        text = self.file.read(4096)
-        if probably_binary(text):
-            return super().render(request, show_plain=False)
+        return super().render(request, **self.cached_preview())
+
+    def preview(self):
+        data = self.file.read(4096)
+        if probably_binary(data):
+            return {'show_plain': False}
 
         if self.size() > MAX_SIZE:
-            return super().render(request)
+            return {}
 
-        text += self.file.read()
-        encoding = chardet.detect(text)['encoding']
-        if encoding:
-            text = text.decode(encoding, errors='replace')
-        else:
-            return super().render(request)
+        data += self.file.read(ENCODING_SAMPLE_SIZE - len(data))
+        encoding = detect_encoding(data)
+        if not encoding:
+            return {}
+
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        chunks = [decoder.decode(data)]
+        while data:
+            data = self.file.read(READ_SIZE)
+            chunks.append(decoder.decode(data, final=not data))
+        text = ''.join(chunks)
 
-        if text[-1] == '\n':
+        if text.endswith('\n'):
             text = text[:-1]
-            if text[-1] == '\r':
+            if text.endswith('\r'):
                 text = text[:-1]
             missing_newline = False
         else:
             missing_newline = True
 
-        return super().render(request, 'project/file_view_text.html',
-                              text=text, missing_newline=missing_newline)
+        content = render_to_string('project/file_preview_text.html', {
+            'text': text,
+            'missing_newline': missing_newline,
+        })
+        return {'template': 'project/file_view_text.html', 'content': content}
+
+
+def detect_encoding(sample):
+    """
+    Guess the character encoding of a file from its first bytes.
+
+    A sample that is entirely ASCII is assumed to be the start of a
+    UTF-8 file.
+
+    >>> detect_encoding(b'plain text')
+    'utf-8'
+    """
+    encoding = chardet.detect(sample)['encoding']
+    if encoding and encoding.lower() == 'ascii':
+        return 'utf-8'
+    return encoding
 
 
 # ascii control characters excluding \t, \n, \r
@@ -8,6 +8,7 @@
 from django.contrib.contenttypes.forms import BaseGenericInlineFormSet
 from django.contrib.contenttypes.models import ContentType
 from django.core.files.base import ContentFile
+from django.db.models import Sum
 from django.db.models.functions import Lower
 from django.forms.utils import ErrorList
 from django.forms.widgets import HiddenInput
@@ -25,6 +26,7 @@
     AnonymousAccess,
     Author,
     AuthorInvitation,
+    ChunkedUpload,
     CoreProject,
     DataAccessRequest,
     DataAccessRequestReviewer,
@@ -210,6 +212,64 @@ def perform_action(self):
         return 'Your files have been uploaded', errors
 
 
+class ChunkedUploadForm(ActiveProjectFilesForm):
+    """
+    Form for starting, or resuming, a chunked upload of a single file.
+    `subdir` is the project subdirectory relative to the file root.
+    """
+    file_name = forms.CharField(max_length=validators.MAX_FILENAME_LENGTH,
+                                validators=[validators.validate_filename])
+    size = forms.IntegerField(min_value=0)
+
+    def __init__(self, user, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.user = user
+
+    def clean(self):
+        """
+        Check the size limits, and that the file does not exist yet
+        """
+        cleaned_data = super().clean()
+        if self.errors:
+            return cleaned_data
+
+        size = cleaned_data['size']
+        if size > ActiveProject.INDIVIDUAL_FILE_SIZE_LIMIT:
+            raise forms.ValidationError(
+                'File %(file_name)s is larger than the individual size limit: %(individual_size_limit)s',
+                code='exceed_individual_limit',
+                params={'file_name': cleaned_data['file_name'],
+                        'individual_size_limit': utility.readable_size(ActiveProject.INDIVIDUAL_FILE_SIZE_LIMIT)}
+            )
+
+        self.path = os.path.join(cleaned_data['subdir'], cleaned_data['file_name'])
+        if os.path.lexists(os.path.join(self.file_dir, cleaned_data['file_name'])):
+            raise forms.ValidationError(
+                'Item named %(file_name)s already exists',
+                code='file_exists',
+                params={'file_name': cleaned_data['file_name']},
+            )
+
+        # Data already received for other uploads is reserved
+        other_uploads = self.project.chunked_uploads.exclude(user=self.user, path=self.path, size=size)
+        pending = other_uploads.aggregate(total=Sum('offset'))['total'] or 0
+        if size > self.project.core_project.storage_allowance - self.project.storage_used() - pending:
+            raise forms.ValidationError(
+                'Total upload volume exceeds remaining quota',
+                code='exceed_remaining_quota',
+            )
+        return cleaned_data
+
+    def start_upload(self):
+        """
+        Return the ChunkedUpload for this file, and whether it is new.
+        An incomplete upload of the same file, by the same user, is
+        resumed.
+        """
+        return ChunkedUpload.objects.get_or_create(
+            project=self.project, user=self.user, path=self.path, size=self.cleaned_data['size'])
+
+
 class CreateFolderForm(ActiveProjectFilesForm):
     """
     Form for creating a new folder in a directory
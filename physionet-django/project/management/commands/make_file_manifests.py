@@ -0,0 +1,32 @@
+"""
+Command to:
+- Record the file manifest of published projects that do not have one,
+  or whose manifest does not include the CRCs of the files
+"""
+
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef, Q
+
+from project.models import PublishedFile, PublishedProject
+
+
+class Command(BaseCommand):
+    help = 'Record the file manifest of published projects, used for listing their files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Rebuild the manifest of every project, not only those without one')
+
+    def handle(self, *args, **options):
+        projects = PublishedProject.objects.filter(deprecated_files=False).order_by('id')
+        if not options['all']:
+            missing_crcs = PublishedFile.objects.filter(project=OuterRef('pk'), is_dir=False, crc32=None)
+            projects = projects.filter(Q(has_file_manifest=False) | Exists(missing_crcs))
+
+        count = 0
+        for project in projects:
+            project.files.make_file_manifest(project)
+            count += 1
+
+        if options['verbosity'] >= 1:
+            self.stdout.write('Recorded the file manifest of {} published projects.'.format(count))
@@ -0,0 +1,40 @@
+"""
+Command to:
+- Update the storage usage ledger of active projects, rescanning only
+  directories that have changed
+- Remove ledger entries for directories that no longer exist
+"""
+
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from physionet.settings.base import StorageTypes
+from project.models import ActiveProject, DirectoryUsage
+
+
+class Command(BaseCommand):
+    help = 'Update the storage usage ledger of active projects'
+
+    def handle(self, *args, **options):
+        if settings.STORAGE_TYPE != StorageTypes.LOCAL:
+            return
+
+        projects = 0
+        directories = 0
+        for project in ActiveProject.objects.order_by('id'):
+            if os.path.isdir(project.file_root()):
+                directories += project.quota_manager().ledger.reconcile()
+                projects += 1
+
+        # Entries left behind by directories removed outside of the
+        # ledger (for example, deleted or archived projects)
+        stale = [pk for pk, path in DirectoryUsage.objects.values_list('pk', 'path')
+                 if not os.path.isdir(path)]
+        for i in range(0, len(stale), 1000):
+            DirectoryUsage.objects.filter(pk__in=stale[i:i + 1000]).delete()
+
+        if options['verbosity'] >= 1:
+            self.stdout.write('Rescanned {} directories in {} projects; removed {} stale entries.'.format(
+                directories, projects, len(stale)))
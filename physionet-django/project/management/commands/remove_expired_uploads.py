@@ -0,0 +1,43 @@
+"""
+Command to:
+- Cancel chunked uploads that have not received any data within
+  CHUNKED_UPLOAD_LIFETIME_IN_HOURS
+- Remove staging files that do not belong to any upload (for example,
+  uploads to projects that have since been deleted)
+"""
+
+import datetime
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from project.models import ChunkedUpload
+
+
+class Command(BaseCommand):
+    help = 'Remove abandoned chunked uploads'
+
+    def handle(self, *args, **options):
+        lifetime = datetime.timedelta(hours=settings.CHUNKED_UPLOAD_LIFETIME_IN_HOURS)
+        cutoff = timezone.now() - lifetime
+
+        expired = ChunkedUpload.objects.filter(modified_datetime__lt=cutoff)
+        count = 0
+        for upload in expired:
+            upload.discard()
+            count += 1
+
+        orphans = 0
+        staging_dir = ChunkedUpload.staging_dir()
+        if os.path.isdir(staging_dir):
+            uploads = {str(pk) for pk in ChunkedUpload.objects.values_list('id', flat=True)}
+            for entry in os.scandir(staging_dir):
+                if (entry.name not in uploads and entry.is_file()
+                        and entry.stat().st_mtime < cutoff.timestamp()):
+                    os.unlink(entry.path)
+                    orphans += 1
+
+        if options['verbosity'] >= 1:
+            self.stdout.write('Removed {} expired uploads and {} orphaned staging files.'.format(count, orphans))
@@ -0,0 +1,20 @@
+"""
+Command to:
+- Render and store the citations of published projects
+"""
+
+from django.core.management.base import BaseCommand
+
+from project.models import PublishedProject
+
+
+class Command(BaseCommand):
+    help = 'Render and store the citations, BibTeX and RIS of all published projects'
+
+    def handle(self, *args, **options):
+        projects = PublishedProject.objects.order_by('id')
+        for project in projects:
+            project.update_citations()
+
+        if options['verbosity'] >= 1:
+            self.stdout.write('Updated {} published projects.'.format(projects.count()))
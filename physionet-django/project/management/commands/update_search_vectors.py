@@ -0,0 +1,24 @@
+"""
+Command to:
+- Rebuild the stored full-text search vectors of published projects
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from project.models import PublishedProject
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search vectors of all published projects'
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Full-text search vectors require PostgreSQL.')
+
+        projects = PublishedProject.objects.order_by('id')
+        for project in projects:
+            project.update_search_vector()
+
+        if options['verbosity'] >= 1:
+            self.stdout.write('Updated {} published projects.'.format(projects.count()))
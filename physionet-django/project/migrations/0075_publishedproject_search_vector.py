@@ -0,0 +1,47 @@
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import TextField, Value
+
+
+def create_search_vector_index(apps, schema_editor):
+    """
+    Populate PublishedProject.search_vector and create its GIN index.
+
+    Full-text search vectors are specific to PostgreSQL, so nothing is
+    done on other databases (where the column is never populated.)
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    PublishedProject = apps.get_model("project", "PublishedProject")
+    for project in PublishedProject.objects.all():
+        topics = ' '.join(project.topics.values_list('description', flat=True))
+        vector = (SearchVector('title', weight='A') + SearchVector('abstract', weight='B')
+                  + SearchVector(Value(topics, output_field=TextField()), weight='C'))
+        PublishedProject.objects.filter(id=project.id).update(search_vector=vector)
+
+    schema_editor.execute(
+        'CREATE INDEX project_publishedproject_search_vector_gin '
+        'ON project_publishedproject USING gin (search_vector)'
+    )
+
+
+def drop_search_vector_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS project_publishedproject_search_vector_gin')
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("project", "0074_migrate_archived_to_active"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="publishedproject",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_vector_index, drop_search_vector_index),
+    ]
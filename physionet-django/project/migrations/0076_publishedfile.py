@@ -0,0 +1,41 @@
+# Generated by Django 4.1.13 on 2026-10-18 03:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0075_publishedproject_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publishedproject',
+            name='has_file_manifest',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.CreateModel(
+            name='PublishedFile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('directory', models.TextField(blank=True)),
+                ('name', models.TextField()),
+                ('is_dir', models.BooleanField(default=False)),
+                ('size', models.BigIntegerField(default=0)),
+                ('modified', models.DateTimeField()),
+                ('sha256', models.CharField(blank=True, default='', max_length=64)),
+                ('project', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE, related_name='file_manifest',
+                    to='project.publishedproject')),
+            ],
+            options={
+                'default_permissions': (),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='publishedfile',
+            constraint=models.UniqueConstraint(fields=('project', 'directory', 'name'), name='unique published file'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.1.13 on 2026-10-18 03:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0076_publishedfile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DirectoryUsage',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.TextField(unique=True)),
+                ('mtime_ns', models.BigIntegerField()),
+                ('creation_time_ns', models.BigIntegerField()),
+                ('bytes_used', models.BigIntegerField(default=0)),
+                ('inodes_used', models.BigIntegerField(default=1)),
+            ],
+            options={
+                'default_permissions': (),
+            },
+        ),
+    ]
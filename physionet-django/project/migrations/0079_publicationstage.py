@@ -0,0 +1,36 @@
+# Generated by Django 4.1.13 on 2026-10-18 03:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0078_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublicationStage',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=30)),
+                ('files_done', models.BigIntegerField(default=0)),
+                ('start_datetime', models.DateTimeField(auto_now_add=True)),
+                ('end_datetime', models.DateTimeField(null=True)),
+                ('project', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='publication_stages',
+                    to='project.publishedproject',
+                )),
+            ],
+            options={
+                'default_permissions': (),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='publicationstage',
+            constraint=models.UniqueConstraint(fields=('project', 'name'), name='unique publication stage'),
+        ),
+    ]
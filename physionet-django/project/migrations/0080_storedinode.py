@@ -0,0 +1,52 @@
+# Generated by Django 4.1.13 on 2026-10-18 03:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0079_publicationstage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredInode',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('device', models.BigIntegerField()),
+                ('inode', models.BigIntegerField()),
+                ('size', models.BigIntegerField()),
+                ('version_count', models.IntegerField(default=0)),
+                ('core_project', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='stored_inodes',
+                    to='project.coreproject',
+                )),
+                ('introduced_by', models.ForeignKey(
+                    null=True,
+                    on_delete=django.db.models.deletion.SET_NULL,
+                    related_name='introduced_inodes',
+                    to='project.publishedproject',
+                )),
+            ],
+            options={
+                'default_permissions': (),
+            },
+        ),
+        migrations.AddField(
+            model_name='publishedfile',
+            name='stored_inode',
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name='files',
+                to='project.storedinode',
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='storedinode',
+            constraint=models.UniqueConstraint(fields=('core_project', 'device', 'inode'), name='unique stored inode'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.1.13 on 2026-10-18 03:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0080_storedinode'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publishedproject',
+            name='citation_bibtex',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='publishedproject',
+            name='citation_ris',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='publishedproject',
+            name='citations',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
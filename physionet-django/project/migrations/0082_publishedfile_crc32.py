@@ -0,0 +1,18 @@
+# Generated by Django 4.1.13 on 2026-10-18 04:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0081_publishedproject_citations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publishedfile',
+            name='crc32',
+            field=models.BigIntegerField(null=True),
+        ),
+    ]
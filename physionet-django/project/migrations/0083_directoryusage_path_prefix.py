@@ -0,0 +1,26 @@
+# Generated by Django 4.1.13 on 2026-10-18 04:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0082_publishedfile_crc32'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='directoryusage',
+            constraint=models.UniqueConstraint(fields=('path',), name='unique directory usage path'),
+        ),
+        migrations.AddIndex(
+            model_name='directoryusage',
+            index=models.Index(fields=['path'], name='directoryusage_path_prefix', opclasses=['text_pattern_ops']),
+        ),
+        migrations.AlterField(
+            model_name='directoryusage',
+            name='path',
+            field=models.TextField(),
+        ),
+    ]
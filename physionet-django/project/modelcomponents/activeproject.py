@@ -17,7 +17,6 @@
 from django.utils.html import strip_tags
 
 from console.tasks import associated_task
-from physionet.settings.base import StorageTypes
 from project.modelcomponents.access import AccessPolicy
 from project.modelcomponents.authors import PublishedAffiliation, PublishedAuthor
 from project.modelcomponents.metadata import (
@@ -30,6 +29,7 @@
 from project.modelcomponents.publishedproject import PublishedProject
 from project.modelcomponents.submission import CopyeditLog, EditLog, SubmissionInfo
 from project.modelcomponents.unpublishedproject import UnpublishedProject
+from project.publication import PublicationPipeline
 from project.validators import validate_subdir
 
 LOGGER = logging.getLogger(__name__)
@@ -41,36 +41,15 @@ def move_files_as_readonly(pid, dir_from, dir_to, make_zip):
     """
     Schedule a background task to set the files as read only.
     If a file starts with a Shebang, then it will be set as executable.
+
+    The checksum file, storage information and (if make_zip is true)
+    zip file are also created here; see project.publication.  If the
+    task is interrupted, running it again resumes after the last
+    completed stage.
     """
 
     published_project = PublishedProject.objects.get(id=pid)
-
-    published_project.make_checksum_file()
-
-    if settings.STORAGE_TYPE == StorageTypes.LOCAL:
-        quota = published_project.quota_manager()
-        published_project.incremental_storage_size = quota.bytes_used
-        published_project.save(update_fields=['incremental_storage_size'])
-
-    published_project.set_storage_info()
-
-    # Make the files read only
-    if settings.STORAGE_TYPE == StorageTypes.LOCAL:
-        file_root = published_project.project_file_root()
-        for root, dirs, files in os.walk(file_root):
-            for f in files:
-                with open(os.path.join(root, f), 'rb') as file:
-                    fline = file.read(2)
-                    if fline == b'#!':
-                        os.chmod(file.fileno(), 0o555)
-                    else:
-                        os.chmod(file.fileno(), 0o444)
-
-            for d in dirs:
-                os.chmod(os.path.join(root, d), 0o555)
-
-    if make_zip:
-        published_project.make_zip()
+    PublicationPipeline(published_project, make_zip).run()
 
 
 class SubmissionStatus(IntEnum):
@@ -601,6 +580,8 @@ def publish(self, slug=None, make_zip=True):
                             email=author.corresponding_email, project=published_project
                         )
 
+                published_project.update_citations()
+
                 # Move the edit and copyedit logs
                 for edit_log in self.edit_logs.all():
                     edit_log.project = published_project
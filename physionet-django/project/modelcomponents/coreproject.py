@@ -2,6 +2,7 @@
 
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models.functions import Coalesce
 
 from project.modelcomponents.activeproject import ActiveProject
 from project.modelcomponents.publishedproject import PublishedProject
@@ -44,7 +45,7 @@ def total_published_size(self):
         incremental_storage_size values (which will be less than the
         sum of the main_storage_size values if there are files that
         are shared between versions) and reflects the actual size of
-        the data on disk.
+        the data on disk.  See update_incremental_sizes.
         """
         result = self.publishedprojects \
                      .aggregate(total=models.Sum('incremental_storage_size'))
@@ -52,11 +53,40 @@ def total_published_size(self):
         # also be None if any projects have incremental_storage_size=None.
         return result['total'] or 0
 
+    def update_incremental_sizes(self, versions=None):
+        """
+        Set the incremental_storage_size of each published version
+        from the project's StoredInodes.
+
+        Each inode is counted once, by the earliest version that
+        contains it.  Versions whose file manifest does not record the
+        inodes of all of their files are not changed.  If versions (a
+        list of PublishedProject IDs) is given, only those versions
+        are updated.
+        """
+        from project.models import PublishedFile, StoredInode
+
+        introduced = StoredInode.objects.filter(introduced_by=models.OuterRef('pk')) \
+            .values('introduced_by').annotate(total=models.Sum('size')).values('total')
+        projects = self.publishedprojects.filter(has_file_manifest=True)
+        if versions is not None:
+            projects = projects.filter(pk__in=versions)
+        projects.exclude(
+            models.Exists(PublishedFile.objects.filter(project=models.OuterRef('pk'), is_dir=False,
+                                                       stored_inode=None))
+        ).update(incremental_storage_size=Coalesce(models.Subquery(introduced), 0))
+
 
 class ProjectType(models.Model):
     """
     The project types available on the platform
     """
+    # IDs of the standard project types (see fixtures/project-types.json)
+    DATABASE = 0
+    SOFTWARE = 1
+    CHALLENGE = 2
+    MODEL = 3
+
     id = models.PositiveSmallIntegerField(primary_key=True)
     name = models.CharField(max_length=20)
     description = models.TextField()
@@ -71,6 +71,8 @@ def publish(self, make_file_roots=False):
             affiliations=self.contact_affiliations, email=self.contact_email,
             project=p)
 
+        p.update_citations()
+
         if make_file_roots:
             os.mkdir(p.project_file_root())
             os.mkdir(p.file_root())
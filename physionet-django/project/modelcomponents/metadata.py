@@ -6,8 +6,8 @@
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
 from django.utils import timezone
-from django.utils.html import format_html
 from html2text import html2text
+from project.citations import CITATION_STYLES, CitationAuthor, render_citations
 from project.modelcomponents.access import AccessPolicy, AnonymousAccess
 from project.modelcomponents.fields import SafeHTMLField
 from project.modelcomponents.authors import Affiliation
@@ -320,6 +320,16 @@ def get_directory_content(self, subdir=''):
         inspect_dir = self.get_inspect_dir(subdir)
         return self.files.get_project_directory_content(inspect_dir, subdir, self.file_display_url, self.file_url)
 
+    def get_directory_page(self, subdir='', cursor=None, limit=1000):
+        """
+        Return information for displaying up to limit files and
+        directories from the project's file root, continuing from
+        cursor, and the cursor for the next page (or None.)
+        """
+        inspect_dir = self.get_inspect_dir(subdir)
+        return self.files.get_project_directory_page(inspect_dir, subdir, self.file_display_url, self.file_url,
+                                                     cursor, limit)
+
     def schema_org_resource_type(self):
         """
         Return a valid https://schema.org resource type.
@@ -394,142 +404,41 @@ def citation_text(self, style):
         citation_format [string]:
             string containing the desired citation style
         """
-        authors = self.authors.all().order_by('display_order')
+        return self.citation_text_all()[style]
 
+    def citation_authors(self):
+        """
+        Return the list of authors (as citations.CitationAuthor
+        objects) in display order, using a single query.
+        """
+        authors = self.authors.order_by('display_order')
         if self.is_published():
+            names = authors.values_list('first_names', 'last_name')
+        else:
+            names = authors.values_list('user__profile__first_names', 'user__profile__last_name')
+        return [CitationAuthor(*name) for name in names]
 
-            year = self.publish_datetime.year
-            doi = self.doi
+    def citation_text_all(self):
+        """
+        Citation information in all of the citations.CITATION_STYLES.
 
+        Returns a dictionary mapping each style name to the citation
+        text.  See citation_text.
+        """
+        if self.is_published():
             if self.is_legacy:
-                return ''
-
+                return {style: '' for style in CITATION_STYLES}
+            year = self.publish_datetime.year
+            doi = self.doi
         else:
-            """
-            Since the project is not yet published, the current year is used in
-            place of the publication year, and '*****' is used in place of the
-            DOI suffix.
-            """
+            # Since the project is not yet published, the current year is
+            # used in place of the publication year, and '*****' is used
+            # in place of the DOI suffix.
             year = timezone.now().year
             doi = '10.13026/*****'
 
-        shared_content = {'year': year,
-                          'title': self.title,
-                          'version': self.version,
-                          'platform_name': settings.SITE_NAME}
-
-        if style == 'MLA':
-
-            style_format = ('{author}. "{title}" (version {version}). '
-                            '<i>{platform_name}</i> ({year})')
-
-            doi_format = (', <a href="https://doi.org/{doi}">'
-                          'https://doi.org/{doi}</a>.')
-
-            if (len(authors) == 1):
-                all_authors = authors[0].get_full_name(reverse=True)
-            elif (len(authors) == 2):
-                first_author = authors[0].get_full_name(reverse=True)
-                second_author = authors[1].get_full_name()
-                all_authors = first_author + ', and ' + second_author
-            else:
-                all_authors = authors[0].get_full_name(reverse=True)
-                all_authors += ', et al'
-
-        elif style == 'APA':
-
-            style_format = ('{author} ({year}). {title} (version '
-                            '{version}). <i>{platform_name}</i>')
-
-            doi_format = ('. <a href="https://doi.org/{doi}">'
-                          'https://doi.org/{doi}</a>.')
-
-            if (len(authors) == 1):
-                all_authors = authors[0].initialed_name()
-            elif (len(authors) == 2):
-                first_author = authors[0].initialed_name()
-                second_author = authors[1].initialed_name()
-                all_authors = first_author + ', & ' + second_author
-            elif (len(authors) > 20):
-                all_authors = ', '.join(
-                    a.initialed_name() for a in authors[0:19])
-                all_authors += ', ... ' \
-                    + authors[len(authors)-1].initialed_name()
-            else:
-                all_authors = ', '.join(a.initialed_name() for a in
-                                        authors[:(len(authors)-1)])
-                all_authors += ', & ' + \
-                    authors[len(authors)-1].initialed_name()
-
-        elif style == 'Chicago':
-
-            style_format = ('{author}. "{title}" (version {version}). '
-                            '<i>{platform_name}</i> ({year})')
-
-            doi_format = ('. <a href="https://doi.org/{doi}">'
-                          'https://doi.org/{doi}</a>.')
-
-            if (len(authors) == 1):
-                all_authors = authors[0].get_full_name(reverse=True)
-            else:
-                all_authors = ', '.join(
-                    a.get_full_name(reverse=True)
-                    for a in authors[:(len(authors)-1)])
-                all_authors += ', and ' + \
-                    authors[len(authors)-1].get_full_name()
-
-        elif style == 'Harvard':
-
-            style_format = ("{author} ({year}) '{title}' (version "
-                            "{version}), <i>{platform_name}</i>")
-
-            doi_format = (". Available at: "
-                          "<a href='https://doi.org/{doi}'>"
-                          "https://doi.org/{doi}</a>.")
-
-            if (len(authors) == 1):
-                all_authors = authors[0].initialed_name()
-            else:
-                all_authors = ', '.join(a.initialed_name() for a in
-                                        authors[:(len(authors)-1)])
-                all_authors += ', and ' + \
-                    authors[len(authors)-1].initialed_name()
-
-        elif style == 'Vancouver':
-
-            style_format = ('{author}. {title} (version {version}). '
-                            '{platform_name}. {year}')
-
-            doi_format = ('. Available from: '
-                          '<a href="https://doi.org/{doi}">'
-                          'https://doi.org/{doi}</a>.')
-
-            all_authors = ', '.join(a.initialed_name(commas=False,
-                                    periods=False) for a in authors)
-
-        if doi:
-            final_style = style_format + doi_format
-            citation_format = format_html(final_style,
-                                          author=all_authors,
-                                          doi=doi,
-                                          **shared_content)
-
-        else:
-            final_style = style_format + '.'
-            citation_format = format_html(final_style,
-                                          author=all_authors,
-                                          **shared_content)
-
-        return citation_format
-
-    def citation_text_all(self):
-        styles = ['MLA', 'APA', 'Chicago', 'Harvard', 'Vancouver']
-        citation_dict = {}
-
-        for style in styles:
-            citation_dict[style] = self.citation_text(style)
-
-        return citation_dict
+        return render_citations(self.citation_authors(), self.title, self.version, year, doi,
+                                settings.SITE_NAME)
 
 
 class Topic(models.Model):
@@ -4,23 +4,48 @@
 from distutils.version import StrictVersion
 
 from django.conf import settings
-from django.db import models
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.contrib.sites.models import Site
+from django.db import connection, models, transaction
+from django.db.models import Exists, F, OuterRef, Q, Subquery, Sum, TextField, Value
+from django.db.models.functions import Collate
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.safestring import mark_safe
 from django.utils.text import slugify
 
 from notification.models import News
+from project.citations import CITATION_STYLES, render_bibtex, render_citations, render_ris
 from project.managers.publishedproject import PublishedProjectManager
 from project.modelcomponents.access import DataAccessRequest, DataAccessRequestReviewer, DUASignature
 from project.modelcomponents.fields import SafeHTMLField
 from project.modelcomponents.metadata import Metadata, PublishedTopic
 from project.modelcomponents.submission import SubmissionInfo
 from project.models import AccessPolicy
-from project.utility import StorageInfo, clear_directory, get_tree_size
+from project.utility import (
+    DirectoryInfo,
+    FileInfo,
+    StorageInfo,
+    clear_directory,
+    get_tree_size,
+    parse_directory_cursor,
+    readable_size,
+)
 from project.validators import MAX_PROJECT_SLUG_LENGTH, validate_slug, validate_subdir
+from search.backends import invalidate_search_index
 from user.models import Training
 
 
+def _binary_name():
+    """
+    Return an expression for a file name that compares in code point
+    order, as sorted() does for the files on disk, rather than by the
+    database's collation.
+    """
+    collation = {'postgresql': 'C', 'sqlite': 'BINARY'}.get(connection.vendor)
+    return Collate('name', collation) if collation else F('name')
+
+
 class PublishedProject(Metadata, SubmissionInfo):
     """
     A published project. Immutable snapshot.
@@ -42,6 +67,8 @@ class PublishedProject(Metadata, SubmissionInfo):
     # Fields for legacy pb databases
     is_legacy = models.BooleanField(default=False)
     full_description = SafeHTMLField(default='')
+    # Whether the PublishedFile manifest has been recorded
+    has_file_manifest = models.BooleanField(default=False, editable=False)
 
     # For ordering projects with multiple versions
     version_order = models.PositiveSmallIntegerField(default=0)
@@ -51,6 +78,14 @@ class PublishedProject(Metadata, SubmissionInfo):
     featured = models.PositiveSmallIntegerField(null=True)
     has_wfdb = models.BooleanField(default=False)
     display_publications = models.BooleanField(default=True)
+    # Rendered citation text (in each style), BibTeX entry and RIS
+    # record, maintained by update_citations
+    citations = models.JSONField(default=dict, blank=True, editable=False)
+    citation_bibtex = models.TextField(default='', blank=True, editable=False)
+    citation_ris = models.TextField(default='', blank=True, editable=False)
+    # Weighted full-text search document (title, abstract and topics),
+    # maintained by update_search_vector. Only populated on PostgreSQL.
+    search_vector = SearchVectorField(null=True, editable=False)
     # Where all the published project files are kept, depending on access.
     PROTECTED_FILE_ROOT = os.path.join(settings.MEDIA_ROOT, 'published-projects')
     # Workaround for development
@@ -179,8 +214,237 @@ def remove_files(self):
         Remove files of this project
         """
         self.files.rm_dir(self.file_root(), remove_zip=self.remove_zip)
+        self.clear_file_manifest()
         self.set_storage_info()
 
+    def set_file_manifest(self, entries):
+        """
+        Replace the manifest of the project's files.
+
+        entries is an iterable of dictionaries of PublishedFile field
+        values (other than project.)  A file entry may also include
+        the 'device' and 'inode' numbers of the file, which are
+        recorded as a StoredInode of the core project.
+        """
+        with transaction.atomic():
+            affected_versions = self._versions_sharing_inodes()
+            self._release_stored_inodes()
+            self.file_manifest.all().delete()
+
+            def find_inodes(keys, **filters):
+                # Look up the StoredInodes of the core project that
+                # match the given (device, inode) keys
+                found = self.core_project.stored_inodes.filter(
+                    device__in={k[0] for k in keys}, inode__in={k[1] for k in keys}, **filters)
+                return {(device, inode): pk for pk, device, inode in found.values_list('pk', 'device', 'inode')
+                        if (device, inode) in keys}
+
+            def add_files(batch):
+                keys = set()
+                for entry in batch:
+                    key = entry.pop('device', None), entry.pop('inode', None)
+                    if key[1] is not None:
+                        keys.add(key)
+                    entry['stored_inode_key'] = key
+                inodes = find_inodes(keys) if keys else {}
+
+                # Inodes that are new in this version
+                new_inodes = {}
+                for entry in batch:
+                    key = entry['stored_inode_key']
+                    if key[1] is not None and key not in inodes:
+                        new_inodes[key] = StoredInode(core_project=self.core_project, device=key[0],
+                                                      inode=key[1], size=entry['size'], introduced_by=self)
+                StoredInode.objects.bulk_create(new_inodes.values())
+                if new_inodes:
+                    inodes.update(find_inodes(new_inodes.keys(), introduced_by=self))
+
+                files = []
+                for entry in batch:
+                    stored_inode_id = inodes.get(entry.pop('stored_inode_key'))
+                    files.append(PublishedFile(project=self, stored_inode_id=stored_inode_id, **entry))
+                PublishedFile.objects.bulk_create(files)
+
+            batch = []
+            for entry in entries:
+                batch.append(dict(entry))
+                if len(batch) >= 1000:
+                    add_files(batch)
+                    batch = []
+            add_files(batch)
+            self.has_file_manifest = True
+            self.save(update_fields=['has_file_manifest'])
+
+            # Inodes shared with other versions
+            contained = StoredInode.objects.filter(
+                Exists(PublishedFile.objects.filter(project=self, stored_inode=OuterRef('pk'))))
+            contained.update(version_count=F('version_count') + 1)
+            contained.filter(Q(introduced_by=None) | Q(introduced_by__version_order__gt=self.version_order)) \
+                .update(introduced_by=self)
+            affected_versions |= self._versions_sharing_inodes()
+            self.core_project.update_incremental_sizes(affected_versions)
+            self.refresh_from_db(fields=['incremental_storage_size'])
+
+    def clear_file_manifest(self):
+        """
+        Delete the manifest of the project's files, so that listings
+        are read from the file system.
+        """
+        with transaction.atomic():
+            affected_versions = self._versions_sharing_inodes()
+            self._release_stored_inodes()
+            self.file_manifest.all().delete()
+            self.has_file_manifest = False
+            self.save(update_fields=['has_file_manifest'])
+            self.core_project.update_incremental_sizes(affected_versions)
+            self.refresh_from_db(fields=['incremental_storage_size'])
+
+    def _versions_sharing_inodes(self):
+        """
+        Return the IDs of this version and the other versions that
+        contain any of its StoredInodes, whose incremental sizes may
+        change when this version's manifest is changed.
+        """
+        inodes = PublishedFile.objects.filter(project=self, stored_inode__isnull=False).values('stored_inode')
+        versions = PublishedFile.objects.filter(stored_inode__in=inodes).values_list('project', flat=True)
+        return {self.pk, *versions.distinct()}
+
+    def _release_stored_inodes(self):
+        """
+        Remove this version from the StoredInodes that it contains.
+
+        Inodes that are not contained by any other version are
+        deleted; those that were introduced by this version are
+        attributed to the next version that contains them.
+        """
+        contained = StoredInode.objects.filter(
+            Exists(PublishedFile.objects.filter(project=self, stored_inode=OuterRef('pk'))))
+        contained.update(version_count=F('version_count') - 1)
+        contained.filter(version_count__lte=0).delete()
+
+        next_version = PublishedFile.objects.filter(stored_inode=OuterRef('pk')).exclude(project=self) \
+            .order_by('project__version_order').values('project')[:1]
+        StoredInode.objects.filter(introduced_by=self).update(introduced_by=Subquery(next_version))
+
+    def reclaimable_storage_size(self):
+        """
+        Bytes of storage that would be freed if the files of this
+        version were deleted (that is, the size of the inodes that are
+        not shared with any other version.)  Returns None if there is
+        no file manifest.
+        """
+        if not self.has_file_manifest:
+            return None
+        unshared = StoredInode.objects.filter(
+            Exists(PublishedFile.objects.filter(project=self, stored_inode=OuterRef('pk'))),
+            version_count=1,
+        )
+        return unshared.aggregate(total=Sum('size'))['total'] or 0
+
+    def get_file_crcs(self, subdir):
+        """
+        Return a dictionary mapping the path of each file within a
+        subdirectory (relative to that subdirectory) to its size and
+        CRC-32, as recorded in the file manifest.
+
+        Returns None if there is no file manifest, or if it does not
+        include the CRC of every file.
+        """
+        if not self.has_file_manifest:
+            return None
+
+        subdir = subdir.strip('/')
+        files = self.file_manifest.filter(Q(directory=subdir) | Q(directory__startswith=subdir + '/'),
+                                          is_dir=False)
+        crcs = {}
+        for directory, name, size, crc32 in files.values_list('directory', 'name', 'size', 'crc32'):
+            if crc32 is None:
+                return None
+            crcs[os.path.relpath(os.path.join(directory, name), subdir)] = (size, crc32)
+        return crcs
+
+    def can_stream_subdir_zip(self, subdir):
+        """
+        Whether a zip file of a subdirectory can be streamed, which
+        requires the file manifest to include the CRC of every file
+        within it.
+        """
+        if not self.files.can_make_zip() or not self.has_file_manifest:
+            return False
+
+        subdir = subdir.strip('/')
+        return not self.file_manifest.filter(Q(directory=subdir) | Q(directory__startswith=subdir + '/'),
+                                             is_dir=False, crc32=None).exists()
+
+    def get_directory_content(self, subdir=''):
+        """
+        Return information for displaying files and directories from
+        the project's file root, using the file manifest if there is
+        one.
+        """
+        if not self.has_file_manifest:
+            return super().get_directory_content(subdir)
+
+        validate_subdir(subdir)
+        subdir = subdir.strip('/')
+        # Sort in Python, so that the order is the same as when
+        # listing the directory on disk
+        entries = sorted(self.file_manifest.filter(directory=subdir), key=lambda entry: entry.name)
+        return self._manifest_directory_content(subdir, entries)
+
+    def get_directory_page(self, subdir='', cursor=None, limit=1000):
+        """
+        Return information for displaying up to limit files and
+        directories from the project's file root, continuing from
+        cursor, and the cursor for the next page (or None.)  The file
+        manifest is used if there is one.
+
+        The cursor has the same form as for list_items_page.
+        """
+        if not self.has_file_manifest:
+            return super().get_directory_page(subdir, cursor, limit)
+
+        validate_subdir(subdir)
+        subdir = subdir.strip('/')
+        entries = self.file_manifest.filter(directory=subdir).alias(binary_name=_binary_name())
+        entries = entries.order_by('-is_dir', 'binary_name')
+        start = parse_directory_cursor(cursor)
+        if start is not None:
+            kind, name = start
+            if kind == 'd':
+                entries = entries.filter(Q(is_dir=True, binary_name__gt=name) | Q(is_dir=False))
+            else:
+                entries = entries.filter(is_dir=False, binary_name__gt=name)
+        entries = list(entries[:limit + 1])
+
+        next_cursor = None
+        if len(entries) > limit:
+            entries = entries[:limit]
+            next_cursor = '{}/{}'.format('d' if entries[-1].is_dir else 'f', entries[-1].name)
+        display_files, display_dirs = self._manifest_directory_content(subdir, entries, cursor is None)
+        return display_files, display_dirs, next_cursor
+
+    def _manifest_directory_content(self, subdir, entries, check_exists=True):
+        if check_exists and not entries and subdir:
+            parent, name = os.path.split(subdir)
+            if not self.file_manifest.filter(directory=parent, name=name, is_dir=True).exists():
+                raise FileNotFoundError(subdir)
+
+        display_files, display_dirs = [], []
+        for entry in entries:
+            if entry.is_dir:
+                dir_info = DirectoryInfo(entry.name)
+                dir_info.full_subdir = os.path.join(subdir, entry.name)
+                display_dirs.append(dir_info)
+            else:
+                file_info = FileInfo(entry.name, readable_size(entry.size),
+                                     timezone.localtime(entry.modified).strftime('%Y-%m-%d'))
+                file_info.url = self.file_display_url(subdir=subdir, file=entry.name)
+                file_info.raw_url = self.file_url(subdir=subdir, file=entry.name)
+                file_info.download_url = self.files.download_url(self, os.path.join(subdir, entry.name))
+                display_files.append(file_info)
+        return display_files, display_dirs
+
     def deprecate_files(self, delete_files):
         """
         Label the project's files as deprecated. Option of deleting
@@ -245,8 +509,9 @@ def get_storage_info(self, force_calculate=True):
         main = self.main_storage_size
         compressed = self.compressed_storage_size
         return StorageInfo(allowance=self.core_project.storage_allowance,
-            used=main+compressed, include_remaining=False, main_used=main,
-            compressed_used=compressed)
+                           used=main + compressed, include_remaining=False, main_used=main,
+                           compressed_used=compressed, incremental_used=self.incremental_storage_size,
+                           reclaimable=self.reclaimable_storage_size())
 
     def remove(self, force=False):
         """
@@ -276,7 +541,85 @@ def can_publish_new(self, user):
     def can_manage_data_access_reviewers(self, user):
         return user == self.corresponding_author().user
 
-    def add_topic(self, topic_description):
+    def update_search_vector(self):
+        """
+        Refresh the search data derived from the project's title,
+        abstract and topics.
+
+        The search backend's cached index is invalidated, and on
+        PostgreSQL, the stored full-text search vector is recomputed.
+        """
+        invalidate_search_index()
+
+        if connection.vendor != 'postgresql':
+            return
+        topics = ' '.join(self.topics.values_list('description', flat=True))
+        vector = (SearchVector('title', weight='A') + SearchVector('abstract', weight='B')
+                  + SearchVector(Value(topics, output_field=TextField()), weight='C'))
+        PublishedProject.objects.filter(id=self.id).update(search_vector=vector)
+
+    def render_citations(self):
+        """
+        Render the project's citations.
+
+        Returns a tuple of the citation text in each style (see
+        Metadata.citation_text_all), the BibTeX entry, and the RIS
+        record.  The authors are loaded with a single query.
+        """
+        from project.modelcomponents.coreproject import ProjectType
+
+        authors = self.citation_authors()
+        year = self.publish_datetime.year
+        if self.is_legacy:
+            citations = {style: '' for style in CITATION_STYLES}
+        else:
+            citations = render_citations(authors, self.title, self.version, year, self.doi, settings.SITE_NAME)
+
+        url = 'https://{0}{1}'.format(Site.objects.get_current(),
+                                      reverse('published_project', args=(self.slug, self.version)))
+        bibtex = render_bibtex('{}-{}'.format(self.slug, self.version), authors, self.title, self.version,
+                               year, self.doi, url, settings.SITE_NAME)
+        # Software projects are cited as computer programs, and
+        # everything else as data
+        record_type = 'COMP' if self.resource_type_id == ProjectType.SOFTWARE else 'DATA'
+        ris = render_ris(record_type, authors, self.title, self.version, year, self.doi, url,
+                         settings.SITE_NAME)
+        return citations, bibtex, ris
+
+    def update_citations(self):
+        """
+        Render and store the project's citations.
+
+        This must be called when the authors, title or DOI of the
+        project are changed.
+        """
+        self.citations, self.citation_bibtex, self.citation_ris = self.render_citations()
+        self.save(update_fields=['citations', 'citation_bibtex', 'citation_ris'])
+
+    def citation_text_all(self):
+        """
+        Citation information in all of the citations.CITATION_STYLES.
+
+        The stored citations are used if available.
+        """
+        if not self.citations:
+            return super().citation_text_all()
+        # The stored text was rendered by format_html
+        return {style: mark_safe(text) for style, text in self.citations.items()}
+
+    def get_bibtex(self):
+        """
+        Return the project's BibTeX entry.
+        """
+        return self.citation_bibtex or self.render_citations()[1]
+
+    def get_ris(self):
+        """
+        Return the project's RIS record.
+        """
+        return self.citation_ris or self.render_citations()[2]
+
+    def add_topic(self, topic_description, update_search_vector=True):
         """
         Tag this project with a topic
         """
@@ -294,7 +637,10 @@ def add_topic(self, topic_description):
         published_topic.project_count += 1
         published_topic.save()
 
-    def remove_topic(self, topic_description):
+        if update_search_vector:
+            self.update_search_vector()
+
+    def remove_topic(self, topic_description, update_search_vector=True):
         """
         Remove the topic tag from this project
         """
@@ -310,6 +656,9 @@ def remove_topic(self, topic_description):
             if published_topic.project_count == 0:
                 published_topic.delete()
 
+            if update_search_vector:
+                self.update_search_vector()
+
     def set_topics(self, topic_descriptions):
         """
         Set the topic tags for this project.
@@ -320,11 +669,13 @@ def set_topics(self, topic_descriptions):
 
         # Add these topics
         for td in set(topic_descriptions) - set(existing_descriptions):
-            self.add_topic(td)
+            self.add_topic(td, update_search_vector=False)
 
         # Remove these topics
         for td in set(existing_descriptions) - set(topic_descriptions):
-            self.remove_topic(td)
+            self.remove_topic(td, update_search_vector=False)
+
+        self.update_search_vector()
 
     def set_version_order(self):
         """
@@ -395,3 +746,89 @@ def get_all_news(self):
             link_all_versions=True).exclude(project=self)
 
         return direct_news | linked_news
+
+
+class PublishedFile(models.Model):
+    """
+    A file or directory in a published project.
+
+    The manifest of a project's files is recorded when the files are
+    made read-only, so that listings and storage totals do not need
+    to read the file system.
+    """
+    project = models.ForeignKey('project.PublishedProject', related_name='file_manifest', on_delete=models.CASCADE)
+    # Path of the parent directory, relative to the project's file
+    # root ('' for the file root itself)
+    directory = models.TextField(blank=True)
+    name = models.TextField()
+    is_dir = models.BooleanField(default=False)
+    size = models.BigIntegerField(default=0)
+    modified = models.DateTimeField()
+    sha256 = models.CharField(max_length=64, blank=True, default='')
+    # CRC-32 of the file, used for generating ZIP archives (null if the
+    # manifest was recorded before CRCs were)
+    crc32 = models.BigIntegerField(null=True)
+    # The data of the file, which may be shared with other versions
+    stored_inode = models.ForeignKey('project.StoredInode', related_name='files', null=True,
+                                     on_delete=models.SET_NULL)
+
+    class Meta:
+        default_permissions = ()
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'directory', 'name'], name='unique published file')
+        ]
+
+
+class StoredInode(models.Model):
+    """
+    The stored data (inode) of one or more files in the published
+    versions of a project.
+
+    Files that are unchanged between versions are hard links to the
+    same inode, so each inode is counted once: introduced_by is the
+    earliest version that contains the inode, and version_count is
+    the number of versions that contain it.  An inode that is
+    contained by only one version would be freed if that version's
+    files were deleted.
+    """
+    core_project = models.ForeignKey('project.CoreProject', related_name='stored_inodes',
+                                     on_delete=models.CASCADE)
+    device = models.BigIntegerField()
+    inode = models.BigIntegerField()
+    size = models.BigIntegerField()
+    introduced_by = models.ForeignKey('project.PublishedProject', related_name='introduced_inodes',
+                                      null=True, on_delete=models.SET_NULL)
+    version_count = models.IntegerField(default=0)
+
+    class Meta:
+        default_permissions = ()
+        constraints = [
+            models.UniqueConstraint(fields=['core_project', 'device', 'inode'], name='unique stored inode')
+        ]
+
+
+class PublicationStage(models.Model):
+    """
+    A stage of the processing of a project's files after publication
+    (see project.publication.)
+
+    A stage is recorded when it starts, and end_datetime is set when
+    it is complete, so that if the task is interrupted and run again,
+    completed stages are not repeated.  files_done counts the files
+    processed so far by a stage that works through the files.
+    """
+    project = models.ForeignKey('project.PublishedProject', related_name='publication_stages',
+                                on_delete=models.CASCADE)
+    name = models.CharField(max_length=30)
+    files_done = models.BigIntegerField(default=0)
+    start_datetime = models.DateTimeField(auto_now_add=True)
+    end_datetime = models.DateTimeField(null=True)
+
+    class Meta:
+        default_permissions = ()
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'name'], name='unique publication stage')
+        ]
+
+    def __str__(self):
+        return '{}: {}'.format(self.project, self.name)
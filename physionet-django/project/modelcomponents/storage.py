@@ -1,5 +1,11 @@
+import errno
+import os
+import uuid
+
+from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import Sum
 
 from project.modelcomponents.generic import BaseInvitation
 
@@ -71,3 +77,152 @@ def s3_uri(self):
 
     def __str__(self):
         return self.s3_uri()
+
+
+class DirectoryUsage(models.Model):
+    """
+    Storage used by the files directly within one directory of a
+    project.
+
+    Together, the entries for a project's directories form a ledger of
+    the project's storage usage, which is kept up to date as files are
+    uploaded, moved and deleted (see project.quota.UsageLedger.)
+
+    inodes_used counts the directory itself and the files it contains,
+    but not its subdirectories (which have their own entries.)  Files
+    with multiple links, modified before creation_time_ns, are not
+    counted.  mtime_ns is the modification time of the directory when
+    it was last scanned or updated.
+    """
+    path = models.TextField()
+    mtime_ns = models.BigIntegerField()
+    creation_time_ns = models.BigIntegerField()
+    bytes_used = models.BigIntegerField(default=0)
+    inodes_used = models.BigIntegerField(default=1)
+
+    class Meta:
+        default_permissions = ()
+        constraints = [
+            models.UniqueConstraint(fields=['path'], name='unique directory usage path')
+        ]
+        # Subtrees are found by prefix (path LIKE 'x/%'), which on
+        # PostgreSQL needs an index using the pattern operator class
+        indexes = [
+            models.Index(fields=['path'], name='directoryusage_path_prefix', opclasses=['text_pattern_ops'])
+        ]
+
+    def __str__(self):
+        return self.path
+
+
+class ChunkedUpload(models.Model):
+    """
+    A file being uploaded to an active project as a series of chunks.
+
+    The data received so far is kept in a staging file, outside of the
+    project's directory, so that incomplete files never appear in the
+    project's file listing or in a published project.  Once all of the
+    data has been received, the staging file is moved into place.  The
+    staging directory (UPLOAD_STAGING_DIR) must therefore be on the
+    same filesystem as the project files.
+
+    offset is the number of bytes that have been received and written
+    to the staging file.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    project = models.ForeignKey('project.ActiveProject', related_name='chunked_uploads',
+                                on_delete=models.CASCADE)
+    user = models.ForeignKey('user.User', on_delete=models.CASCADE)
+    # Destination path, relative to the project's file root
+    path = models.TextField()
+    size = models.BigIntegerField()
+    offset = models.BigIntegerField(default=0)
+    creation_datetime = models.DateTimeField(auto_now_add=True)
+    modified_datetime = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        default_permissions = ()
+
+    def __str__(self):
+        return '{0} ({1}/{2} bytes)'.format(self.path, self.offset, self.size)
+
+    @staticmethod
+    def staging_dir():
+        """
+        Directory where incomplete uploads are stored (by default, the
+        'upload-staging' directory within MEDIA_ROOT.)
+        """
+        return settings.UPLOAD_STAGING_DIR or os.path.join(settings.MEDIA_ROOT, 'upload-staging')
+
+    def staging_path(self):
+        return os.path.join(self.staging_dir(), str(self.id))
+
+    def target_path(self):
+        return os.path.join(self.project.file_root(), self.path)
+
+    def is_complete(self):
+        return self.offset == self.size
+
+    def append(self, stream, length):
+        """
+        Read length bytes from stream and add them to the staging file.
+
+        The caller must hold a lock on this upload (see
+        select_for_update), and must check that the client is sending
+        data starting at the current offset.
+
+        The pending uploads of the project are counted against its
+        storage allowance, so if this chunk would cause the project's
+        hard limit to be exceeded, this raises an OSError with errno =
+        EDQUOT and nothing is written.
+        """
+        if self.offset + length > self.size:
+            raise OSError(errno.EFBIG, 'Upload is larger than the declared size')
+
+        pending = self.project.chunked_uploads.aggregate(total=Sum('offset'))['total'] or 0
+        self.project.quota_manager().check_create_file(self.staging_path(), pending + length)
+
+        os.makedirs(self.staging_dir(), exist_ok=True)
+        fd = os.open(self.staging_path(), os.O_WRONLY | os.O_CREAT, 0o660)
+        with open(fd, 'wb') as outfile:
+            # Discard anything left over from an interrupted request
+            outfile.truncate(self.offset)
+            outfile.seek(self.offset)
+            written = 0
+            while written < length:
+                data = stream.read(min(length - written, 1024 * 1024))
+                if not data:
+                    break
+                outfile.write(data)
+                written += len(data)
+            outfile.flush()
+            os.fsync(outfile.fileno())
+
+        self.offset += written
+        self.save(update_fields=['offset', 'modified_datetime'])
+        return written
+
+    def complete(self):
+        """
+        Move the complete file into the project directory, and delete
+        this upload.
+
+        If a file with the same name has been created in the meantime,
+        this raises FileExistsError, and the upload is discarded.
+        """
+        try:
+            self.project.files.fput_staged(self.staging_path(), self.target_path())
+        except FileExistsError:
+            self.discard()
+            raise
+        self.delete()
+
+    def discard(self):
+        """
+        Cancel the upload and delete the staging file.
+        """
+        try:
+            os.unlink(self.staging_path())
+        except FileNotFoundError:
+            pass
+        self.delete()
@@ -0,0 +1,159 @@
+"""
+Caching of the published project landing page.
+
+The parts of the page that do not depend on the user (the author
+list, news, description, citations, metadata and version list) are
+cached as template fragments for PUBLISHED_PROJECT_CACHE_TIMEOUT
+seconds.  Each fragment's cache key includes a revision string that
+is shared by all versions of a project; when anything shown on those
+pages changes (for example, when a new version is published, a news
+item is posted, or a DOI is assigned), the revision is discarded so
+that the fragments are rendered again.
+
+The revisions are kept in the 'shared' cache, so that a change made
+by one worker process is seen by all of them.
+"""
+
+import uuid
+
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+
+
+def _revision_key(core_project_id):
+    return 'published-project-revision:{}'.format(core_project_id)
+
+
+def page_revision(project):
+    """
+    Return the current cache revision of a published project's pages.
+    """
+    cache = caches['shared']
+    key = _revision_key(project.core_project_id)
+    revision = cache.get(key)
+    if revision is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        revision = cache.get(key)
+    return revision
+
+
+def invalidate_project_pages(core_project_id):
+    """
+    Discard the cached pages of all versions of a project.
+
+    The revision is discarded immediately, and again when the current
+    transaction (if any) is committed, so that pages rendered from
+    data that was not yet committed are not kept.
+    """
+    cache = caches['shared']
+    key = _revision_key(core_project_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def _invalidate_published_projects(project_ids):
+    from project.models import PublishedProject
+
+    core_ids = PublishedProject.objects.filter(pk__in=project_ids).values_list('core_project_id', flat=True)
+    for core_project_id in set(core_ids):
+        invalidate_project_pages(core_project_id)
+
+
+def _project_changed(sender, instance, **kwargs):
+    invalidate_project_pages(instance.core_project_id)
+
+
+def _core_project_changed(sender, instance, **kwargs):
+    invalidate_project_pages(instance.pk)
+
+
+def _invalidate_authors(author_ids):
+    from project.models import PublishedAuthor
+
+    project_ids = PublishedAuthor.objects.filter(pk__in=author_ids).values_list('project_id', flat=True)
+    _invalidate_published_projects(project_ids)
+
+
+def _previous_value(sender, instance, attname):
+    """
+    Return the stored value of a field of an object that is about to
+    be saved, or None if the object is new.
+    """
+    if instance.pk is None:
+        return None
+    return sender.objects.filter(pk=instance.pk).values_list(attname, flat=True).first()
+
+
+def _related_object_changed(sender, instance, **kwargs):
+    if instance.project_id is not None:
+        _invalidate_published_projects([instance.project_id])
+
+
+def _related_object_moving(sender, instance, **kwargs):
+    # The project that the object is being moved away from (if any)
+    # is not known after the object is saved
+    old_project_id = _previous_value(sender, instance, 'project_id')
+    if old_project_id is not None and old_project_id != instance.project_id:
+        _invalidate_published_projects([old_project_id])
+
+
+def _affiliation_changed(sender, instance, **kwargs):
+    _invalidate_authors([instance.author_id])
+
+
+def _affiliation_moving(sender, instance, **kwargs):
+    old_author_id = _previous_value(sender, instance, 'author_id')
+    if old_author_id is not None and old_author_id != instance.author_id:
+        _invalidate_authors([old_author_id])
+
+
+def _relation_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    from project.models import PublishedProject
+
+    if isinstance(instance, PublishedProject):
+        if action.startswith('post_'):
+            invalidate_project_pages(instance.core_project_id)
+    elif action == 'pre_clear':
+        # The projects are not listed in pk_set, so find them before
+        # they are removed
+        fields = [f for f in sender._meta.get_fields() if f.is_relation]
+        project_field = next(f for f in fields if f.related_model is PublishedProject)
+        other_field = next(f for f in fields if f.related_model is type(instance))
+        _invalidate_published_projects(list(sender.objects.filter(
+            **{other_field.attname: instance.pk}).values_list(project_field.attname, flat=True)))
+    elif action in ('post_add', 'post_remove'):
+        _invalidate_published_projects(pk_set)
+
+
+def connect_signals():
+    """
+    Invalidate the cached pages when the data shown on them changes.
+    """
+    from notification.models import News
+    from project.models import (
+        Contact,
+        CoreProject,
+        PublishedAffiliation,
+        PublishedAuthor,
+        PublishedProject,
+        PublishedPublication,
+        PublishedReference,
+        PublishedTopic,
+    )
+
+    related_models = (News, PublishedAuthor, PublishedReference, PublishedPublication, Contact)
+    for signal in (post_save, post_delete):
+        signal.connect(_project_changed, sender=PublishedProject)
+        signal.connect(_core_project_changed, sender=CoreProject)
+        signal.connect(_affiliation_changed, sender=PublishedAffiliation)
+        for model in related_models:
+            signal.connect(_related_object_changed, sender=model)
+
+    pre_save.connect(_affiliation_moving, sender=PublishedAffiliation)
+    for model in related_models:
+        pre_save.connect(_related_object_moving, sender=model)
+
+    for field in (PublishedProject.parent_projects, PublishedProject.programming_languages,
+                  PublishedProject.required_trainings, PublishedTopic.projects):
+        m2m_changed.connect(_relation_changed, sender=field.through)
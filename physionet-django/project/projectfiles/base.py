@@ -31,6 +31,11 @@ def fput(self, path, file):
         """Put a file at a given path."""
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def fput_staged(self, staging_path, target_path):
+        """Move a completely uploaded file into place, if it does not exist."""
+        raise NotImplementedError
+
     @abc.abstractmethod
     def rename(self, source_path, target_path):
         """Change the name of a file/directory."""
@@ -59,6 +64,16 @@ def get_project_directory_content(self, path, subdir, file_display_url, file_url
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def get_project_directory_page(self, path, subdir, file_display_url, file_url, cursor, limit):
+        """
+        Return information for displaying up to limit files and
+        directories, continuing from cursor (or from the start, if
+        cursor is None), and the cursor for the next page (or None,
+        if there are no more.)
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def cp_dir(self, source_path, target_path, ignored_files=None):
         """Copy directories."""
@@ -129,11 +144,24 @@ def make_zip(self, project):
         """Make a (new) zip file of the main files."""
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def make_zip_stream(self, project, subdir):
+        """
+        Make a zipwriter.StoredZipStream of a subdirectory, generated on
+        demand, or return None if the CRCs of its files are not known.
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def make_checksum_file(self, project):
         """Make the checksums file for the main files."""
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def make_file_manifest(self, project):
+        """Record the PublishedFile manifest of the main files."""
+        raise NotImplementedError
+
     @abc.abstractmethod
     def can_make_zip(self):
         """Check if zip file is supported."""
@@ -144,6 +172,11 @@ def can_make_checksum(self):
         """Check if zip file is supported."""
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def can_upload_chunks(self):
+        """Check if resumable chunked uploads are supported."""
+        raise NotImplementedError
+
     @abc.abstractmethod
     def is_lightwave_supported(self):
         """Check if lightwave is supported."""
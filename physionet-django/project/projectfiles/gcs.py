@@ -1,9 +1,11 @@
+import contextlib
 import os
 
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.shortcuts import redirect
-from google.cloud.exceptions import Conflict, NotFound
-from physionet.gcs import GCSObject, GCSObjectException, create_bucket, delete_bucket
+from google.cloud.exceptions import BadRequest, Conflict, NotFound
+from physionet.gcs import GCSObject, GCSObjectException, GCSUsageCache, create_bucket, delete_bucket
 from project.projectfiles.base import BaseProjectFiles
 from project.quota import GCSQuotaManager
 from project.utility import DirectoryInfo, FileInfo, readable_size
@@ -18,19 +20,29 @@ def mkdir(self, path):
         path = self._dir_path(path)
 
         try:
-            GCSObject(path).mkdir()
+            gcs_obj = GCSObject(path)
+            gcs_obj.mkdir()
         except GCSObjectException:
             raise FileExistsError
+        self._record_usage(gcs_obj, (0, 1))
 
     def rm(self, path):
         try:
-            GCSObject(path).rm()
+            gcs_obj = GCSObject(path)
+            with self._changing_usage(gcs_obj):
+                usage = gcs_obj.rm()
         except NotFound:
-            GCSObject(self._dir_path(path)).rm()
+            gcs_obj = GCSObject(self._dir_path(path))
+            with self._changing_usage(gcs_obj):
+                usage = gcs_obj.rm()
+        self._record_usage(gcs_obj, usage, -1)
 
     def rm_dir(self, path, remove_zip=None):
         path = self._dir_path(path)
-        GCSObject(path).rm()
+        gcs_obj = GCSObject(path)
+        with self._changing_usage(gcs_obj):
+            usage = gcs_obj.rm()
+        self._record_usage(gcs_obj, usage, -1)
 
     def fwrite(self, path, content):
         gcs_object = GCSObject(path)
@@ -38,6 +50,7 @@ def fwrite(self, path, content):
             raise FileExistsError
 
         gcs_object.upload_from_string(content)
+        self._record_usage(gcs_object, (len(content.encode()), 1))
 
     def fput(self, path, file):
         gcs_object = GCSObject(os.path.join(path, file.name))
@@ -45,6 +58,11 @@ def fput(self, path, file):
             raise FileExistsError
 
         gcs_object.upload_from_file(file)
+        self._record_usage(gcs_object, (file.size, 1))
+
+    def fput_staged(self, staging_path, target_path):
+        """Not implemented for GCS storage backend; see can_upload_chunks."""
+        raise NotImplementedError
 
     def rename(self, source_path, target_path):
         gcs_obj = GCSObject(source_path)
@@ -52,7 +70,11 @@ def rename(self, source_path, target_path):
             gcs_obj = GCSObject(self._dir_path(source_path))
             target_path = self._dir_path(target_path)
 
-        gcs_obj.rename(GCSObject(target_path))
+        target = GCSObject(target_path)
+        with self._changing_usage(gcs_obj, target):
+            usage = gcs_obj.rename(target)
+        self._record_usage(gcs_obj, usage, -1)
+        self._record_usage(target, usage)
 
     def cp_file(self, source_path, target_path):
         gcs_obj = GCSObject(source_path)
@@ -60,23 +82,39 @@ def cp_file(self, source_path, target_path):
             gcs_obj = GCSObject(self._dir_path(source_path))
             target_path = self._dir_path(target_path)
 
-        gcs_obj.cp(GCSObject(target_path))
+        target = GCSObject(target_path)
+        with self._changing_usage(target):
+            usage = gcs_obj.cp(target)
+        self._record_usage(target, usage)
 
     def mv(self, source_path, target_path):
         source_path = source_path
-        target_path = self._dir_path(target_path)
+        target = GCSObject(self._dir_path(target_path))
 
         try:
-            GCSObject(source_path).mv(GCSObject(target_path))
+            gcs_obj = GCSObject(source_path)
+            with self._changing_usage(gcs_obj, target):
+                usage = gcs_obj.mv(target)
         except GCSObjectException:
-            GCSObject(self._dir_path(source_path)).mv(GCSObject(target_path))
+            gcs_obj = GCSObject(self._dir_path(source_path))
+            with self._changing_usage(gcs_obj, target):
+                usage = gcs_obj.mv(target)
+        self._record_usage(gcs_obj, usage, -1)
+        self._record_usage(target, usage)
 
     def open(self, path, mode='rb'):
         return GCSObject(path).open(mode)
 
     def get_project_directory_content(self, path, subdir, file_display_url, file_url):
-        files, dirs = self._list_dir(path)
+        files, dirs, _ = self._list_dir(path)
+        return self._set_directory_urls(path, subdir, files, dirs, file_display_url)
 
+    def get_project_directory_page(self, path, subdir, file_display_url, file_url, cursor, limit):
+        files, dirs, next_cursor = self._list_dir(path, cursor, limit)
+        files, dirs = self._set_directory_urls(path, subdir, files, dirs, file_display_url)
+        return files, dirs, next_cursor
+
+    def _set_directory_urls(self, path, subdir, files, dirs, file_display_url):
         for file in files:
             file.url = file_display_url(subdir=subdir, file=file.name)
             file.raw_url = self._url(os.path.join(path, file.name))
@@ -91,7 +129,10 @@ def cp_dir(self, source_path, target_path, ignored_files=None):
         source_path = self._dir_path(source_path)
         target_path = self._dir_path(target_path)
 
-        GCSObject(source_path).cp_dir_content(GCSObject(target_path), ignored_files=ignored_files)
+        target = GCSObject(target_path)
+        with self._changing_usage(target):
+            usage = GCSObject(source_path).cp_dir_content(target, ignored_files=ignored_files)
+        self._record_usage(target, usage)
 
     def raw_url(self, project, path):
         return self._url(os.path.join(project.file_root(), path))
@@ -99,7 +140,10 @@ def raw_url(self, project, path):
     def rmtree(self, path):
         path = self._dir_path(path)
 
-        GCSObject(path).rm()
+        gcs_obj = GCSObject(path)
+        with self._changing_usage(gcs_obj):
+            usage = gcs_obj.rm()
+        self._record_usage(gcs_obj, usage, -1)
 
     def download_url(self, project, path):
         return self.raw_url(project, path)
@@ -111,7 +155,9 @@ def publish_initial(self, active_project, published_project):
         try:
             active_project_path = self._dir_path(active_project.file_root())
             published_project_path = self._dir_path(published_project.file_root())
-            GCSObject(active_project_path).cp_dir_content(GCSObject(published_project_path), None)
+            published = GCSObject(published_project_path)
+            usage = GCSObject(active_project_path).cp_dir_content(published, None)
+            self._record_usage(published, usage)
         except BaseException:
             delete_bucket(bucket_name)
             raise
@@ -147,16 +193,27 @@ def make_zip(self, project):
         """Not implemented for GCS storage backend."""
         return None
 
+    def make_zip_stream(self, project, subdir):
+        """Not implemented for GCS storage backend."""
+        return None
+
     def make_checksum_file(self, project):
         """Not implemented for GCS storage backend."""
         return None
 
+    def make_file_manifest(self, project):
+        """Not implemented for GCS storage backend."""
+        return None
+
     def can_make_zip(self):
         return False
 
     def can_make_checksum(self):
         return False
 
+    def can_upload_chunks(self):
+        return False
+
     def is_lightwave_supported(self):
         return False
 
@@ -170,20 +227,63 @@ def serve_file_field(self, field):
         return redirect(field.url)
 
     def _storage_used(self, project):
-        return GCSObject(self._dir_path(project.file_root())).size()
+        return GCSObject(self._dir_path(project.file_root())).cached_usage()[0]
+
+    def _record_usage(self, gcs_obj, usage, sign=1):
+        """
+        Update the cached usage of the directories containing an
+        object, after objects have been added (or removed, if sign is
+        -1) at its path.  If usage is None (the size is not known),
+        the cached usage is discarded instead.
+        """
+        if usage is None:
+            GCSUsageCache().invalidate(gcs_obj.path)
+            return
+        size, count = usage
+        GCSUsageCache().add(gcs_obj.path, sign * size, sign * count)
+
+    @contextlib.contextmanager
+    def _changing_usage(self, *gcs_objs):
+        """
+        Discard the cached usage of the directories containing the
+        given objects, if an operation fails part of the way through.
+        """
+        try:
+            yield
+        except BaseException:
+            for gcs_obj in gcs_objs:
+                GCSUsageCache().invalidate(gcs_obj.path)
+            raise
 
     def _url(self, path):
         return GCSObject(path).url
 
-    def _list_dir(self, path):
+    def _list_dir(self, path, page_token=None, page_size=None):
+        """
+        List the files and subdirectories of a directory.
+
+        If page_size is specified, only a single page of up to
+        page_size objects and prefixes is listed, starting from
+        page_token.  Returns (files, dirs, next_page_token).
+        """
         path = self._dir_path(path)
 
-        iterator = GCSObject(path).ls(delimiter='/')
+        iterator = GCSObject(path).ls(delimiter='/', page_size=page_size, page_token=page_token)
         _, object_name = self._local_filesystem_path_to_gcs_path(path)
         object_name = self._dir_path(object_name)
 
-        blobs = list(iterator)
-        prefixes = iterator.prefixes
+        if page_size:
+            try:
+                page = next(iterator.pages, None)
+            except BadRequest:
+                raise ValidationError('Invalid cursor')
+            blobs = list(page or ())
+            prefixes = page.prefixes if page else ()
+            next_page_token = iterator.next_page_token
+        else:
+            blobs = list(iterator)
+            prefixes = iterator.prefixes
+            next_page_token = None
 
         files = []
         dirs = []
@@ -201,7 +301,7 @@ def _list_dir(self, path):
         files.sort()
         dirs.sort()
 
-        return files, dirs
+        return files, dirs, next_page_token
 
     def _dir_path(self, path):
         return path if path == '' or path.endswith('/') else path + '/'
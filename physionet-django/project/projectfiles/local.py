@@ -1,17 +1,22 @@
-import hashlib
+import datetime
 import os
 import shutil
+import stat
 
 from django.conf import settings
+from django.db.models import Sum
+from physionet import zipwriter
 from physionet.utility import serve_file, sorted_tree_files, zip_dir
+from project.checksums import DigestCache, tree_digests, tree_sha256
 from project.projectfiles.base import BaseProjectFiles
-from project.quota import DemoQuotaManager
+from project.quota import DemoQuotaManager, UsageLedger
 from project.utility import (
     clear_directory,
     get_directory_info,
     get_file_info,
     get_tree_size,
     list_items,
+    list_items_page,
     move_items,
     remove_items,
     rename_file,
@@ -26,13 +31,26 @@ def file_root(self):
 
     def mkdir(self, path):
         os.mkdir(path)
+        UsageLedger.directory_created(path)
 
     def rm(self, path):
+        path_stat = os.lstat(path)
         remove_items([path], ignore_missing=False)
+        if stat.S_ISDIR(path_stat.st_mode):
+            UsageLedger.directory_deleted(path)
+        else:
+            UsageLedger.file_deleted(path, path_stat)
 
     def fwrite(self, path, content):
+        try:
+            old_stat = os.lstat(path)
+        except FileNotFoundError:
+            old_stat = None
         with open(path, 'w') as outfile:
             outfile.write(content)
+        if old_stat:
+            UsageLedger.file_deleted(path, old_stat)
+        UsageLedger.file_created(path)
 
     def fput(self, path, file):
         write_uploaded_file(
@@ -40,15 +58,27 @@ def fput(self, path, file):
             overwrite=False,
             write_file_path=os.path.join(path, file.name),
         )
+        UsageLedger.file_created(os.path.join(path, file.name))
+
+    def fput_staged(self, staging_path, target_path):
+        # Linking and then unlinking the staging file, rather than
+        # renaming it, ensures that an existing file is never replaced
+        os.link(staging_path, target_path)
+        os.unlink(staging_path)
+        UsageLedger.file_created(target_path)
 
     def rename(self, source_path, target_path):
+        source_stat = os.lstat(source_path)
         rename_file(source_path, target_path)
+        UsageLedger.moved(source_path, target_path, source_stat)
 
     def cp_file(self, source_path, target_path):
         shutil.copyfile(source_path, target_path)
 
     def mv(self, source_path, target_path):
+        source_stat = os.lstat(source_path)
         move_items([source_path], target_path)
+        UsageLedger.moved(source_path, os.path.join(target_path, os.path.basename(source_path)), source_stat)
 
     def open(self, path, mode='rb'):
         infile = open(path, mode)
@@ -58,6 +88,15 @@ def open(self, path, mode='rb'):
 
     def get_project_directory_content(self, path, subdir, file_display_url, file_url):
         file_names, dir_names = list_items(path)
+        return self._directory_content(path, subdir, file_names, dir_names, file_display_url, file_url)
+
+    def get_project_directory_page(self, path, subdir, file_display_url, file_url, cursor, limit):
+        file_names, dir_names, next_cursor = list_items_page(path, cursor, limit)
+        display_files, display_dirs = self._directory_content(
+            path, subdir, file_names, dir_names, file_display_url, file_url)
+        return display_files, display_dirs, next_cursor
+
+    def _directory_content(self, path, subdir, file_names, dir_names, file_display_url, file_url):
         display_files, display_dirs = [], []
 
         # Files require desciptive info and download links
@@ -111,11 +150,15 @@ def rm_dir(self, path, remove_zip):
 
     def rmtree(self, path):
         shutil.rmtree(path)
+        UsageLedger.directory_deleted(path)
 
     def publish_initial(self, active_project, published_project):
         if not os.path.isdir(published_project.project_file_root()):
             os.mkdir(published_project.project_file_root())
         os.rename(active_project.file_root(), published_project.file_root())
+        # The published project has a different creation time, so its
+        # ledger is rebuilt when needed
+        UsageLedger.directory_deleted(active_project.file_root())
 
     def publish_rollback(self, active_project, published_project):
         os.rename(published_project.file_root(), active_project.file_root())
@@ -148,50 +191,131 @@ def project_quota_manager(self, project):
         return quota_manager
 
     def published_project_storage_used(self, project):
+        if project.has_file_manifest:
+            return project.file_manifest.filter(is_dir=False).aggregate(total=Sum('size'))['total'] or 0
         return get_tree_size(project.file_root())
 
     def get_zip_file_size(self, project):
         zip_name = project.zip_name(full=True)
         return os.path.getsize(zip_name) if os.path.isfile(zip_name) else 0
 
+    def zip_options(self, project):
+        """
+        Return the arguments to zip_dir for making the project's zip
+        file.
+        """
+        # Files carried over from the previous version are hard links,
+        # so their compressed data can be copied from its zip file
+        previous = None
+        previous_project = project.core_project.publishedprojects.filter(
+            version_order__lt=project.version_order).order_by('-version_order').first()
+        if previous_project:
+            previous = (
+                previous_project.zip_name(full=True),
+                previous_project.file_root(),
+                previous_project.slugged_label(),
+            )
+
+        return dict(
+            zip_name=project.zip_name(full=True),
+            target_dir=project.file_root(),
+            enclosing_folder=project.slugged_label(),
+            previous=previous,
+        )
+
     def make_zip(self, project):
         fname = project.zip_name(full=True)
         if os.path.isfile(fname):
             os.remove(fname)
 
-        zip_dir(
-            zip_name=fname,
-            target_dir=project.file_root(),
-            enclosing_folder=project.slugged_label(),
-        )
+        zip_dir(**self.zip_options(project))
 
         project.compressed_storage_size = os.path.getsize(fname)
         project.save()
 
+    def make_zip_stream(self, project, subdir):
+        file_root = os.path.realpath(project.file_root())
+        path = os.path.realpath(os.path.join(file_root, subdir))
+        if not path.startswith(file_root + '/') or not os.path.isdir(path):
+            raise FileNotFoundError(subdir)
+
+        # The CRCs are recorded in the file manifest when the project
+        # is published, so that no files need to be read here
+        crcs = project.get_file_crcs(os.path.relpath(path, file_root))
+        if crcs is None:
+            return None
+
+        files = []
+        for f in sorted_tree_files(path):
+            file_stat = os.stat(os.path.join(path, f))
+            if crcs.get(f, (None, None))[0] != file_stat.st_size:
+                return None
+            files.append((f, file_stat, crcs[f][1]))
+
+        return zipwriter.StoredZipStream(
+            path,
+            files,
+            prefix=os.path.join(project.slugged_label(), subdir) + '/',
+        )
+
     def make_checksum_file(self, project):
         fname = os.path.join(project.file_root(), 'SHA256SUMS.txt')
         if os.path.isfile(fname):
             os.remove(fname)
 
+        files = [f for f in sorted_tree_files(project.file_root()) if f != 'SHA256SUMS.txt']
+        cache = DigestCache.for_project(project.slug)
         with open(fname, 'w') as outfile:
-            for f in sorted_tree_files(project.file_root()):
-                if f != 'SHA256SUMS.txt':
-                    h = hashlib.sha256()
-                    with open(os.path.join(project.file_root(), f), 'rb') as fp:
-                        block = fp.read(h.block_size)
-                        while block:
-                            h.update(block)
-                            block = fp.read(h.block_size)
-                    outfile.write('{} {}\n'.format(h.hexdigest(), f))
+            for f, digest in tree_sha256(project.file_root(), files, cache=cache):
+                outfile.write('{} {}\n'.format(digest, f))
 
+        self.make_file_manifest(project)
         project.set_storage_info()
 
+    def make_file_manifest(self, project):
+        file_root = project.file_root()
+        files = sorted_tree_files(file_root)
+        digests = tree_digests(file_root, files, cache=DigestCache.for_project(project.slug))
+
+        def timestamp(file_stat):
+            return datetime.datetime.fromtimestamp(file_stat.st_mtime, tz=datetime.timezone.utc)
+
+        def entries():
+            directories = set()
+            for path, file_stat, (sha256, crc32) in digests:
+                directory, name = os.path.split(path)
+                # Record each parent directory the first time it is seen
+                parent = directory
+                while parent and parent not in directories:
+                    directories.add(parent)
+                    dir_stat = os.stat(os.path.join(file_root, parent))
+                    yield dict(directory=os.path.dirname(parent), name=os.path.basename(parent),
+                               is_dir=True, modified=timestamp(dir_stat))
+                    parent = os.path.dirname(parent)
+                yield dict(directory=directory, name=name, size=file_stat.st_size,
+                           modified=timestamp(file_stat), sha256=sha256, crc32=crc32,
+                           device=file_stat.st_dev, inode=file_stat.st_ino)
+
+            # Empty directories
+            for directory, subdirs, _ in os.walk(file_root):
+                for d in subdirs:
+                    path = os.path.relpath(os.path.join(directory, d), file_root)
+                    if path not in directories:
+                        directories.add(path)
+                        yield dict(directory=os.path.dirname(path), name=d, is_dir=True,
+                                   modified=timestamp(os.stat(os.path.join(directory, d))))
+
+        project.set_file_manifest(entries())
+
     def can_make_zip(self):
         return True
 
     def can_make_checksum(self):
         return True
 
+    def can_upload_chunks(self):
+        return settings.CHUNKED_UPLOAD_SIZE > 0
+
     def is_lightwave_supported(self):
         return True
 
@@ -0,0 +1,285 @@
+"""
+Processing of a project's files after publication.
+
+Once a project has been published, its files are made read-only, the
+checksum file and file manifest are written, the storage it uses is
+recorded, and (optionally) a zip file is made.  For local storage,
+this is done as a series of stages:
+
+- 'files': a single walk over the published files, in which a pool of
+  processes sets the permissions of each file (executable if it
+  begins with '#!', read-only otherwise) and computes the digests of
+  the files that are not already in the project's DigestCache.
+
+- 'checksums': SHA256SUMS.txt and the file manifest are written,
+  using the digests found by the first stage.
+
+- 'directories': the directories are made read-only.
+
+- 'zip': the zip file is written by a separate thread, while the
+  stages above are running.  SHA256SUMS.txt is added last, once it
+  has been written.
+
+- 'storage': the storage used by the project is recorded.  Files that
+  are hard links to files of an earlier version are not counted.
+
+- 'previews': previews of README and CSV files are cached, so that
+  they can be displayed at once (see warm_preview_cache.)
+
+Each stage is recorded as a PublicationStage once it is complete, so
+if the task is interrupted and run again, the completed stages are
+skipped.
+"""
+
+import concurrent.futures
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+from physionet.settings.base import StorageTypes
+from physionet.utility import zip_dir
+from project.checksums import DigestCache, file_digests
+
+LOGGER = logging.getLogger(__name__)
+
+# Number of files processed between updates of a stage's progress
+PROGRESS_INTERVAL = 1000
+
+# Seconds between saving the digests computed by the 'files' stage
+DIGEST_CACHE_SAVE_INTERVAL = 300
+
+CHECKSUM_FILE = 'SHA256SUMS.txt'
+
+
+def published_mode(head):
+    """
+    Return the permissions of a published file, given its first bytes.
+
+    >>> oct(published_mode(b'#!/bin/sh'))
+    '0o555'
+    >>> oct(published_mode(b'PK'))
+    '0o444'
+    """
+    return 0o555 if head[:2] == b'#!' else 0o444
+
+
+def _file_mode(path, stat):
+    """
+    Return the mode of a file, as it will be once it is made read-only.
+    """
+    with open(path, 'rb') as f:
+        return (stat.st_mode & ~0o7777) | published_mode(f.read(2))
+
+
+def _process_file(path, digest):
+    """
+    Make a published file read-only, and compute its digests if
+    requested.  Returns the (sha256, crc32) digests, or None.
+    """
+    with open(path, 'rb') as f:
+        os.chmod(f.fileno(), published_mode(f.read(2)))
+    return file_digests(path) if digest else None
+
+
+def walk_tree(root):
+    """
+    Return the relative paths of the regular files within a directory
+    (in the same order as sorted_tree_files), and the full paths of
+    the directory and all of its subdirectories.
+    """
+    files = []
+    dirs = [root]
+    pending = ['']
+    while pending:
+        rel_dir = pending.pop()
+        for entry in os.scandir(os.path.join(root, rel_dir)):
+            path = os.path.join(rel_dir, entry.name)
+            if entry.is_dir(follow_symlinks=False):
+                dirs.append(entry.path)
+                pending.append(path)
+            elif entry.is_file(follow_symlinks=False):
+                files.append(path)
+    files.sort()
+    return files, dirs
+
+
+class PublicationPipeline:
+    """
+    Post-processing of the files of a newly published project.
+    """
+    def __init__(self, project, make_zip):
+        self.project = project
+        self.make_zip = make_zip
+
+    def _stage(self, name):
+        """
+        Return the PublicationStage for the given stage, or None if
+        that stage is already complete.
+        """
+        from project.models import PublicationStage
+
+        stage, _ = PublicationStage.objects.get_or_create(project=self.project, name=name)
+        if stage.end_datetime:
+            LOGGER.info('{}: {} stage already complete'.format(self.project, name))
+            return None
+        return stage
+
+    def _finish(self, stage):
+        stage.end_datetime = timezone.now()
+        stage.save(update_fields=['files_done', 'end_datetime'])
+
+    def run(self):
+        if settings.STORAGE_TYPE != StorageTypes.LOCAL:
+            self.project.make_checksum_file()
+            self.project.set_storage_info()
+            if self.make_zip:
+                self.project.make_zip()
+            files, _ = self.project.get_directory_content('')
+            self.warm_previews([f.name for f in files])
+            return
+
+        file_root = self.project.file_root()
+        files, dirs = walk_tree(file_root)
+
+        zip_stage = self._stage('zip') if self.make_zip else None
+        checksums_written = threading.Event()
+        zip_thread = None
+        zip_error = []
+        if zip_stage:
+            options = self.project.files.zip_options(self.project)
+
+            def zip_files():
+                # SHA256SUMS.txt is added once it has been written; if
+                # the other stages fail, the zip file is abandoned
+                yield from (f for f in files if f != CHECKSUM_FILE)
+                checksums_written.wait()
+                if self.checksums_failed:
+                    raise RuntimeError('checksum stage failed')
+                yield CHECKSUM_FILE
+
+            def write_zip():
+                try:
+                    zip_dir(**options, files=zip_files(), file_mode=_file_mode)
+                except BaseException as exc:
+                    zip_error.append(exc)
+
+            zip_thread = threading.Thread(target=write_zip, daemon=True)
+
+        self.checksums_failed = True
+        try:
+            self.process_files(files, start_thread=zip_thread)
+            self.write_checksums()
+            self.checksums_failed = False
+        finally:
+            checksums_written.set()
+            if zip_thread and zip_thread.is_alive():
+                zip_thread.join()
+
+        self.protect_directories(dirs)
+
+        if zip_stage:
+            if zip_error:
+                raise zip_error[0]
+            self.project.compressed_storage_size = os.path.getsize(options['zip_name'])
+            self.project.save(update_fields=['compressed_storage_size'])
+            self._finish(zip_stage)
+
+        self.record_storage()
+        self.warm_previews(files)
+
+    def process_files(self, files, start_thread=None):
+        """
+        Set the permissions of the files, and compute the digests of
+        files that are not in the DigestCache.
+
+        If start_thread is given, it is started after the worker
+        processes have been created.
+        """
+        stage = self._stage('files')
+        if stage is None:
+            if start_thread:
+                start_thread.start()
+            return
+
+        file_root = self.project.file_root()
+        cache = DigestCache.for_project(self.project.slug)
+        paths = [os.path.join(file_root, f) for f in files]
+        stats = [os.stat(path) for path in paths]
+        uncached = [cache.get(path, stat) is None for path, stat in zip(paths, stats)]
+
+        processes = settings.CHECKSUM_PROCESSES
+        pool = None
+        if processes > 1 and len(files) > 1:
+            pool = concurrent.futures.ProcessPoolExecutor(max_workers=processes)
+            results = pool.map(_process_file, paths, uncached, chunksize=64)
+        else:
+            results = map(_process_file, paths, uncached)
+        if start_thread:
+            start_thread.start()
+
+        last_saved = time.monotonic()
+        try:
+            for n, (path, stat, digests) in enumerate(zip(paths, stats, results), 1):
+                if digests:
+                    cache.set(path, stat, digests)
+                if n % PROGRESS_INTERVAL == 0:
+                    stage.files_done = n
+                    stage.save(update_fields=['files_done'])
+                    if time.monotonic() - last_saved > DIGEST_CACHE_SAVE_INTERVAL:
+                        cache.save()
+                        last_saved = time.monotonic()
+        finally:
+            cache.save(prune=True)
+            if pool:
+                pool.shutdown(cancel_futures=True)
+
+        stage.files_done = len(files)
+        self._finish(stage)
+
+    def write_checksums(self):
+        """
+        Write SHA256SUMS.txt and the file manifest.  The digests of all
+        files are already in the DigestCache, so no files are read.
+        """
+        stage = self._stage('checksums')
+        if stage is None:
+            return
+        self.project.make_checksum_file()
+        os.chmod(os.path.join(self.project.file_root(), CHECKSUM_FILE), 0o444)
+        self._finish(stage)
+
+    def protect_directories(self, dirs):
+        stage = self._stage('directories')
+        if stage is None:
+            return
+        for d in dirs:
+            os.chmod(d, 0o555)
+        stage.files_done = len(dirs)
+        self._finish(stage)
+
+    def record_storage(self):
+        stage = self._stage('storage')
+        if stage is None:
+            return
+        # The incremental size is normally found from the inodes in the
+        # file manifest (see CoreProject.update_incremental_sizes)
+        self.project.refresh_from_db(fields=['has_file_manifest', 'incremental_storage_size'])
+        if not self.project.has_file_manifest:
+            quota = self.project.quota_manager()
+            self.project.incremental_storage_size = quota.bytes_used
+            self.project.save(update_fields=['incremental_storage_size'])
+        self.project.set_storage_info()
+        self._finish(stage)
+
+    def warm_previews(self, files):
+        from project.fileviews import warm_preview_cache
+
+        stage = self._stage('previews')
+        if stage is None:
+            return
+        stage.files_done = warm_preview_cache(self.project, files)
+        self._finish(stage)
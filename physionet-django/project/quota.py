@@ -1,7 +1,11 @@
 import errno
 import os
+import time
 
-from physionet.gcs import GCSObject
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum, TextField, Value
+from django.db.models.functions import Concat, Substr
+from physionet.gcs import GCSObject, GCSUsageCache
 
 
 class QuotaManager:
@@ -19,7 +23,7 @@ def block_size(self):
         whole-block-sized units, which is usually the case.)
         """
         if not self._cache_valid:
-            self.refresh()
+            self._load()
         return self._block_size
 
     @property
@@ -32,7 +36,7 @@ def bytes_used(self):
         include the space used by directory entries.
         """
         if not self._cache_valid:
-            self.refresh()
+            self._load()
         return self._bytes_used
 
     @property
@@ -47,7 +51,7 @@ def bytes_soft(self):
         be a multiple of the filesystem block size.
         """
         if not self._cache_valid:
-            self.refresh()
+            self._load()
         return self._bytes_soft
 
     @property
@@ -61,7 +65,7 @@ def bytes_hard(self):
         be a multiple of the filesystem block size.
         """
         if not self._cache_valid:
-            self.refresh()
+            self._load()
         return self._bytes_hard
 
     @property
@@ -70,7 +74,7 @@ def inodes_used(self):
         Current number of inodes (files + directories) used.
         """
         if not self._cache_valid:
-            self.refresh()
+            self._load()
         return self._inodes_used
 
     @property
@@ -82,7 +86,7 @@ def inodes_soft(self):
         the soft limit to be greater than the hard limit.
         """
         if not self._cache_valid:
-            self.refresh()
+            self._load()
         return self._inodes_soft
 
     @property
@@ -93,9 +97,15 @@ def inodes_hard(self):
         If there is no hard limit, this is 0.
         """
         if not self._cache_valid:
-            self.refresh()
+            self._load()
         return self._inodes_hard
 
+    def _load(self):
+        """
+        Load the current usage and limits when they are first needed.
+        """
+        self.refresh()
+
     def refresh(self):
         """
         Refresh the current usage and limits from the backend.
@@ -151,14 +161,272 @@ def check_delete_directory(self, path):
         pass
 
 
+# Filesystem timestamps have limited resolution, so a directory may be
+# modified again without its mtime changing.  Directories modified
+# less than this many nanoseconds before they are scanned are recorded
+# as having an unknown mtime, so that they are rescanned next time.
+MTIME_GRANULARITY_NS = 1000 * 1000 * 1000
+
+
+def _recorded_mtime(path):
+    mtime_ns = os.stat(path).st_mtime_ns
+    if time.time_ns() - mtime_ns < MTIME_GRANULARITY_NS:
+        return 0
+    return mtime_ns
+
+
+def _is_counted(stat, creation_time_ns):
+    # Files with multiple links are counted only if their
+    # modification time is later than the project creation
+    # time.  Files with a single link are always counted,
+    # regardless of mtime: this accounts for simple cases
+    # involving the demo projects, and also cases where
+    # files have been manually uploaded (e.g., by an
+    # administrator using rsync.)
+    return stat.st_nlink == 1 or stat.st_mtime_ns >= creation_time_ns
+
+
+def _subtree(path):
+    return Q(path=path) | Q(path__startswith=path + '/')
+
+
+class UsageLedger:
+    """
+    Persistent record of the storage used by a project directory tree.
+
+    The ledger consists of one DirectoryUsage entry per directory.
+    The total usage of the project can thus be found with a single
+    query, rather than by scanning the entire tree.
+
+    The ledger is built by scanning the tree the first time it is
+    needed.  After that, it is updated (by LocalProjectFiles) whenever
+    files are uploaded, moved or deleted.  Changes made in other ways
+    are detected by reconcile(), which scans only the directories
+    whose modification time has changed.
+
+    The static methods (file_created, etc.) may be called for any
+    path; they do nothing if the ledger of the containing project has
+    not been built.
+    """
+    # Number of entries written at once when building the ledger
+    BATCH_SIZE = 1000
+
+    def __init__(self, root, creation_time_ns):
+        self.root = os.path.normpath(root)
+        self.creation_time_ns = creation_time_ns
+
+    def usage(self):
+        """
+        Return the total (bytes_used, inodes_used) of the project, or
+        None if the ledger has not been built.
+        """
+        from project.models import DirectoryUsage
+
+        totals = DirectoryUsage.objects.filter(_subtree(self.root)).aggregate(
+            bytes_used=Sum('bytes_used'),
+            inodes_used=Sum('inodes_used'),
+            has_root=Count('pk', filter=Q(path=self.root)),
+        )
+        if not totals['has_root']:
+            return None
+        return totals['bytes_used'], totals['inodes_used']
+
+    def _scan_directory(self, path):
+        """
+        Return a DirectoryUsage entry for a directory, and the list of
+        its subdirectories.
+        """
+        from project.models import DirectoryUsage
+
+        # The directory's mtime is read first, so that any changes made
+        # during the scan will be detected by the next reconcile().
+        entry = DirectoryUsage(path=path, mtime_ns=_recorded_mtime(path),
+                               creation_time_ns=self.creation_time_ns)
+        subdirs = []
+        with os.scandir(path) as entries:
+            for e in entries:
+                if e.is_dir(follow_symlinks=False):
+                    subdirs.append(e.path)
+                else:
+                    stat = e.stat(follow_symlinks=False)
+                    if _is_counted(stat, self.creation_time_ns):
+                        entry.inodes_used += 1
+                        entry.bytes_used += stat.st_size
+        return entry, subdirs
+
+    def build(self):
+        """
+        Scan the entire directory tree and replace the ledger.
+        """
+        from project.models import DirectoryUsage
+
+        with transaction.atomic():
+            DirectoryUsage.objects.filter(_subtree(self.root)).delete()
+            batch = []
+            stack = [self.root]
+            while stack:
+                entry, subdirs = self._scan_directory(stack.pop())
+                batch.append(entry)
+                stack += subdirs
+                if len(batch) >= self.BATCH_SIZE:
+                    DirectoryUsage.objects.bulk_create(batch)
+                    batch = []
+            DirectoryUsage.objects.bulk_create(batch)
+
+    def reconcile(self):
+        """
+        Update the ledger to reflect changes made outside of
+        LocalProjectFiles.
+
+        Each directory is rescanned only if its modification time has
+        changed (i.e., if files have been added, removed or renamed
+        within it.)  The sizes of existing files are assumed not to
+        change.
+
+        Returns the number of directories that were rescanned.
+        """
+        from project.models import DirectoryUsage
+
+        entries = {e.path: e for e in DirectoryUsage.objects.filter(_subtree(self.root))}
+        if self.root not in entries:
+            self.build()
+            return DirectoryUsage.objects.filter(_subtree(self.root)).count()
+
+        children = {}
+        for path in entries:
+            children.setdefault(os.path.dirname(path), []).append(path)
+
+        seen = set()
+        changed = []
+        stack = [self.root]
+        while stack:
+            path = stack.pop()
+            entry = entries.get(path)
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                continue
+            seen.add(path)
+            if entry is not None and entry.mtime_ns == mtime_ns:
+                stack += children.get(path, [])
+            else:
+                new_entry, subdirs = self._scan_directory(path)
+                if entry is not None:
+                    new_entry.pk = entry.pk
+                changed.append(new_entry)
+                stack += subdirs
+
+        with transaction.atomic():
+            DirectoryUsage.objects.filter(
+                pk__in=[e.pk for path, e in entries.items() if path not in seen]).delete()
+            DirectoryUsage.objects.bulk_create([e for e in changed if e.pk is None],
+                                               batch_size=self.BATCH_SIZE)
+            DirectoryUsage.objects.bulk_update(
+                [e for e in changed if e.pk is not None],
+                ['mtime_ns', 'creation_time_ns', 'bytes_used', 'inodes_used'],
+                batch_size=self.BATCH_SIZE)
+        return len(changed)
+
+    @staticmethod
+    def _touch(directory):
+        from project.models import DirectoryUsage
+
+        DirectoryUsage.objects.filter(path=directory).update(
+            mtime_ns=_recorded_mtime(directory))
+
+    @staticmethod
+    def _add_file(directory, stat, sign):
+        from project.models import DirectoryUsage
+
+        entry = DirectoryUsage.objects.select_for_update().filter(path=directory).first()
+        if entry is not None and _is_counted(stat, entry.creation_time_ns):
+            DirectoryUsage.objects.filter(pk=entry.pk).update(
+                bytes_used=F('bytes_used') + sign * stat.st_size,
+                inodes_used=F('inodes_used') + sign)
+
+    @classmethod
+    def file_created(cls, path):
+        """
+        Update the ledger after a file has been created.
+        """
+        path = os.path.normpath(path)
+        with transaction.atomic():
+            cls._add_file(os.path.dirname(path), os.lstat(path), 1)
+            cls._touch(os.path.dirname(path))
+
+    @classmethod
+    def file_deleted(cls, path, stat):
+        """
+        Update the ledger after a file (whose lstat result, before it
+        was deleted, is stat) has been deleted.
+        """
+        path = os.path.normpath(path)
+        with transaction.atomic():
+            cls._add_file(os.path.dirname(path), stat, -1)
+            cls._touch(os.path.dirname(path))
+
+    @classmethod
+    def directory_created(cls, path):
+        """
+        Update the ledger after an empty directory has been created.
+        """
+        from project.models import DirectoryUsage
+
+        path = os.path.normpath(path)
+        parent = os.path.dirname(path)
+        with transaction.atomic():
+            parent_entry = DirectoryUsage.objects.filter(path=parent).first()
+            if parent_entry is not None:
+                DirectoryUsage.objects.create(
+                    path=path, mtime_ns=_recorded_mtime(path),
+                    creation_time_ns=parent_entry.creation_time_ns)
+                cls._touch(parent)
+
+    @classmethod
+    def directory_deleted(cls, path):
+        """
+        Update the ledger after a directory tree has been deleted.
+        """
+        from project.models import DirectoryUsage
+
+        path = os.path.normpath(path)
+        with transaction.atomic():
+            DirectoryUsage.objects.filter(_subtree(path)).delete()
+            if os.path.isdir(os.path.dirname(path)):
+                cls._touch(os.path.dirname(path))
+
+    @classmethod
+    def moved(cls, old_path, new_path, stat):
+        """
+        Update the ledger after a file or directory (whose lstat
+        result is stat) has been renamed.
+        """
+        from project.models import DirectoryUsage
+
+        old_path = os.path.normpath(old_path)
+        new_path = os.path.normpath(new_path)
+        with transaction.atomic():
+            if os.path.isdir(new_path) and not os.path.islink(new_path):
+                DirectoryUsage.objects.filter(_subtree(old_path)).update(
+                    path=Concat(Value(new_path), Substr('path', len(old_path) + 1),
+                                output_field=TextField()))
+            else:
+                cls._add_file(os.path.dirname(old_path), stat, -1)
+                cls._add_file(os.path.dirname(new_path), stat, 1)
+            cls._touch(os.path.dirname(old_path))
+            cls._touch(os.path.dirname(new_path))
+
+
 class DemoQuotaManager(QuotaManager):
     """
-    QuotaManager that scans the directory tree recursively.
+    QuotaManager that keeps a ledger of the usage of each directory.
 
     This implementation is meant to allow testing without superuser
     privileges, but is not robust or scalable.  Usage is calculated by
     reading the entire directory tree and adding up the sizes of the
-    files.
+    files; the result is stored in a UsageLedger, which is then
+    updated as files are uploaded and deleted, so that the tree does
+    not need to be scanned on every request.
 
     Files that have multiple hard links, and were modified before the
     project creation time, are not counted against the quota.
@@ -180,36 +448,35 @@ def __init__(self, project_path, creation_time):
         self._inodes_soft = 0
         self._inodes_hard = 0
 
+    @property
+    def ledger(self):
+        return UsageLedger(self._project_path, self._creation_time_ns)
+
+    def _load(self):
+        """
+        Load the current usage from the ledger, building the ledger (by
+        traversing the directory tree and counting the total number of
+        files and bytes) if necessary.
+        """
+        ledger = self.ledger
+        usage = ledger.usage()
+        if usage is None:
+            ledger.build()
+            usage = ledger.usage()
+        self._bytes_used, self._inodes_used = usage
+        self._cache_valid = True
+
     def refresh(self):
         """
         Refresh the current usage and limits from the backend.
 
-        This is done by traversing the directory tree and counting the
-        total number of files and bytes.
+        This is done by rescanning the directories that have changed
+        since the ledger was last updated.
         """
-        self._inodes_used = 0
-        self._bytes_used = 0
-        self._scan_tree(self._project_path)
+        self.ledger.reconcile()
+        self._bytes_used, self._inodes_used = self.ledger.usage()
         self._cache_valid = True
 
-    def _scan_tree(self, path):
-        self._inodes_used += 1
-        for entry in os.scandir(path):
-            if entry.is_dir(follow_symlinks=False):
-                self._scan_tree(entry.path)
-            else:
-                s = entry.stat(follow_symlinks=False)
-                # Files with multiple links are counted only if their
-                # modification time is later than the project creation
-                # time.  Files with a single link are always counted,
-                # regardless of mtime: this accounts for simple cases
-                # involving the demo projects, and also cases where
-                # files have been manually uploaded (e.g., by an
-                # administrator using rsync.)
-                if s.st_nlink == 1 or s.st_mtime_ns >= self._creation_time_ns:
-                    self._inodes_used += 1
-                    self._bytes_used += s.st_size
-
     def set_limits(self, bytes_soft=None, bytes_hard=None,
                    inodes_soft=None, inodes_hard=None):
         """
@@ -240,7 +507,7 @@ def check_create_file(self, path, size):
         inodes_used and bytes_used are increased accordingly.
         """
         if not self._cache_valid:
-            self.refresh()
+            self._load()
 
         if self._inodes_used + 1 > self._inodes_hard > 0:
             raise OSError(errno.EDQUOT, 'Quota exceeded')
@@ -256,7 +523,7 @@ def check_delete_file(self, path, size):
         Update usage when deleting a file.
         """
         if not self._cache_valid:
-            self.refresh()
+            self._load()
         self._inodes_used -= 1
         self._bytes_used -= size
 
@@ -270,7 +537,7 @@ def check_create_directory(self, path):
         by 1.
         """
         if not self._cache_valid:
-            self.refresh()
+            self._load()
 
         if self._inodes_used + 1 > self._inodes_hard > 0:
             raise OSError(errno.EDQUOT, 'Quota exceeded')
@@ -282,7 +549,7 @@ def check_delete_directory(self, path):
         Update usage when deleting a directory.
         """
         if not self._cache_valid:
-            self.refresh()
+            self._load()
         self._inodes_used -= 1
 
 
@@ -302,6 +569,13 @@ class GCSQuotaManager(QuotaManager):
     - Usage is calculated by listing all objects in the specified
       prefix (which is only slightly more efficient than a "directory
       traversal" as DemoQuotaManager does) and adding up their sizes.
+      The result is cached, and the cache is updated as files are
+      uploaded and deleted through GCSProjectFiles (see
+      physionet.gcs.GCSUsageCache), so the listing is only repeated
+      when the cached value expires or refresh() is called.  Files
+      uploaded by the browser using signed URLs are counted when the
+      URL is generated, and the usage is recalculated once the
+      uploads are complete (see project.views.generate_signed_url.)
 
     There is no way to create hard links, so every new project version
     must have a copy of every file; therefore, all files are counted
@@ -311,8 +585,9 @@ class GCSQuotaManager(QuotaManager):
     specified hard limits would be exceeded, simulating the behavior
     of a filesystem that enforces quota.
 
-    Currently this does not attempt to track or limit the number of
-    objects, and inodes_used will be zero.
+    inodes_used is the number of objects (including the zero-byte
+    objects that represent empty directories.)  Currently this does
+    not attempt to limit the number of objects.
     """
     def __init__(self, project_path):
         # _project_path must be a directory name (ending with a
@@ -327,18 +602,24 @@ def __init__(self, project_path):
         self._inodes_soft = 0
         self._inodes_hard = 0
 
+    def _load(self):
+        """
+        Load the current usage from the cache, listing objects
+        underneath the project prefix if it is not cached.
+        """
+        self._bytes_used, self._inodes_used = GCSObject(self._project_path).cached_usage()
+        self._cache_valid = True
+
     def refresh(self):
         """
         Refresh the current usage and limits from the backend.
 
         This is done by listing objects underneath the project prefix
-        and counting the total number of bytes.
+        and counting the total number of bytes and objects.
         """
         # FIXME: it'd probably be a *good idea* to try to limit the
-        # number of files.  GCSObject doesn't have a way to calculate
-        # total size and number of objects all at once, but it'd be
-        # easy to do.
-        self._bytes_used = GCSObject(self._project_path).size()
+        # number of files.
+        self._bytes_used, self._inodes_used = GCSObject(self._project_path).cached_usage(refresh=True)
         self._cache_valid = True
 
     def set_limits(self, bytes_soft=None, bytes_hard=None,
@@ -359,7 +640,9 @@ def create_toplevel_directory(self):
         """
         Create the top-level project directory.
         """
-        GCSObject(self._project_path).mkdir()
+        gcs_obj = GCSObject(self._project_path)
+        gcs_obj.mkdir()
+        GCSUsageCache().add(gcs_obj.path, 0, 1)
 
     def check_create_file(self, path, size):
         """
@@ -367,19 +650,21 @@ def check_create_file(self, path, size):
 
         If creating a file of the given size would cause the hard
         limits to be exceeded, this raises an OSError with errno =
-        EDQUOT, and bytes_used is unchanged.  Otherwise, bytes_used is
-        increased accordingly.
+        EDQUOT, and inodes_used/bytes_used are unchanged.  Otherwise,
+        inodes_used and bytes_used are increased accordingly.
         """
         if not self._cache_valid:
-            self.refresh()
+            self._load()
 
         if self._bytes_used + size > self._bytes_hard > 0:
             raise OSError(errno.EDQUOT, 'Quota exceeded')
 
+        self._inodes_used += 1
         self._bytes_used += size
 
     def check_delete_file(self, path, size):
         """
         Update usage when deleting a file.
         """
+        self._inodes_used -= 1
         self._bytes_used -= size
@@ -16,18 +16,30 @@
                 else
                     history.replaceState(subdir, '', page_url);
                 panel.html(result);
-                setClickHandlers();
             },
         });
     }
 
-    function setClickHandlers() {
-        panel.find('a[data-dfp-dir]').click(function(event) {
-            navigateDir($(this).data('dfp-dir'), this.href, true);
-            event.preventDefault();
+    // Load the next page of the current directory, replacing the
+    // row containing the link
+    function loadMore(link) {
+        $.ajax({
+            type: 'GET',
+            url: link.href,
+            success: function(result) {
+                $(link).closest('tr').replaceWith(result);
+            },
         });
     }
-    setClickHandlers();
+
+    panel.on('click', 'a[data-dfp-dir]', function(event) {
+        navigateDir($(this).data('dfp-dir'), this.href, true);
+        event.preventDefault();
+    });
+    panel.on('click', 'a[data-dfp-more]', function(event) {
+        loadMore(this);
+        event.preventDefault();
+    });
 
     window.onpopstate = function(event) {
         if (event.state !== null) {
@@ -0,0 +1,97 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from physionet.enums import LogCategory
+from project.accesslog import AccessLogRecorder
+from project.models import AccessLog, ActiveProject, GCPLog, PublishedProject
+from user.models import User
+
+
+class TestAccessLogRecorder(TestCase):
+    def setUp(self):
+        self.project = PublishedProject.objects.get(slug='demoeicu', version='2.0.0')
+        self.user = User.objects.get(username='aewj')
+        self.recorder = AccessLogRecorder()
+        self.addCleanup(self.recorder.flush)
+        self.now = timezone.now()
+
+    def record_at(self, minutes, category=LogCategory.ACCESS, project=None, data=''):
+        with mock.patch('project.accesslog.timezone.now',
+                        return_value=self.now + datetime.timedelta(minutes=minutes)):
+            self.recorder.record(category, project or self.project, self.user, data)
+
+    def logs(self):
+        return list(AccessLog.objects.filter(user=self.user).order_by('creation_datetime')
+                    .values_list('creation_datetime', 'last_access_datetime', 'count'))
+
+    def minutes(self, minutes):
+        return self.now + datetime.timedelta(minutes=minutes)
+
+    @override_settings(ACCESS_LOG_FLUSH_INTERVAL=0, LOG_TIMEDELTA=10)
+    def test_immediate(self):
+        self.record_at(0)
+        self.record_at(5)
+        self.assertEqual(self.logs(), [(self.minutes(0), self.minutes(5), 2)])
+        self.record_at(20)
+        self.assertEqual(self.logs(), [(self.minutes(0), self.minutes(5), 2),
+                                       (self.minutes(20), self.minutes(20), 1)])
+
+    @override_settings(ACCESS_LOG_FLUSH_INTERVAL=3600, LOG_TIMEDELTA=10)
+    def test_buffered(self):
+        self.record_at(0)
+        self.recorder.flush()
+
+        # Accesses are merged with the existing log, and with each
+        # other, unless they are more than LOG_TIMEDELTA apart
+        for minutes in (1, 2, 3, 30, 35):
+            self.record_at(minutes)
+        active_project = ActiveProject.objects.first()
+        self.record_at(3, category=LogCategory.GCP, project=active_project, data='a')
+        self.record_at(4, category=LogCategory.GCP, project=active_project, data='b')
+        self.assertEqual(self.logs(), [(self.minutes(0), self.minutes(0), 1)])
+
+        self.recorder.flush()
+        self.assertEqual(self.logs(), [(self.minutes(0), self.minutes(3), 4),
+                                       (self.minutes(30), self.minutes(35), 2)])
+        self.assertEqual(sorted(GCPLog.objects.filter(user=self.user).values_list('data', 'count')),
+                         [('a', 1), ('b', 1)])
+
+    @override_settings(ACCESS_LOG_FLUSH_INTERVAL=3600, ACCESS_LOG_MAX_PENDING=2)
+    def test_max_pending(self):
+        self.record_at(0)
+        self.record_at(1)
+        self.assertEqual(len(self.logs()), 0)
+        self.record_at(2, category=LogCategory.GCP, project=ActiveProject.objects.first(), data='a')
+        self.assertEqual(self.logs(), [(self.minutes(0), self.minutes(1), 2)])
+
+    @override_settings(ACCESS_LOG_FLUSH_INTERVAL=60)
+    def test_flush_without_timer(self):
+        """
+        Pending accesses are written by a later request if the timer
+        thread does not run.
+        """
+        with mock.patch('project.accesslog.threading.Timer'), \
+                mock.patch('project.accesslog.time.monotonic', return_value=1000):
+            self.record_at(0)
+        with mock.patch('project.accesslog.time.monotonic', return_value=1059):
+            self.record_at(1)
+        self.assertEqual(len(self.logs()), 0)
+        with mock.patch('project.accesslog.time.monotonic', return_value=1060):
+            self.record_at(2)
+        self.assertEqual(self.logs(), [(self.minutes(0), self.minutes(2), 3)])
+
+    @override_settings(ACCESS_LOG_FLUSH_INTERVAL=3600, LOG_TIMEDELTA=10)
+    def test_failed_flush(self):
+        """
+        Accesses are kept if they cannot be written.
+        """
+        self.record_at(0)
+        with mock.patch.object(self.recorder, '_write', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.recorder.flush()
+        self.record_at(1)
+        self.recorder.flush()
+        self.assertEqual(self.logs(), [(self.minutes(0), self.minutes(1), 2)])
@@ -0,0 +1,61 @@
+import io
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import override_settings
+from django.urls import reverse
+
+from project.fileviews.csv import CSVFileView
+from project.fileviews.text import ENCODING_SAMPLE_SIZE, TextFileView
+from project.models import PublishedProject
+from user.test_views import TestMixin
+
+
+def _file(data):
+    infile = io.BytesIO(data)
+    infile.size = len(data)
+    return infile
+
+
+@override_settings(FILE_PREVIEW_CACHE_TIMEOUT=300)
+class TestFilePreviews(TestMixin):
+    def setUp(self):
+        super().setUp()
+        caches['file-previews'].clear()
+        self.addCleanup(caches['file-previews'].clear)
+        self.project = PublishedProject.objects.get(title='Demo ECG Signal Toolbox')
+
+    def test_cached_preview(self):
+        """
+        Previews of published files are only rendered once.
+        """
+        url = reverse('display_published_project_file', args=(self.project.slug, self.project.version, 'doc/README'))
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertContains(first, '<pre class="plain">')
+
+        with mock.patch.object(TextFileView, 'preview') as preview:
+            second = self.client.get(url)
+        preview.assert_not_called()
+        self.assertEqual(first.content, second.content)
+
+    def test_text_encoding(self):
+        """
+        Text after the sample used to detect the encoding is decoded.
+        """
+        data = b'x' * ENCODING_SAMPLE_SIZE + 'été\n'.encode()
+        preview = TextFileView(self.project, 'notes.txt', _file(data)).preview()
+        self.assertEqual(preview['template'], 'project/file_view_text.html')
+        self.assertIn('été</code>', preview['content'])
+
+        preview = TextFileView(self.project, 'data.bin', _file(b'\0\1\2' * 100)).preview()
+        self.assertEqual(preview, {'show_plain': False})
+
+    def test_csv(self):
+        data = 'name,value\nrésumé,1\n<b>,2'.encode()
+        preview = CSVFileView(self.project, 'table.csv', _file(data)).preview()
+        self.assertIn('<th>name</th>', preview['content'])
+        self.assertIn('<td>résumé</td>', preview['content'])
+        self.assertIn('<td>&lt;b&gt;</td>', preview['content'])
+        self.assertTrue(preview['missing_newline'])
+        self.assertIsNone(preview['truncated_rows'])
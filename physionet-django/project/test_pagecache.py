@@ -0,0 +1,120 @@
+import json
+
+import requests_mock
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from console.utility import register_doi
+from notification.models import News
+from project import pagecache
+from project.models import CoreProject, PublishedProject, PublishedTopic
+
+
+@override_settings(PUBLISHED_PROJECT_CACHE_TIMEOUT=300)
+class TestPublishedProjectCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        caches['shared'].clear()
+        self.addCleanup(caches['shared'].clear)
+        self.project = PublishedProject.objects.get(slug='demoeicu', version='2.0.0')
+        self.url = reverse('published_project', args=(self.project.slug, self.project.version))
+
+    def get_page(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_cached_page(self):
+        """
+        Rendering the page again uses the cached fragments.
+        """
+        first, first_queries = self.get_page()
+        second, second_queries = self.get_page()
+        self.assertLess(second_queries, first_queries)
+        self.assertEqual(first.content, second.content)
+
+    def test_invalidation(self):
+        """
+        Changes to the project or related objects are shown at once.
+        """
+        self.get_page()
+        revision = pagecache.page_revision(self.project)
+
+        News.objects.create(title='Cached news item', content='<p>news</p>', slug='cached-news',
+                            project=self.project)
+        self.assertNotEqual(pagecache.page_revision(self.project), revision)
+        response, _ = self.get_page()
+        self.assertContains(response, 'Cached news item')
+
+        self.project.title = 'Renamed cached project'
+        self.project.save()
+        response, _ = self.get_page()
+        self.assertContains(response, 'Renamed cached project')
+
+        topic = PublishedTopic.objects.create(description='cachedtopic')
+        topic.projects.add(self.project)
+        response, _ = self.get_page()
+        self.assertContains(response, 'cachedtopic')
+
+        topic.projects.clear()
+        response, _ = self.get_page()
+        self.assertNotContains(response, 'cachedtopic')
+
+    def test_moved_and_deleted_news(self):
+        """
+        Moving or deleting a news item discards the pages it was shown on.
+        """
+        other = PublishedProject.objects.exclude(core_project=self.project.core_project).first()
+        news = News.objects.create(title='Moving news item', content='<p>news</p>', slug='moving-news',
+                                   project=self.project)
+        response, _ = self.get_page()
+        self.assertContains(response, 'Moving news item')
+
+        news.project = other
+        news.save()
+        response, _ = self.get_page()
+        self.assertNotContains(response, 'Moving news item')
+
+        news.project = self.project
+        news.save()
+        response, _ = self.get_page()
+        self.assertContains(response, 'Moving news item')
+
+        news.delete()
+        response, _ = self.get_page()
+        self.assertNotContains(response, 'Moving news item')
+
+    def test_other_versions(self):
+        """
+        All versions of a project share a revision.
+        """
+        other = PublishedProject.objects.filter(core_project=self.project.core_project).exclude(
+            pk=self.project.pk).first()
+        revision = pagecache.page_revision(self.project)
+        if other is not None:
+            self.assertEqual(pagecache.page_revision(other), revision)
+        self.project.core_project.save()
+        self.assertNotEqual(pagecache.page_revision(self.project), revision)
+
+    @requests_mock.Mocker()
+    def test_register_doi(self, mocker):
+        """
+        Registering a DOI discards the cached pages.
+        """
+        mocker.post('https://api.datacite.example/dois',
+                    text=json.dumps({'data': {'attributes': {'doi': '10.0000/cached'}}}))
+        core_project = self.project.core_project
+        CoreProject.objects.filter(pk=core_project.pk).update(doi=None)
+        core_project.doi = None
+        self.get_page()
+
+        payload = {'data': {'attributes': {'event': 'publish', 'titles': [{'title': self.project.title}]}}}
+        with self.settings(DATACITE_API_URL='https://api.datacite.example/dois'):
+            register_doi(payload, core_project)
+        response, _ = self.get_page()
+        self.assertContains(response, '10.0000/cached')
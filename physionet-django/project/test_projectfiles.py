@@ -1,6 +1,10 @@
-from unittest import TestCase
+import hashlib
+import os
+import tempfile
+from unittest import TestCase, mock
 
 from django.test import override_settings
+from project import checksums
 from physionet.settings.base import StorageTypes
 from project.models import ActiveProject
 from project.projectfiles.gcs import GCSProjectFiles
@@ -17,3 +21,40 @@ def test_project_files_if_local_storage_type(self):
     def test_project_files_if_google_cloud_storage_type(self):
         project = ActiveProject()
         self.assertIsInstance(project.files, GCSProjectFiles)
+
+
+class TestChecksums(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.root = self.tmpdir.name
+        for name in ('a.txt', 'b.txt', 'c.txt'):
+            with open(os.path.join(self.root, name), 'w') as f:
+                f.write(name * 1000)
+
+    def test_tree_sha256(self):
+        files = ['c.txt', 'a.txt', 'b.txt']
+        result = checksums.tree_sha256(self.root, files, processes=2)
+        self.assertEqual(result, [(f, hashlib.sha256(f.encode() * 1000).hexdigest()) for f in files])
+
+    def test_cached_files_are_not_hashed(self):
+        cache_path = os.path.join(self.root, 'cache', 'digests.jsonl')
+        checksums.tree_sha256(self.root, ['a.txt', 'b.txt'], cache=checksums.DigestCache(cache_path))
+
+        # A hard link of a cached file has the same inode
+        os.link(os.path.join(self.root, 'a.txt'), os.path.join(self.root, 'a2.txt'))
+
+        with mock.patch.object(checksums, 'file_digests', wraps=checksums.file_digests) as file_digests:
+            result = checksums.tree_sha256(self.root, ['a2.txt', 'b.txt', 'c.txt'],
+                                           cache=checksums.DigestCache(cache_path), processes=1)
+        file_digests.assert_called_once_with(os.path.join(self.root, 'c.txt'))
+        self.assertEqual(result[0], ('a2.txt', hashlib.sha256(b'a.txt' * 1000).hexdigest()))
+
+    def test_deleted_files_are_pruned(self):
+        cache_path = os.path.join(self.root, 'cache', 'digests.jsonl')
+        checksums.tree_sha256(self.root, ['a.txt', 'b.txt'], cache=checksums.DigestCache(cache_path))
+        os.unlink(os.path.join(self.root, 'a.txt'))
+
+        checksums.tree_sha256(self.root, ['c.txt'], cache=checksums.DigestCache(cache_path))
+        paths = {entry['path'] for entry in checksums.DigestCache(cache_path).entries.values()}
+        self.assertEqual(paths, {os.path.join(self.root, 'b.txt'), os.path.join(self.root, 'c.txt')})
@@ -0,0 +1,160 @@
+import os
+import stat
+import zipfile
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import override_settings
+from project.fileviews.csv import CSVFileView
+from project.models import CoreProject, PublicationStage, PublishedProject
+from project.publication import PublicationPipeline
+from user.test_views import TestMixin
+
+
+class TestPublicationPipeline(TestMixin):
+    def setUp(self):
+        super().setUp()
+        self.project = PublishedProject.objects.get(slug='demoeicu', version='2.0.0')
+        self.file_root = self.project.file_root()
+
+        # Undo the effects of the pipeline
+        for directory, subdirs, files in os.walk(self.file_root):
+            os.chmod(directory, 0o755)
+            for f in files:
+                os.chmod(os.path.join(directory, f), 0o644)
+        os.remove(os.path.join(self.file_root, 'SHA256SUMS.txt'))
+        os.remove(self.project.zip_name(full=True))
+        with open(os.path.join(self.file_root, 'timeseries', 'run.sh'), 'w') as f:
+            f.write('#!/bin/sh\n')
+
+    def test_pipeline(self):
+        PublicationPipeline(self.project, make_zip=True).run()
+
+        self.assertEqual(stat.S_IMODE(os.stat(self.file_root).st_mode), 0o555)
+        self.assertEqual(stat.S_IMODE(os.stat(os.path.join(self.file_root, 'patient.csv')).st_mode), 0o444)
+        self.assertEqual(stat.S_IMODE(os.stat(os.path.join(self.file_root, 'timeseries', 'run.sh')).st_mode), 0o555)
+        self.assertEqual(stat.S_IMODE(os.stat(os.path.join(self.file_root, 'SHA256SUMS.txt')).st_mode), 0o444)
+        with open(os.path.join(self.file_root, 'SHA256SUMS.txt')) as f:
+            self.assertIn(' timeseries/run.sh\n', f.read())
+
+        with zipfile.ZipFile(self.project.zip_name(full=True)) as zf:
+            infos = zf.infolist()
+            prefix = self.project.slugged_label() + '/'
+            # SHA256SUMS.txt is written last
+            self.assertEqual(infos[-1].filename, prefix + 'SHA256SUMS.txt')
+            modes = {i.filename: i.external_attr >> 16 for i in infos}
+            self.assertEqual(modes[prefix + 'timeseries/run.sh'], 0o100755)
+            self.assertEqual(modes[prefix + 'patient.csv'], 0o100644)
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.compressed_storage_size, os.path.getsize(self.project.zip_name(full=True)))
+        self.assertTrue(self.project.file_manifest.filter(name='run.sh').exists())
+        stages = PublicationStage.objects.filter(project=self.project)
+        self.assertEqual(sorted(stages.values_list('name', flat=True)),
+                         ['checksums', 'directories', 'files', 'previews', 'storage', 'zip'])
+        self.assertFalse(stages.filter(end_datetime=None).exists())
+
+    def test_preview_cache(self):
+        caches['file-previews'].clear()
+        self.addCleanup(caches['file-previews'].clear)
+        with override_settings(FILE_PREVIEW_CACHE_DIR='/nonexistent', FILE_PREVIEW_CACHE_TIMEOUT=300):
+            PublicationPipeline(self.project, make_zip=False).run()
+            with self.project.files.open(os.path.join(self.file_root, 'patient.csv')) as infile, \
+                    mock.patch.object(CSVFileView, 'preview') as preview:
+                cached = CSVFileView(self.project, 'patient.csv', infile).cached_preview()
+        preview.assert_not_called()
+        self.assertIn('<table', cached['content'])
+        stage = PublicationStage.objects.get(project=self.project, name='previews')
+        self.assertGreater(stage.files_done, 0)
+
+    def test_resume(self):
+        # Interrupt the pipeline while writing the checksum file
+        with mock.patch.object(PublishedProject, 'make_checksum_file', side_effect=OSError):
+            with self.assertRaises(OSError):
+                PublicationPipeline(self.project, make_zip=True).run()
+        self.assertFalse(os.path.exists(self.project.zip_name(full=True)))
+        self.assertEqual(stat.S_IMODE(os.stat(os.path.join(self.file_root, 'patient.csv')).st_mode), 0o444)
+
+        # Completed stages are not repeated
+        with mock.patch('project.publication._process_file') as process_file:
+            PublicationPipeline(self.project, make_zip=True).run()
+        process_file.assert_not_called()
+        self.assertTrue(os.path.exists(os.path.join(self.file_root, 'SHA256SUMS.txt')))
+        self.assertTrue(os.path.exists(self.project.zip_name(full=True)))
+
+
+class TestStoredInodes(TestMixin):
+    def setUp(self):
+        super().setUp()
+        self.old = PublishedProject.objects.get(slug='demoeicu', version='2.0.0')
+
+        # A new version in which one file is added to the files of the
+        # previous version
+        self.new = PublishedProject.objects.get(pk=self.old.pk)
+        self.new.pk = None
+        self.new.version = '2.1.0'
+        self.new.version_order += 1
+        self.new.is_latest_version = False
+        self.new.featured = None
+        self.new.save()
+        self.new.files.cp_dir(self.old.file_root(), self.new.file_root(), ignored_files=[])
+        with open(os.path.join(self.new.file_root(), 'new.txt'), 'w') as f:
+            f.write('x' * 1000)
+
+        self.old_size = sum(os.path.getsize(os.path.join(directory, f))
+                            for directory, _, files in os.walk(self.old.file_root()) for f in files)
+
+    def assertSizes(self, project, incremental, reclaimable):
+        project.refresh_from_db()
+        self.assertEqual((project.incremental_storage_size, project.reclaimable_storage_size()),
+                         (incremental, reclaimable))
+
+    def test_shared_files(self):
+        self.old.files.make_file_manifest(self.old)
+        self.new.files.make_file_manifest(self.new)
+        self.assertSizes(self.old, self.old_size, 0)
+        self.assertSizes(self.new, 1000, 1000)
+        self.assertEqual(self.old.core_project.total_published_size, self.old_size + 1000)
+
+        # Removing a version's manifest releases its inodes
+        self.new.clear_file_manifest()
+        self.assertSizes(self.old, self.old_size, self.old_size)
+        self.assertFalse(self.old.core_project.stored_inodes.filter(version_count__gt=1).exists())
+
+        # Files are attributed to the earliest version that contains them
+        self.old.clear_file_manifest()
+        self.assertFalse(self.old.core_project.stored_inodes.exists())
+        self.new.files.make_file_manifest(self.new)
+        self.assertSizes(self.new, self.old_size + 1000, self.old_size + 1000)
+        self.old.files.make_file_manifest(self.old)
+        self.assertSizes(self.old, self.old_size, 0)
+        self.assertSizes(self.new, 1000, 1000)
+
+        # Rebuilding a manifest does not change the totals
+        self.new.files.make_file_manifest(self.new)
+        self.assertSizes(self.old, self.old_size, 0)
+        self.assertSizes(self.new, 1000, 1000)
+        self.assertEqual(self.new.get_storage_info().readable_reclaimable, '1000 B')
+
+    def test_affected_versions(self):
+        """
+        Only the versions that share inodes with a changed manifest
+        are updated.
+        """
+        update = mock.patch.object(CoreProject, 'update_incremental_sizes', autospec=True,
+                                   side_effect=CoreProject.update_incremental_sizes)
+
+        with update as update_sizes:
+            self.old.files.make_file_manifest(self.old)
+        self.assertEqual(update_sizes.call_args.args[1], {self.old.pk})
+
+        with update as update_sizes:
+            self.new.files.make_file_manifest(self.new)
+        self.assertEqual(update_sizes.call_args.args[1], {self.old.pk, self.new.pk})
+        self.assertSizes(self.old, self.old_size, 0)
+        self.assertSizes(self.new, 1000, 1000)
+
+        with update as update_sizes:
+            self.new.clear_file_manifest()
+        self.assertEqual(update_sizes.call_args.args[1], {self.old.pk, self.new.pk})
+        self.assertSizes(self.old, self.old_size, self.old_size)
@@ -0,0 +1,71 @@
+import datetime
+import os
+import tempfile
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from project.models import DirectoryUsage
+from project.projectfiles.local import LocalProjectFiles
+from project.quota import DemoQuotaManager, UsageLedger
+
+
+class TestUsageLedger(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.root = os.path.join(self.tmpdir.name, 'project')
+        os.makedirs(os.path.join(self.root, 'sub', 'deeper'))
+        for name in ('a.txt', 'sub/b.txt', 'sub/deeper/c.txt'):
+            with open(os.path.join(self.root, name), 'w') as f:
+                f.write('x' * 100)
+        self.creation_time = datetime.datetime.now(datetime.timezone.utc)
+        self.files = LocalProjectFiles()
+
+    def quota_manager(self):
+        return DemoQuotaManager(project_path=self.root, creation_time=self.creation_time)
+
+    def assertUsage(self, quota, bytes_used, inodes_used):
+        self.assertEqual((quota.bytes_used, quota.inodes_used), (bytes_used, inodes_used))
+        # The ledger should agree with a full scan of the tree
+        ledger = UsageLedger(self.root, 0)
+        DirectoryUsage.objects.all().delete()
+        ledger.build()
+        self.assertEqual(ledger.usage(), (bytes_used, inodes_used))
+
+    def test_ledger_is_not_rescanned(self):
+        self.assertEqual((self.quota_manager().bytes_used, self.quota_manager().inodes_used), (300, 6))
+        with mock.patch('os.scandir') as scandir:
+            self.assertEqual(self.quota_manager().bytes_used, 300)
+        scandir.assert_not_called()
+
+    def test_file_operations(self):
+        self.quota_manager().bytes_used
+
+        self.files.fput(os.path.join(self.root, 'sub'), SimpleUploadedFile('d.txt', b'y' * 50))
+        self.files.mkdir(os.path.join(self.root, 'new'))
+        self.assertUsage(self.quota_manager(), 350, 8)
+
+        self.files.mv(os.path.join(self.root, 'sub', 'd.txt'), os.path.join(self.root, 'new'))
+        self.files.rename(os.path.join(self.root, 'sub'), os.path.join(self.root, 'renamed'))
+        self.assertUsage(self.quota_manager(), 350, 8)
+        self.assertTrue(DirectoryUsage.objects.filter(path=os.path.join(self.root, 'renamed', 'deeper')).exists())
+
+        self.files.rm(os.path.join(self.root, 'renamed'))
+        self.files.rm(os.path.join(self.root, 'a.txt'))
+        self.assertUsage(self.quota_manager(), 50, 3)
+
+    def test_refresh_rescans_changed_directories(self):
+        quota = self.quota_manager()
+        self.assertEqual(quota.bytes_used, 300)
+        DirectoryUsage.objects.update(mtime_ns=1)
+        DirectoryUsage.objects.filter(path=self.root).update(mtime_ns=os.stat(self.root).st_mtime_ns)
+
+        # Changes made outside of LocalProjectFiles
+        with open(os.path.join(self.root, 'sub', 'e.txt'), 'w') as f:
+            f.write('z' * 20)
+        os.mkdir(os.path.join(self.root, 'sub', 'other'))
+
+        self.assertEqual(UsageLedger(self.root, 0).reconcile(), 3)
+        quota.refresh()
+        self.assertEqual((quota.bytes_used, quota.inodes_used), (320, 8))
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from unittest import mock
 
 from django.conf import settings
@@ -13,6 +14,7 @@
     has_s3_credentials,
     upload_project_to_S3,
 )
+from project.cloud.s3upload import UploadManifest, file_sha256
 from project.models import PublishedProject
 from user.test_views import TestMixin
 
@@ -116,6 +118,61 @@ def test_upload_open_projects(self):
 
         self.assertEqual(bucket_files, expected_files)
 
+    def test_resume_upload(self):
+        """
+        Test that files uploaded previously are not uploaded again.
+        """
+        create_s3_server_access_log_bucket()
+
+        project = PublishedProject.objects.get(slug='demobsn', version='1.0')
+        file_count = sum(len(files) for _, _, files in os.walk(project.file_root())) + 1
+
+        stats = upload_project_to_S3(project)
+        self.assertEqual(stats.files_uploaded, file_count)
+        self.assertEqual(stats.files_skipped, 0)
+
+        s3 = create_s3_client()
+        self.assertGreaterEqual(s3.meta.config.max_pool_connections, settings.S3_UPLOAD_THREADS)
+        bucket = get_bucket_name(project)
+        key = project.slug + '/' + project.version + '/RECORDS'
+        head = s3.head_object(Bucket=bucket, Key=key)
+        self.assertEqual(head['Metadata']['sha256'],
+                         file_sha256(os.path.join(project.file_root(), 'RECORDS')))
+
+        # Remove an object; since it is recorded in the manifest, it
+        # will not be uploaded again
+        s3.delete_object(Bucket=bucket, Key=key)
+        stats = upload_project_to_S3(project)
+        self.assertEqual(stats.files_uploaded, 0)
+        self.assertEqual(stats.files_skipped, file_count)
+
+        # If the bucket itself is removed, everything is uploaded again
+        objects = s3.list_objects_v2(Bucket=bucket)['Contents']
+        s3.delete_objects(Bucket=bucket, Delete={'Objects': [{'Key': o['Key']} for o in objects]})
+        s3.delete_bucket(Bucket=bucket)
+        stats = upload_project_to_S3(project)
+        self.assertEqual(stats.files_uploaded, file_count)
+        s3.head_object(Bucket=bucket, Key=key)
+
+    def test_compact_manifest(self):
+        """
+        Test that repeated entries are removed from an upload manifest.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'manifest.jsonl')
+            stat = os.stat(__file__)
+            manifest = UploadManifest(path)
+            manifest.add('a', stat, '0' * 64)
+            manifest.add('b', stat, '1' * 64)
+            manifest.add('a', stat, '2' * 64)
+            manifest.compact()
+
+            with open(path) as f:
+                self.assertEqual(len(f.readlines()), 2)
+            manifest = UploadManifest(path)
+            self.assertEqual(manifest.entries['a']['sha256'], '2' * 64)
+            self.assertTrue(manifest.is_uploaded('b', stat))
+
     def assert_bucket_is_public(self, bucket_name):
         """
         Check that a bucket exists and allows some form of public access.
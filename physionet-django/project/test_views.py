@@ -1,14 +1,25 @@
 
 import base64
+import datetime
+import io
 import os
+import zipfile
 from http import HTTPStatus
 import json
 from unittest import mock
 
+from django.conf import settings
+from django.contrib import admin, auth
 from django.core import mail
+from django.core.cache import caches
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.test import RequestFactory, TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
+from physionet.utility import sorted_tree_files
+from project.utility import verify_http_credentials
+from project.admin import PublishedProjectAdmin
+from project.authorization.access import ProjectAccess
 from project.forms import ContentForm
 from project.models import (
     AccessPolicy,
@@ -17,13 +28,14 @@
     AuthorInvitation,
     DataAccessRequest,
     DataAccessRequestReviewer,
+    DUASignature,
     License,
     PublishedAuthor,
     PublishedProject,
     StorageRequest,
     SubmissionStatus
 )
-from user.models import User
+from user.models import DownloadToken, Training, User
 from user.test_views import TestMixin, prevent_request_warnings
 
 PROJECT_VIEWS = [
@@ -367,6 +379,94 @@ def test_project_file_upload(self):
         self.assertFalse(os.path.exists(os.path.join(project.file_root(), 't3')))
         self.assertFalse(os.path.exists(os.path.join(project.file_root(), 't4')))
 
+    @override_settings(CHUNKED_UPLOAD_SIZE=10)
+    def test_chunked_upload(self):
+        """
+        Test uploading a file in chunks, and resuming the upload.
+        """
+        project = ActiveProject.objects.get(title='MIMIC-III Clinical Database')
+        self.client.login(username='rgmark@mit.edu', password='Tester11!')
+        start_url = reverse('create_chunked_upload', args=(project.slug,))
+        target = os.path.join(project.file_root(), 'notes', 'chunked.txt')
+        content = b'0123456789abcdefghijklmnopqrstuvwxyz'
+
+        def patch(url, offset, data):
+            return self.client.generic('PATCH', url, data, content_type='application/offset+octet-stream',
+                                       HTTP_UPLOAD_OFFSET=str(offset))
+
+        response = self.client.post(start_url, {'subdir': 'notes', 'file_name': 'chunked.txt', 'size': len(content)})
+        self.assertEqual(response.status_code, 201)
+        url = response.json()['url']
+        self.assertEqual(response.json()['offset'], 0)
+
+        self.assertEqual(patch(url, 0, content[:10]).status_code, 204)
+        # Chunks that are too large, or at the wrong offset
+        self.assertEqual(patch(url, 10, content[10:30]).status_code, 413)
+        response = patch(url, 0, content[:10])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response['Upload-Offset'], '10')
+
+        # Starting the same upload again resumes it
+        response = self.client.post(start_url, {'subdir': 'notes', 'file_name': 'chunked.txt', 'size': len(content)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()['url'], response.json()['offset']), (url, 10))
+        self.assertEqual(self.client.head(url)['Upload-Offset'], '10')
+        self.assertFalse(os.path.exists(target))
+
+        for offset in range(10, len(content), 10):
+            self.assertEqual(patch(url, offset, content[offset:offset + 10]).status_code, 204)
+        with open(target, 'rb') as f:
+            self.assertEqual(f.read(), content)
+        self.assertFalse(project.chunked_uploads.exists())
+        self.assertEqual(os.listdir(os.path.join(settings.MEDIA_ROOT, 'upload-staging')), [])
+
+        # Existing files, invalid names, and files exceeding the allowance
+        for file_name, size in [('chunked.txt', 1), ('.hidden', 1), ('big', 10**12)]:
+            response = self.client.post(start_url, {'subdir': 'notes', 'file_name': file_name, 'size': size})
+            self.assertEqual(response.status_code, 400)
+
+        # Cancelling an upload
+        response = self.client.post(start_url, {'subdir': '', 'file_name': 'cancelled', 'size': 20})
+        url = response.json()['url']
+        patch(url, 0, b'x' * 10)
+        # Data already received counts against the storage allowance
+        project.core_project.storage_allowance = project.storage_used() + 15
+        project.core_project.save()
+        self.assertEqual(patch(url, 10, b'x' * 10).status_code, 413)
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.client.head(url).status_code, 404)
+        self.assertFalse(os.path.exists(os.path.join(project.file_root(), 'cancelled')))
+
+        # Non-submitting author cannot upload
+        response = self.client.post(start_url, {'subdir': '', 'file_name': 'other', 'size': 5})
+        url = response.json()['url']
+        self.client.login(username='aewj@mit.edu', password='Tester11!')
+        response = self.client.post(start_url, {'subdir': '', 'file_name': 'other', 'size': 5})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(patch(url, 0, b'x' * 5).status_code, 404)
+
+    @override_settings(CHUNKED_UPLOAD_SIZE=10)
+    def test_chunked_upload_race(self):
+        """
+        A request for an upload that is completed or cancelled by
+        another request in the meantime fails cleanly.
+        """
+        project = ActiveProject.objects.get(title='MIMIC-III Clinical Database')
+        self.client.login(username='rgmark@mit.edu', password='Tester11!')
+        response = self.client.post(reverse('create_chunked_upload', args=(project.slug,)),
+                                    {'subdir': '', 'file_name': 'raced.txt', 'size': 5})
+        url = response.json()['url']
+        upload = project.chunked_uploads.get()
+
+        # The upload is found, but has been deleted before it is locked
+        project.chunked_uploads.all().delete()
+        with mock.patch('project.views.get_object_or_404', return_value=upload):
+            response = self.client.generic('PATCH', url, b'12345', content_type='application/offset+octet-stream',
+                                           HTTP_UPLOAD_OFFSET='0')
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(self.client.delete(url).status_code, 404)
+        self.assertFalse(os.path.exists(os.path.join(project.file_root(), 'raced.txt')))
+
 
 class TestProjectCreation(TestMixin):
     """
@@ -823,6 +923,188 @@ def test_nonexistent(self):
             'serve_published_project_file', args=('fnord', '1.0', 'Makefile')))
         self.assertEqual(response.status_code, 404)
 
+    @override_settings(PROJECT_ACCESS_CACHE_TIMEOUT=60)
+    def test_project_access(self):
+        """
+        Test that access entitlements are resolved in one query, and
+        that cached entitlements are updated after signing the dua.
+        """
+        project = PublishedProject.objects.get(title='Demo eICU Collaborative Research Database')
+        user = User.objects.get(email='rgmark@mit.edu')
+        ProjectAccess.invalidate(user.pk)
+
+        access = ProjectAccess(project, user)
+        with self.assertNumQueries(1):
+            self.assertFalse(access.has_signed_dua)
+            self.assertFalse(access.has_accepted_access_request)
+            access.has_required_training
+            access.requires_training
+        with self.assertNumQueries(0):
+            self.assertFalse(ProjectAccess(project, user).has_signed_dua)
+
+        self.client.login(username='rgmark@mit.edu', password='Tester11!')
+        self.client.post(reverse('sign_dua', args=(project.slug, project.version)), data={'agree': ''})
+        self.assertTrue(ProjectAccess(project, user).has_signed_dua)
+
+        # Reviewing training updates the cached entitlements, which are
+        # kept no longer than the training remains valid
+        training_type = project.required_trainings.get()
+        training_type.valid_duration = datetime.timedelta(days=365)
+        training_type.save()
+        training = Training.objects.create(slug='access-test', training_type=training_type, user=user)
+        self.assertFalse(ProjectAccess(project, user).has_required_training)
+        training.accept(reviewer=user)
+        with mock.patch.object(caches['shared'], 'set', wraps=caches['shared'].set) as cache_set:
+            self.assertTrue(ProjectAccess(project, user).has_required_training)
+        self.assertEqual(cache_set.call_args.args[2], 60)
+
+        Training.objects.filter(pk=training.pk).update(process_datetime=timezone.now() - datetime.timedelta(days=365)
+                                                       + datetime.timedelta(seconds=30))
+        ProjectAccess.invalidate(user.pk)
+        with mock.patch.object(caches['shared'], 'set', wraps=caches['shared'].set) as cache_set:
+            self.assertTrue(ProjectAccess(project, user).has_required_training)
+        self.assertLessEqual(cache_set.call_args.args[2], 30)
+
+        # Revoking access
+        training.withdraw()
+        self.assertFalse(ProjectAccess(project, user).has_required_training)
+        DUASignature.objects.filter(project=project, user=user).get().delete()
+        self.assertFalse(ProjectAccess(project, user).has_signed_dua)
+        ProjectAccess.invalidate(user.pk)
+
+    def test_file_manifest(self):
+        """
+        Test that listings from the file manifest match the file system.
+        """
+        project = PublishedProject.objects.get(title='Demo ECG Signal Toolbox')
+        # Names whose order depends on case and accents
+        for name in ('alpha.txt', 'Beta.txt', '\u00c9clair.txt', 'zeta.txt'):
+            with open(os.path.join(project.file_root(), 'doc', name), 'w') as f:
+                f.write(name)
+        expected = {}
+        for subdir in ('', 'doc', 'doc/wpg'):
+            files, dirs = project.get_directory_content(subdir)
+            expected[subdir] = ([(f.name, f.size, f.last_modified, f.download_url) for f in files],
+                                [(d.name, d.full_subdir) for d in dirs])
+        storage_used = project.storage_used()
+
+        project.files.make_file_manifest(project)
+        self.assertTrue(project.has_file_manifest)
+        self.assertEqual(project.storage_used(), storage_used)
+
+        with mock.patch('project.projectfiles.local.list_items') as list_items, \
+                mock.patch('project.projectfiles.local.get_tree_size') as get_tree_size:
+            for subdir, (expected_files, expected_dirs) in expected.items():
+                files, dirs = project.get_directory_content(subdir)
+                self.assertEqual([(f.name, f.size, f.last_modified, f.download_url) for f in files],
+                                 expected_files)
+                self.assertEqual([(d.name, d.full_subdir) for d in dirs], expected_dirs)
+            with self.assertRaises(FileNotFoundError):
+                project.get_directory_content('fnord')
+            response = self.client.get(
+                reverse('published_files_panel', args=(project.slug, project.version)), {'subdir': 'doc'})
+            self.assertContains(response, 'wpg')
+            self.assertEqual(project.storage_used(), storage_used)
+        list_items.assert_not_called()
+        get_tree_size.assert_not_called()
+
+        project.clear_file_manifest()
+        self.assertEqual(project.storage_used(), storage_used)
+
+    def test_directory_pages(self):
+        """
+        Test that paged listings, with or without a file manifest,
+        contain every file and directory.
+        """
+        project = PublishedProject.objects.get(title='Demo ECG Signal Toolbox')
+        files, dirs = project.get_directory_content('')
+        expected = [d.name for d in dirs] + [f.name for f in files]
+        self.assertGreater(len(expected), 3)
+
+        def all_pages():
+            names = []
+            cursor = None
+            while True:
+                files, dirs, cursor = project.get_directory_page('', cursor=cursor, limit=2)
+                self.assertLessEqual(len(files) + len(dirs), 2)
+                names += [d.name for d in dirs] + [f.name for f in files]
+                if cursor is None:
+                    return names
+
+        self.assertEqual(all_pages(), expected)
+        project.files.make_file_manifest(project)
+        self.assertEqual(all_pages(), expected)
+        project.clear_file_manifest()
+
+        url = reverse('published_files_panel', args=(project.slug, project.version))
+        with override_settings(FILES_PANEL_PAGE_SIZE=2):
+            response = self.client.get(url, {'subdir': '', 'v': '2'})
+            self.assertContains(response, 'data-dfp-more')
+            self.assertContains(response, expected[1])
+            self.assertNotContains(response, expected[2])
+            response = self.client.get(url, {'subdir': '', 'v': '2', 'cursor': 'd/' + expected[1]})
+            self.assertContains(response, expected[2])
+            self.assertNotContains(response, 'card-header')
+            response = self.client.get(url, {'subdir': '', 'v': '2', 'cursor': 'fnord'})
+            self.assertEqual(response.status_code, 404)
+
+    @prevent_request_warnings
+    def test_subdir_zip(self):
+        """
+        Test downloading a subdirectory as a zip file, in whole and
+        in part.
+        """
+        project = PublishedProject.objects.get(title='Demo ECG Signal Toolbox')
+        url = reverse('serve_published_project_subdir_zip', args=(project.slug, project.version, 'doc'))
+        panel_url = reverse('published_files_panel', args=(project.slug, project.version))
+
+        # The CRCs of the files are only known from the file manifest;
+        # files are never hashed while serving the request
+        with mock.patch('project.checksums.file_digests') as file_digests:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 404)
+        file_digests.assert_not_called()
+        response = self.client.get(panel_url, {'subdir': 'doc', 'v': '2'})
+        self.assertNotContains(response, 'Download folder as ZIP')
+
+        project.files.make_file_manifest(project)
+        response = self.client.get(panel_url, {'subdir': 'doc', 'v': '2'})
+        self.assertContains(response, 'Download folder as ZIP')
+        with mock.patch('project.checksums.file_digests') as file_digests:
+            response = self.client.get(url)
+        file_digests.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Disposition'],
+                         'attachment; filename="{}-doc.zip"'.format(project.slugged_label()))
+        content = b''.join(response.streaming_content)
+        self.assertEqual(int(response['Content-Length']), len(content))
+
+        prefix = project.slugged_label() + '/doc/'
+        doc_dir = os.path.join(project.file_root(), 'doc')
+        with zipfile.ZipFile(io.BytesIO(content)) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(zf.namelist(), [prefix + f for f in sorted_tree_files(doc_dir)])
+            with open(os.path.join(doc_dir, 'Makefile'), 'rb') as f:
+                self.assertEqual(zf.read(prefix + 'Makefile'), f.read())
+
+        response = self.client.get(url, HTTP_RANGE='bytes=100-')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), content[100:])
+        response = self.client.get(url, HTTP_RANGE='bytes=-1000')
+        self.assertEqual(b''.join(response.streaming_content), content[-1000:])
+        response = self.client.get(url, HTTP_RANGE='bytes={}-'.format(len(content)))
+        self.assertEqual(response.status_code, 416)
+
+        response = self.client.get(
+            reverse('serve_published_project_subdir_zip', args=(project.slug, project.version, 'fnord')))
+        self.assertEqual(response.status_code, 404)
+
+        # Credentialed project
+        project = PublishedProject.objects.get(title='Demo eICU Collaborative Research Database')
+        response = self.client.get(
+            reverse('serve_published_project_subdir_zip', args=(project.slug, project.version, 'timeseries')))
+        self.assertEqual(response.status_code, 403)
+
     def test_serve_file(self):
         """
         Test serving files via X-Accel-Redirect.
@@ -1321,6 +1603,33 @@ def test_valid_size_and_filename(self, signed_url_mock):
         self.assertEqual(response.status_code, HTTPStatus.OK)
         self.assertEqual(json.loads(response.content).get('url'), 'https://example.com')
 
+    @mock.patch('project.views.generate_signed_url_helper')
+    def test_upload_usage(self, signed_url_mock):
+        """
+        Files uploaded with signed URLs are counted towards the project's usage.
+        """
+        signed_url_mock.return_value = 'https://example.com'
+        project = ActiveProject.objects.get(title='MIT-BIH Arrhythmia Database')
+
+        self.client.login(**self.user_credentials)
+        with mock.patch('project.views.GCSUsageCache') as usage_cache:
+            response = self.client.post(self.url, self.valid_data, format='json')
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        usage_cache.return_value.add.assert_called_once_with(
+            os.path.join(project.file_root(), 'folder1/folder2/random.txt'), 250000, 1)
+
+        complete_url = reverse('gcs_upload_complete', args=(project.slug,))
+        with mock.patch('project.views.GCSUsageCache') as usage_cache:
+            response = self.client.post(complete_url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        usage_cache.return_value.invalidate.assert_called_once_with(project.file_root() + '/')
+
+        self.client.login(**self.unauthorized_user_credentials)
+        with mock.patch('project.views.GCSUsageCache') as usage_cache:
+            response = self.client.post(complete_url)
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+        usage_cache.return_value.invalidate.assert_not_called()
+
     @mock.patch('project.views.generate_signed_url_helper')
     def test_unauthorized_access(self, signed_url_mock):
         signed_url_mock.return_value = 'https://example.com'
@@ -1361,3 +1670,147 @@ def test_invalid_access(self):
                 format='json'
             )
             self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+
+
+class TestCitations(TestCase):
+    """
+    Test that published project citations are stored and served.
+    """
+    def setUp(self):
+        self.project = PublishedProject.objects.get(slug='demoeicu', version='2.0.0')
+        self.project.doi = '10.13026/citetest'
+        self.project.citations = {}
+        self.project.citation_bibtex = self.project.citation_ris = ''
+        self.project.save()
+
+    def test_stored_citations(self):
+        """
+        The stored citations match the rendered ones, and are used
+        without further queries.
+        """
+        # Rendered on demand, since the project has no stored citations
+        rendered = self.project.citation_text_all()
+        self.project.update_citations()
+        self.project.refresh_from_db()
+
+        with self.assertNumQueries(0):
+            citations = self.project.citation_text_all()
+            bibtex = self.project.get_bibtex()
+            ris = self.project.get_ris()
+        self.assertEqual(citations, rendered)
+
+        authors = self.project.authors.order_by('display_order')
+        self.assertIn(authors.first().initialed_name(), citations['APA'])
+        self.assertIn('https://doi.org/10.13026/citetest', citations['APA'])
+        self.assertIn('doi = {10.13026/citetest}', bibtex)
+        self.assertIn('AU  - ' + authors.first().get_full_name(reverse=True), ris)
+        self.assertIn('DO  - 10.13026/citetest', ris)
+
+    def test_download(self):
+        """
+        The citation can be downloaded as BibTeX or RIS.
+        """
+        self.project.update_citations()
+        for citation_format, content in (('bib', '@misc{demoeicu-2.0.0,'), ('ris', 'TY  - DATA')):
+            response = self.client.get(reverse('published_project_citation',
+                                               args=(self.project.slug, self.project.version, citation_format)))
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(content, response.content.decode())
+            self.assertIn('demoeicu-2.0.0.' + citation_format, response['Content-Disposition'])
+
+        response = self.client.get(reverse('published_project_citation',
+                                           args=(self.project.slug, self.project.version, 'txt')))
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(reverse('published_project_detail',
+                                           args=(self.project.slug, self.project.version)))
+        self.assertEqual(response.json()['bibtex'], self.project.citation_bibtex)
+        self.assertEqual(response.json()['citations']['MLA'], self.project.citations['MLA'])
+
+    def test_admin_changes(self):
+        """
+        The citations and search vector are updated when the project
+        is edited in the admin site.
+        """
+        self.project.update_citations()
+        self.project.title = 'Renamed citation project'
+        self.project.save()
+
+        model_admin = PublishedProjectAdmin(PublishedProject, admin.site)
+        request = RequestFactory().post('/')
+        with mock.patch.object(PublishedProject, 'update_search_vector') as update_search_vector:
+            model_admin.save_related(request, mock.Mock(instance=self.project), [], change=True)
+        update_search_vector.assert_called_once_with()
+
+        self.project.refresh_from_db()
+        self.assertIn('Renamed citation project', self.project.citations['APA'])
+        self.assertIn('Renamed citation project', self.project.citation_bibtex)
+
+
+@override_settings(HTTP_AUTH_CACHE_TIMEOUT=300)
+class TestHttpAuth(TestMixin):
+    """
+    Test verification of HTTP authentication credentials.
+    """
+    def setUp(self):
+        super().setUp()
+        caches['http-auth'].clear()
+        self.addCleanup(caches['http-auth'].clear)
+        self.user = User.objects.get(email='rgmark@mit.edu')
+        self.request = RequestFactory().get('/')
+
+    def verify(self, username, password):
+        with mock.patch('project.utility.auth.authenticate', wraps=auth.authenticate) as authenticate:
+            user = verify_http_credentials(self.request, username, password)
+        return user, authenticate.call_count
+
+    def test_cached_password(self):
+        """
+        A verified password is remembered until it is changed.
+        """
+        self.assertEqual(self.verify('rgmark@mit.edu', 'Tester11!'), (self.user, 1))
+        self.assertEqual(self.verify('rgmark@mit.edu', 'Tester11!'), (self.user, 0))
+        self.assertEqual(self.verify('rgmark@mit.edu', 'badpassword'), (None, 1))
+
+        self.user.set_password('NewPassword12!')
+        self.user.save()
+        self.assertEqual(self.verify('rgmark@mit.edu', 'Tester11!'), (None, 1))
+        self.assertEqual(self.verify('rgmark@mit.edu', 'NewPassword12!'), (self.user, 1))
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.verify('rgmark@mit.edu', 'NewPassword12!'), (None, 1))
+
+    def test_download_token(self):
+        """
+        A download token can be used in place of the password.
+        """
+        token = DownloadToken.generate(self.user)
+        self.assertEqual(self.verify('rgmark', token), (self.user, 0))
+        self.assertEqual(self.verify('rgmark@mit.edu', token), (self.user, 0))
+        self.assertEqual(self.verify('aewj', token), (None, 1))
+        self.assertEqual(self.verify('rgmark', token + 'x'), (None, 1))
+
+        project = ActiveProject.objects.get(title='MIT-BIH Arrhythmia Database')
+        response = self.client.get(reverse('serve_active_project_file_editor', args=(project.slug, 'RECORDS')),
+                                   secure=True, HTTP_USER_AGENT='Wget/1.18',
+                                   HTTP_AUTHORIZATION=_basic_auth('rgmark', token))
+        self.assertEqual(response.status_code, 200)
+
+        # A new token replaces the old one
+        DownloadToken.generate(self.user)
+        self.assertEqual(self.verify('rgmark', token), (None, 1))
+
+    def test_edit_downloads(self):
+        """
+        Users can create and revoke their download token.
+        """
+        self.client.login(username='rgmark', password='Tester11!')
+        response = self.client.post(reverse('edit_downloads'), data={'generate_token': ''})
+        token = response.context['token']
+        self.assertTrue(token.startswith(DownloadToken.PREFIX))
+        self.assertContains(response, token)
+        self.assertEqual(self.verify('rgmark', token), (self.user, 0))
+
+        self.client.post(reverse('edit_downloads'), data={'revoke_token': ''})
+        self.assertFalse(DownloadToken.objects.filter(user=self.user).exists())
@@ -1,9 +1,13 @@
 import doctest
 
-from project import utility
+from project import citations, publication, utility
+from project.fileviews import text
 
 # Automatically run documentation tests in these modules.
 DOCTEST_MODULES = [
+    citations,
+    publication,
+    text,
     utility,
 ]
 
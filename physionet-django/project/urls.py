@@ -93,6 +93,21 @@
         views.generate_signed_url,
         name='generate_signed_url',
     ),
+    path(
+        '<project_slug>/gcs-upload-complete/',
+        views.gcs_upload_complete,
+        name='gcs_upload_complete',
+    ),
+    path(
+        '<project_slug>/uploads/',
+        views.create_chunked_upload,
+        name='create_chunked_upload',
+    ),
+    path(
+        '<project_slug>/uploads/<uuid:upload_id>/',
+        views.chunked_upload,
+        name='chunked_upload',
+    ),
 ]
 
 TEST_CASES = {
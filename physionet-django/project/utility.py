@@ -1,6 +1,7 @@
 import base64
 import datetime
 import errno
+import heapq
 import html.parser
 import json
 import logging
@@ -16,9 +17,10 @@
 from django.conf import settings
 from django.contrib import auth, messages
 from django.contrib.sites.shortcuts import get_current_site
+from django.core.cache import caches
 from django.core.exceptions import PermissionDenied, ValidationError
 from django.http import Http404, HttpResponse
-from django.utils.crypto import constant_time_compare
+from django.utils.crypto import constant_time_compare, salted_hmac
 from googleapiclient.errors import HttpError
 
 
@@ -94,7 +96,8 @@ class StorageInfo():
     Object for storing display information about a project's storage.
     """
     def __init__(self, allowance, used, include_remaining=True,
-                 main_used=None, compressed_used=None, published=0):
+                 main_used=None, compressed_used=None, published=0,
+                 incremental_used=None, reclaimable=None):
         """
         Initialize fields with optional args for published and
         unpublished projects
@@ -133,6 +136,16 @@ def __init__(self, allowance, used, include_remaining=True,
             self.compressed_used = compressed_used
             self.readable_compressed_used = readable_size(compressed_used)
 
+        # Storage not shared with earlier versions, and storage not
+        # shared with any other version
+        if incremental_used is not None:
+            self.incremental_used = incremental_used
+            self.readable_incremental_used = readable_size(incremental_used)
+
+        if reclaimable is not None:
+            self.reclaimable = reclaimable
+            self.readable_reclaimable = readable_size(reclaimable)
+
 
 def list_items(directory, return_separate=True):
     "List files and directories in a directory. Return separate or combine lists"
@@ -148,6 +161,49 @@ def list_items(directory, return_separate=True):
     else:
         return sorted(os.listdir(directory))
 
+
+def parse_directory_cursor(cursor):
+    """
+    Parse a cursor returned by list_items_page.  Returns a tuple of
+    ('d', name) for a directory or ('f', name) for a file, or None if
+    cursor is None.
+
+    >>> parse_directory_cursor('f/RECORDS')
+    ('f', 'RECORDS')
+    """
+    if cursor is None:
+        return None
+    kind, sep, name = cursor.partition('/')
+    if kind not in ('d', 'f') or not sep or not name or '/' in name:
+        raise ValidationError('Invalid cursor')
+    return kind, name
+
+
+def list_items_page(directory, cursor=None, limit=1000):
+    """
+    List up to limit directories and files in a directory, following
+    the item named by cursor.
+
+    Directories are listed before files, each in order of name.  Only
+    the names of the entries are read, so this is much faster than
+    sorting and displaying a large directory in full.  Returns
+    (files, dirs, next_cursor), where next_cursor is None if there
+    are no more items.
+    """
+    start = parse_directory_cursor(cursor)
+    with os.scandir(directory) as entries:
+        keys = (('d' if ent.is_dir() else 'f', ent.name) for ent in entries)
+        page = heapq.nsmallest(limit + 1, (key for key in keys if start is None or key > start))
+
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = '/'.join(page[-1])
+    files = [name for kind, name in page if kind == 'f']
+    dirs = [name for kind, name in page if kind == 'd']
+    return files, dirs, next_cursor
+
+
 def remove_items(items, ignore_missing=True):
     """
     Delete the list of (full file path) files/directories.
@@ -412,6 +468,51 @@ def http_auth_allowed(request):
         return False
 
 
+def _http_auth_cache_key(username, password):
+    # The cache must not reveal the password, so use a keyed hash
+    digest = salted_hmac('project.utility.verify_http_credentials',
+                         username.lower() + '\0' + password, algorithm='sha256')
+    return 'http-auth:' + digest.hexdigest()
+
+
+def verify_http_credentials(request, username, password):
+    """
+    Check a username (or email address) and password given using HTTP
+    authentication, and return the corresponding active user, or None.
+
+    The password may be the user's DownloadToken.  Otherwise,
+    verifying a password is deliberately slow, so a successful result
+    is remembered in the 'http-auth' cache for HTTP_AUTH_CACHE_TIMEOUT
+    seconds.  A remembered result is only used if the user's password
+    (as indicated by the session auth hash) has not changed since, and
+    the user is still active.
+    """
+    from user.models import DownloadToken, User
+
+    user = DownloadToken.authenticate(username, password)
+    if user:
+        return user
+
+    timeout = settings.HTTP_AUTH_CACHE_TIMEOUT
+    if timeout:
+        auth_cache = caches['http-auth']
+        key = _http_auth_cache_key(username, password)
+        cached = auth_cache.get(key)
+        if cached:
+            uid, authhash = cached
+            user = User.objects.filter(id=uid, is_active=True).first()
+            if user and constant_time_compare(user.get_session_auth_hash(), authhash):
+                return user
+            auth_cache.delete(key)
+
+    user = auth.authenticate(request=request, username=username, password=password)
+    if user and user.is_active:
+        if timeout:
+            auth_cache.set(key, (user.id, user.get_session_auth_hash()), timeout)
+        return user
+    return None
+
+
 def check_http_auth(request):
     """
     Check if a request includes HTTP authentication.
@@ -461,9 +562,7 @@ def check_http_auth(request):
             except Exception:
                 return
 
-            user = auth.authenticate(request=request,
-                                     username=username,
-                                     password=password)
+            user = verify_http_credentials(request, username, password)
             if user and user.is_active:
                 request.user = user
 
@@ -1,6 +1,8 @@
 import datetime as dt
+import errno
 import logging
 import os
+from urllib.parse import urlencode
 
 import notification.utility as notification
 from dal import autocomplete
@@ -15,31 +17,34 @@
 from django.db import transaction
 from django.db.models import Q
 from django.forms import inlineformset_factory, modelformset_factory
-from django.http import Http404, JsonResponse
+from django.http import Http404, HttpResponse, HttpResponseNotAllowed, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.template import loader
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 from django.utils.html import format_html, format_html_join
+from physionet.enums import LogCategory
 from physionet.forms import set_saved_fields_cookie
+from physionet.gcs import GCSUsageCache
 from physionet.middleware.maintenance import ServiceUnavailable
 from physionet.storage import generate_signed_url_helper
-from physionet.utility import serve_file
-from project import forms, utility
+from physionet.utility import serve_file, serve_zip_stream
+from project import forms, pagecache, utility
+from project.accesslog import record_access
 from project.fileviews import display_project_file
 from project.models import (
     AccessPolicy,
-    AccessLog,
     ActiveProject,
     Affiliation,
     AnonymousAccess,
     Author,
     AuthorInvitation,
+    ChunkedUpload,
     DataAccess,
     DataAccessRequest,
     DataAccessRequestReviewer,
     DUASignature,
-    GCPLog,
     DUA,
     Publication,
     PublishedAuthor,
@@ -50,11 +55,11 @@
     Topic,
     UploadedDocument,
 )
-from project.authorization.access import can_view_project_files, can_access_project
+from project.authorization.access import ProjectAccess, can_access_project
 from project.projectfiles import ProjectFiles
-from project.validators import validate_filename, validate_gcs_bucket_object
+from project.validators import validate_filename, validate_gcs_bucket_object, validate_subdir
 from user.forms import AssociatedEmailChoiceForm
-from user.models import CloudInformation, CredentialApplication, LegacyCredential, User, Training
+from user.models import CloudInformation, CredentialApplication, LegacyCredential, User
 from project.cloud.s3 import (
     has_s3_credentials,
     files_sent_to_S3,
@@ -900,10 +905,30 @@ def get_project_file_info(project, subdir):
     subdirectory.
     Helper function for generating the files panel
     """
+    (display_files, display_dirs, dir_breadcrumbs, parent_dir,
+     file_error, _) = get_project_file_page(project, subdir, paged=False)
+    return display_files, display_dirs, dir_breadcrumbs, parent_dir, file_error
+
+
+def get_project_file_page(project, subdir, cursor=None, paged=True):
+    """
+    Get the files, directories, and breadcrumb info for a project's
+    subdirectory, and the cursor for the next page of the directory.
+
+    If paged is true (and FILES_PANEL_PAGE_SIZE is not zero), only
+    the first FILES_PANEL_PAGE_SIZE items following the cursor are
+    listed.
+    Helper function for generating the files panel
+    """
     display_files = display_dirs = ()
+    next_cursor = None
     try:
-        display_files, display_dirs = project.get_directory_content(
-            subdir=subdir)
+        if paged and settings.FILES_PANEL_PAGE_SIZE:
+            display_files, display_dirs, next_cursor = project.get_directory_page(
+                subdir=subdir, cursor=cursor, limit=settings.FILES_PANEL_PAGE_SIZE)
+        else:
+            display_files, display_dirs = project.get_directory_content(
+                subdir=subdir)
         file_error = None
     except (FileNotFoundError, ValidationError):
         file_error = 'Directory not found'
@@ -914,7 +939,17 @@ def get_project_file_info(project, subdir):
     dir_breadcrumbs = utility.get_dir_breadcrumbs(subdir)
     parent_dir = os.path.split(subdir)[0]
 
-    return display_files, display_dirs, dir_breadcrumbs, parent_dir, file_error
+    return display_files, display_dirs, dir_breadcrumbs, parent_dir, file_error, next_cursor
+
+
+def get_files_panel_more_url(files_panel_url, subdir, next_cursor, **params):
+    """
+    Return the URL for loading the next page of a files panel, or None
+    if there are no more files.
+    """
+    if next_cursor is None:
+        return None
+    return '{}?{}'.format(files_panel_url, urlencode(dict(params, subdir=subdir, cursor=next_cursor)))
 
 
 def get_project_file_warning(display_files, display_dirs, subdir):
@@ -970,6 +1005,7 @@ def project_files_panel(request, project_slug, **kwargs):
     project, is_submitting = (kwargs[k] for k in ('project', 'is_submitting'))
     is_editor = request.user == project.editor
     subdir = request.GET['subdir']
+    cursor = request.GET.get('cursor')
 
     if is_submitting and project.author_editable():
         files_editable = True
@@ -979,7 +1015,20 @@ def project_files_panel(request, project_slug, **kwargs):
         files_editable = False
 
     (display_files, display_dirs, dir_breadcrumbs, parent_dir,
-     file_error) = get_project_file_info(project=project, subdir=subdir)
+     file_error, next_cursor) = get_project_file_page(project=project, subdir=subdir, cursor=cursor)
+    more_url = get_files_panel_more_url(reverse('project_files_panel', args=(project.slug,)), subdir, next_cursor)
+
+    # Subsequent pages are added to the end of the existing panel
+    if cursor is not None:
+        if file_error:
+            raise Http404()
+        return render(request, 'project/edit_files_panel_rows.html', {
+            'display_files': display_files,
+            'display_dirs': display_dirs,
+            'files_editable': files_editable,
+            'more_url': more_url,
+        })
+
     file_warning = get_project_file_warning(display_files, display_dirs,
                                               subdir)
 
@@ -1003,6 +1052,7 @@ def project_files_panel(request, project_slug, **kwargs):
             'file_warning': file_warning,
             'storage_type': settings.STORAGE_TYPE,
             'storage_info': storage_info,
+            'chunked_upload': project.files.can_upload_chunks(),
             'upload_files_form': upload_files_form,
             'create_folder_form': create_folder_form,
             'rename_item_form': rename_item_form,
@@ -1012,6 +1062,7 @@ def project_files_panel(request, project_slug, **kwargs):
             'is_editor': is_editor,
             'files_editable': files_editable,
             'individual_size_limit': utility.readable_size(ActiveProject.INDIVIDUAL_FILE_SIZE_LIMIT),
+            'more_url': more_url,
         },
     )
 
@@ -1119,7 +1170,8 @@ def project_files(request, project_slug, subdir='', **kwargs):
     )
 
     (display_files, display_dirs, dir_breadcrumbs, parent_dir,
-     file_error) = get_project_file_info(project=project, subdir=subdir)
+     file_error, next_cursor) = get_project_file_page(project=project, subdir=subdir)
+    more_url = get_files_panel_more_url(reverse('project_files_panel', args=(project.slug,)), subdir, next_cursor)
     file_warning = get_project_file_warning(display_files, display_dirs, subdir)
 
     (upload_files_form, create_folder_form, rename_item_form,
@@ -1131,6 +1183,7 @@ def project_files(request, project_slug, subdir='', **kwargs):
         'project/project_files.html',
         {
             'project': project,
+            'more_url': more_url,
             'individual_size_limit': utility.readable_size(ActiveProject.INDIVIDUAL_FILE_SIZE_LIMIT),
             'subdir': subdir,
             'parent_dir': parent_dir,
@@ -1152,6 +1205,7 @@ def project_files(request, project_slug, subdir='', **kwargs):
             'maintenance_message': maintenance_message,
             'is_lightwave_supported': project.files.is_lightwave_supported(),
             'storage_type': settings.STORAGE_TYPE,
+            'chunked_upload': project.files.can_upload_chunks(),
         },
     )
 
@@ -1176,7 +1230,7 @@ def serve_active_project_file(request, project_slug, file_name, **kwargs):
         else:
             sandbox = True
 
-        return serve_file(file_path, attach=attach, sandbox=sandbox)
+        return serve_file(file_path, attach=attach, sandbox=sandbox, request=request)
     except IsADirectoryError:
         return redirect(request.path + '/')
 
@@ -1633,21 +1687,28 @@ def published_files_panel(request, project_slug, version):
     if subdir is None:
         raise Http404()
 
-    user = request.user
-
     # Anonymous access authentication
     an_url = request.get_signed_cookie('anonymousaccess', None, max_age=60*60)
     has_passphrase = project.get_anonymous_url() == an_url
 
-    if can_view_project_files(project, user) or has_passphrase:
+    if ProjectAccess.for_request(request, project).can_view_files() or has_passphrase:
+        # The obsolescent version 1 panel is not paged
+        paged = request.GET.get('v', '1') != '1'
+        cursor = request.GET.get('cursor')
         (display_files, display_dirs, dir_breadcrumbs, parent_dir,
-         file_error) = get_project_file_info(project=project, subdir=subdir)
+         file_error, next_cursor) = get_project_file_page(project=project, subdir=subdir, cursor=cursor, paged=paged)
 
         files_panel_url = reverse('published_files_panel',
             args=(project.slug, project.version))
+        more_url = get_files_panel_more_url(files_panel_url, subdir, next_cursor, v='2')
 
-        if request.GET.get('v', '1') == '1':
+        if not paged:
             template = 'project/files_panel.html'
+        elif cursor is not None:
+            # Subsequent pages are added to the end of the existing panel
+            if file_error:
+                raise Http404()
+            template = 'project/files_panel_rows.html'
         else:
             template = 'project/files_panel_v2.html'
 
@@ -1655,7 +1716,9 @@ def published_files_panel(request, project_slug, version):
             {'project':project, 'subdir':subdir,
              'dir_breadcrumbs':dir_breadcrumbs, 'parent_dir':parent_dir,
              'display_files':display_files, 'display_dirs':display_dirs,
-             'files_panel_url':files_panel_url, 'file_error':file_error})
+             'files_panel_url': files_panel_url, 'file_error': file_error,
+             'can_stream_zip': bool(subdir) and project.can_stream_subdir_zip(subdir),
+             'more_url': more_url})
     else:
         raise Http404()
 
@@ -1678,7 +1741,7 @@ def serve_active_project_file_editor(request, project_slug, full_file_name):
         file_path = os.path.join(project.file_root(), full_file_name)
         try:
             attach = ('download' in request.GET)
-            return serve_file(file_path, attach=attach, allow_directory=True)
+            return serve_file(file_path, attach=attach, allow_directory=True, request=request)
         except IsADirectoryError:
             return redirect(request.path + '/')
         except (NotADirectoryError, FileNotFoundError):
@@ -1700,13 +1763,11 @@ def serve_published_project_file(request, project_slug, version,
     except ObjectDoesNotExist:
         raise Http404()
 
-    user = request.user
-
     # Anonymous access authentication
     an_url = request.get_signed_cookie('anonymousaccess', None, max_age=60*60)
     has_passphrase = project.get_anonymous_url() == an_url
 
-    if can_view_project_files(project, user) or has_passphrase:
+    if ProjectAccess.for_request(request, project).can_view_files() or has_passphrase:
         file_path = os.path.join(project.file_root(), full_file_name)
         try:
             attach = ('download' in request.GET)
@@ -1722,7 +1783,7 @@ def serve_published_project_file(request, project_slug, version,
                 sandbox = True
 
             return serve_file(file_path, attach=attach, allow_directory=True,
-                              sandbox=sandbox)
+                              sandbox=sandbox, request=request)
         except IsADirectoryError:
             return redirect(request.path + '/')
         except (NotADirectoryError, FileNotFoundError):
@@ -1743,13 +1804,11 @@ def display_published_project_file(request, project_slug, version,
     except ObjectDoesNotExist:
         raise Http404()
 
-    user = request.user
-
     # Anonymous access authentication
     an_url = request.get_signed_cookie('anonymousaccess', None, max_age=60*60)
     has_passphrase = project.get_anonymous_url() == an_url
 
-    if can_view_project_files(project, user) or has_passphrase:
+    if ProjectAccess.for_request(request, project).can_view_files() or has_passphrase:
         return display_project_file(request, project, full_file_name)
 
     # Display error message: "you must [be a credentialed user and]
@@ -1776,21 +1835,49 @@ def serve_published_project_zip(request, project_slug, version):
     except ObjectDoesNotExist:
         raise Http404()
 
-    user = request.user
-
     # Anonymous access authentication
     an_url = request.get_signed_cookie('anonymousaccess', None, max_age=60*60)
     has_passphrase = project.get_anonymous_url() == an_url
 
-    if can_view_project_files(project, user) or has_passphrase:
+    if ProjectAccess.for_request(request, project).can_view_files() or has_passphrase:
         try:
-            return serve_file(project.zip_name(full=True))
+            return serve_file(project.zip_name(full=True), request=request)
         except FileNotFoundError:
             raise Http404()
 
     return utility.require_http_auth(request)
 
 
+def serve_published_project_subdir_zip(request, project_slug, version, subdir):
+    """
+    Serve a zip file of a subdirectory of a published project,
+    generated as it is downloaded.
+    """
+    utility.check_http_auth(request)
+    try:
+        project = PublishedProject.objects.get(slug=project_slug, version=version)
+    except ObjectDoesNotExist:
+        raise Http404()
+
+    # Anonymous access authentication
+    an_url = request.get_signed_cookie('anonymousaccess', None, max_age=60 * 60)
+    has_passphrase = project.get_anonymous_url() == an_url
+
+    if ProjectAccess.for_request(request, project).can_view_files() or has_passphrase:
+        try:
+            validate_subdir(subdir)
+            stream = project.files.make_zip_stream(project, subdir)
+        except (ValidationError, FileNotFoundError):
+            raise Http404()
+        if stream is None:
+            raise Http404()
+
+        filename = '{}-{}.zip'.format(project.slugged_label(), subdir.replace('/', '-'))
+        return serve_zip_stream(request, stream, filename)
+
+    return utility.require_http_auth(request)
+
+
 def published_project_license(request, project_slug, version):
     """
     Displays a published project's license
@@ -1808,6 +1895,25 @@ def published_project_license(request, project_slug, version):
         'license_content':license_content})
 
 
+def published_project_citation(request, project_slug, version, citation_format):
+    """
+    Download a published project's citation, as a BibTeX entry ('bib')
+    or RIS record ('ris').
+    """
+    project = get_object_or_404(PublishedProject, slug=project_slug, version=version)
+    if citation_format == 'bib':
+        content, content_type = project.get_bibtex(), 'application/x-bibtex'
+    elif citation_format == 'ris':
+        content, content_type = project.get_ris(), 'application/x-research-info-systems'
+    else:
+        raise Http404()
+
+    response = HttpResponse(content, content_type=content_type + '; charset=utf-8')
+    response['Content-Disposition'] = 'attachment; filename="{}-{}.{}"'.format(
+        project.slug, project.version, citation_format)
+    return response
+
+
 def published_project_required_training(request, project_slug, version):
     """Displays a published project's required training"""
     project = get_object_or_404(PublishedProject, slug=project_slug, version=version)
@@ -1855,21 +1961,28 @@ def published_project(request, project_slug, version, subdir=''):
     except ObjectDoesNotExist:
         raise Http404()
 
-    authors = project.authors.all().order_by('display_order')
-    for a in authors:
-        a.set_display_info()
+    # The user-independent parts of the page are cached (see
+    # project.pagecache), so the data shown in them is only loaded
+    # if needed
+    def get_authors():
+        authors = project.authors.select_related('user').prefetch_related('affiliations').order_by('display_order')
+        for a in authors:
+            a.set_display_info()
+        return authors
+
+    authors = SimpleLazyObject(get_authors)
     references = project.references.all().order_by('order')
-    publication = project.publications.all().first()
+    publication = SimpleLazyObject(lambda: project.publications.all().first())
     topics = project.topics.all()
     languages = project.programming_languages.all()
-    contact = project.contact
+    contact = SimpleLazyObject(lambda: project.contact)
     news = project.get_all_news().order_by('-publish_datetime')
     parent_projects = project.parent_projects.all()
     # derived_projects = project.derived_publishedprojects.all()
     data_access = DataAccess.objects.filter(project=project)
     user = request.user
-    _, _, _, _, _, latest_version = project.info_card()
-    citations = project.citation_text_all()
+    latest_version = SimpleLazyObject(lambda: project.core_project.publishedprojects.all().last())
+    citations = SimpleLazyObject(project.citation_text_all)
     platform_citations = project.get_platform_citation()
     show_platform_wide_citation = any(platform_citations.values())
     main_platform_citation = next((item for item in platform_citations.values() if item is not None), '')
@@ -1878,29 +1991,13 @@ def published_project(request, project_slug, version, subdir=''):
     an_url = request.get_signed_cookie('anonymousaccess', None, max_age=60 * 60)
     has_passphrase = project.get_anonymous_url() == an_url
 
-    can_view_files = can_view_project_files(project, user) or has_passphrase
-    is_authorized = can_access_project(project, user) or has_passphrase
-    has_signed_dua = False if not user.is_authenticated else DUASignature.objects.filter(
-        project=project,
-        user=user
-    ).exists()
-    has_accepted_access_request = False if not user.is_authenticated else DataAccessRequest.objects.get_active(
-        project=project,
-        requester=user,
-        status=DataAccessRequest.ACCEPT_REQUEST_VALUE
-    ).exists()
-
-    if project.required_trainings.exists():
-        requires_training = True
-    else:
-        requires_training = False
-
-    has_required_training = (
-        False
-        if not user.is_authenticated
-        else Training.objects.get_valid().filter(training_type__in=project.required_trainings.all(), user=user).count()
-        == project.required_trainings.count()
-    )
+    access = ProjectAccess.for_request(request, project)
+    can_view_files = access.can_view_files() or has_passphrase
+    is_authorized = access.can_access() or has_passphrase
+    has_signed_dua = access.has_signed_dua
+    has_accepted_access_request = access.has_accepted_access_request
+    requires_training = access.requires_training
+    has_required_training = access.has_required_training
     current_site = get_current_site(request)
     bulk_url_prefix = notification.get_url_prefix(request, bulk_download=True)
     all_project_versions = PublishedProject.objects.filter(slug=project_slug).order_by('version_order')
@@ -1933,14 +2030,16 @@ def published_project(request, project_slug, version, subdir=''):
         'has_s3_credentials': has_s3_credentials(),
         'show_platform_wide_citation': show_platform_wide_citation,
         'main_platform_citation': main_platform_citation,
+        'page_cache_timeout': settings.PUBLISHED_PROJECT_CACHE_TIMEOUT,
+        'page_revision': pagecache.page_revision(project),
     }
     # The file and directory contents
     if can_view_files:
         if user.is_authenticated:
-            AccessLog.objects.update_or_create(project=project, user=request.user)
+            record_access(LogCategory.ACCESS, project, request.user)
 
         (display_files, display_dirs, dir_breadcrumbs, parent_dir,
-         file_error) = get_project_file_info(project=project, subdir=subdir)
+         file_error, next_cursor) = get_project_file_page(project=project, subdir=subdir)
         if file_error:
             status = 404
         else:
@@ -1950,7 +2049,8 @@ def published_project(request, project_slug, version, subdir=''):
             utility.readable_size(s) for s in (project.main_storage_size, project.compressed_storage_size)
         ]
         files_panel_url = reverse('published_files_panel', args=(project.slug, project.version))
-        accepted_access_request = [] if not user.is_authenticated else (
+        more_url = get_files_panel_more_url(files_panel_url, subdir, next_cursor, v='2')
+        accepted_access_request = [] if not has_accepted_access_request else (
             DataAccessRequest.objects.get_active(
                 project=project, requester=user, status=DataAccessRequest.ACCEPT_REQUEST_VALUE
             )
@@ -1964,6 +2064,8 @@ def published_project(request, project_slug, version, subdir=''):
                 'display_files': display_files,
                 'display_dirs': display_dirs,
                 'files_panel_url': files_panel_url,
+                'more_url': more_url,
+                'can_stream_zip': bool(subdir) and project.can_stream_subdir_zip(subdir),
                 'subdir': subdir,
                 'parent_dir': parent_dir,
                 'file_error': file_error,
@@ -2391,7 +2493,162 @@ def generate_signed_url(request, project_slug):
         size=size
     )
 
+    # The file is uploaded directly to the bucket, so count it
+    # against the project's usage now; otherwise repeated uploads
+    # would all be checked against the usage before the first one.
+    # The usage is recalculated when the uploads are complete (see
+    # gcs_upload_complete.)
+    GCSUsageCache().add(os.path.join(project.file_root(), filename.strip('/')), size, 1)
+
     data = f'filename: {filename};size: {size // (1024)}kB'
-    GCPLog.objects.update_or_create(project=project, user=request.user, data=data)
+    record_access(LogCategory.GCP, project, request.user, data)
 
     return JsonResponse({'url': url})
+
+
+@login_required
+def gcs_upload_complete(request, project_slug):
+    """
+    API endpoint called after uploading files using signed URLs.
+
+    The sizes reserved by generate_signed_url are only estimates (an
+    upload may have failed, or replaced an existing file), so the
+    project's cached usage is discarded and recalculated from the
+    bucket when it is next needed.
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+
+    project = get_object_or_404(ActiveProject, slug=project_slug)
+    if not project.is_editable_by(request.user):
+        return JsonResponse({'detail': 'User is not authorized to edit the project at this moment.'}, status=403)
+
+    GCSUsageCache().invalidate(os.path.join(project.file_root(), ''))
+    return JsonResponse({})
+
+
+@login_required
+def create_chunked_upload(request, project_slug):
+    """
+    API endpoint to start uploading a file to a project's local storage
+    in chunks.
+
+    The request specifies the subdir, file_name and size of the file.
+    If the same user has already started uploading the same file, that
+    upload is resumed.  The response contains the URL of the upload
+    and the number of bytes that have already been received, after
+    which the client sends the remaining data to that URL as a series
+    of PATCH requests (see chunked_upload.)
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    if settings.SYSTEM_MAINTENANCE_NO_UPLOAD:
+        raise ServiceUnavailable()
+
+    queryset = ActiveProject.objects.all()
+    project = get_object_or_404(queryset, slug=project_slug)
+
+    if not project.is_editable_by(request.user):
+        return JsonResponse({'detail': 'User is not authorized to edit the project at this moment.'}, status=403)
+
+    if not project.files.can_upload_chunks():
+        return JsonResponse({'detail': 'Chunked uploads are not supported.'}, status=400)
+
+    form = forms.ChunkedUploadForm(user=request.user, project=project, data=request.POST)
+    if not form.is_valid():
+        return JsonResponse({'detail': [e for errors in form.errors.values() for e in errors]}, status=400)
+
+    upload, created = form.start_upload()
+    return JsonResponse(
+        {
+            'url': reverse('chunked_upload', args=(project.slug, upload.id)),
+            'offset': upload.offset,
+            'chunk_size': settings.CHUNKED_UPLOAD_SIZE,
+        },
+        status=(201 if created else 200),
+    )
+
+
+@login_required
+def chunked_upload(request, project_slug, upload_id):
+    """
+    API endpoint to continue or cancel a chunked upload.
+
+    - HEAD returns the number of bytes that have been received, in the
+      Upload-Offset header.
+
+    - PATCH appends the request body to the file.  The Upload-Offset
+      header must be equal to the number of bytes received so far, and
+      the body may be at most CHUNKED_UPLOAD_SIZE bytes.  When the last
+      chunk is received, the file is moved into the project directory.
+
+    - DELETE cancels the upload.
+    """
+    if settings.SYSTEM_MAINTENANCE_NO_UPLOAD:
+        raise ServiceUnavailable()
+
+    upload = get_object_or_404(ChunkedUpload, id=upload_id, project__slug=project_slug, user=request.user)
+    project = upload.project
+
+    if not project.is_editable_by(request.user):
+        return JsonResponse({'detail': 'User is not authorized to edit the project at this moment.'}, status=403)
+
+    if request.method == 'HEAD':
+        response = HttpResponse()
+    elif request.method == 'DELETE':
+        with transaction.atomic():
+            upload = ChunkedUpload.objects.select_for_update().filter(id=upload.id).first()
+            if upload is None:
+                raise Http404()
+            upload.discard()
+        return HttpResponse(status=204)
+    elif request.method == 'PATCH':
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.headers['Content-Length'])
+        except (KeyError, ValueError):
+            return JsonResponse({'detail': 'Upload-Offset and Content-Length are required.'}, status=400)
+        if length > settings.CHUNKED_UPLOAD_SIZE:
+            return JsonResponse({'detail': 'The chunk is too large.'}, status=413)
+
+        with transaction.atomic():
+            # The upload may have been completed or cancelled by
+            # another request while this one was waiting for the lock
+            upload = ChunkedUpload.objects.select_for_update().filter(id=upload.id).first()
+            if upload is None:
+                raise Http404()
+            if offset != upload.offset:
+                response = JsonResponse({'detail': 'The offset does not match the data received.'}, status=409)
+                response['Upload-Offset'] = upload.offset
+                return response
+            try:
+                upload.append(request, length)
+            except OSError as e:
+                if e.errno == errno.EDQUOT:
+                    detail = 'The file size cannot be greater than the remaining space.'
+                elif e.errno == errno.EFBIG:
+                    detail = 'The file is larger than the declared size.'
+                else:
+                    raise
+                return JsonResponse({'detail': detail}, status=413)
+
+            # The file is moved into place while the upload is still
+            # locked, so that it is only completed once
+            completed = upload.is_complete()
+            if completed:
+                try:
+                    upload.complete()
+                except FileExistsError:
+                    return JsonResponse(
+                        {'detail': 'Item named {} already exists'.format(os.path.basename(upload.path))}, status=409)
+
+        if completed:
+            project.content_modified()
+        response = HttpResponse(status=204)
+    else:
+        return HttpResponseNotAllowed(['HEAD', 'PATCH', 'DELETE'])
+
+    response['Upload-Offset'] = upload.offset
+    response['Upload-Length'] = upload.size
+    response['Cache-Control'] = 'no-store'
+    return response
@@ -0,0 +1,43 @@
+import functools
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+def default_search_backend():
+    """
+    Return the dotted path of the search backend used when
+    SEARCH_BACKEND is not set.
+
+    PostgreSQL full-text search is used if the database supports it;
+    otherwise, projects are searched using an in-process index.
+    """
+    if 'postgresql' in settings.DATABASES['default']['ENGINE']:
+        return 'search.backends.postgres.PostgresSearchBackend'
+    return 'search.backends.index.InvertedIndexSearchBackend'
+
+
+@functools.cache
+def get_search_backend():
+    """
+    Return the search backend for published projects.
+
+    The backend is chosen by the SEARCH_BACKEND setting, and is shared
+    by all requests handled by this process.
+    """
+    backend_class = import_string(settings.SEARCH_BACKEND or default_search_backend())
+    return backend_class()
+
+
+def invalidate_search_index():
+    """
+    Notify the search backend that published project metadata changed.
+
+    The backend is notified immediately, and again when the current
+    transaction (if any) is committed, so that other processes do not
+    keep an index built from data that was not yet visible to them.
+    """
+    backend = get_search_backend()
+    backend.invalidate()
+    transaction.on_commit(backend.invalidate)
@@ -0,0 +1,27 @@
+import abc
+
+
+class BaseSearchBackend(abc.ABC):
+    """Base class that defines how published projects are searched."""
+
+    @abc.abstractmethod
+    def search(self, resource_type, orderby, direction, search_term):
+        """
+        Return the latest versions of published projects of the given
+        resource types that match the search term.
+
+        Parameters
+        ----------
+        resource_type : list of resource type ids to include.
+        orderby : 'relevance' or a PublishedProject field name.
+        direction : 'asc' or 'desc'.
+        search_term : words to search for, separated by whitespace or
+            punctuation. If empty, all projects are returned.
+        """
+        raise NotImplementedError
+
+    def invalidate(self):
+        """
+        Discard any cached search data. Called whenever the title,
+        abstract, topics or versions of a published project change.
+        """
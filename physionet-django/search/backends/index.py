@@ -0,0 +1,232 @@
+import array
+import itertools
+import math
+import re
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.html import strip_tags
+from project.models import PublishedProject
+from search.backends.base import BaseSearchBackend
+
+# Relative weight of a term occurring in each field
+FIELD_WEIGHTS = {
+    'title': 3,
+    'topics': 2,
+    'abstract': 1,
+}
+
+# Cache key of the counter that is incremented whenever the index
+# needs to be rebuilt (kept in the shared cache, so that every process
+# sees it.)
+GENERATION_CACHE_KEY = 'search-index-generation'
+
+# Number of projects fetched at once when iterating over SearchResults
+RESULTS_CHUNK_SIZE = 100
+
+
+def tokenize(text):
+    """
+    Split text into lowercase words.
+    """
+    return re.findall(r'\w+', text.lower())
+
+
+class InvertedIndex:
+    """
+    In-memory inverted index of published project metadata.
+
+    Each term maps to a posting list, stored as an array of project
+    ids and a parallel array of field-weighted term frequencies.
+    Matching projects are scored using BM25.
+
+    Parameters
+    ----------
+    documents : iterable of (project_id, fields) pairs, where fields
+        is a dictionary mapping each FIELD_WEIGHTS key to its text.
+    """
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, documents):
+        postings = defaultdict(dict)
+        self.doc_lengths = {}
+
+        for project_id, fields in documents:
+            length = 0
+            for field, text in fields.items():
+                weight = FIELD_WEIGHTS[field]
+                tokens = tokenize(text)
+                length += weight * len(tokens)
+                for token in tokens:
+                    frequencies = postings[token]
+                    frequencies[project_id] = frequencies.get(project_id, 0) + weight
+            self.doc_lengths[project_id] = length
+
+        self.postings = {
+            term: (array.array('q', frequencies.keys()), array.array('f', frequencies.values()))
+            for term, frequencies in postings.items()
+        }
+        self.avg_length = (sum(self.doc_lengths.values()) / len(self.doc_lengths)) if self.doc_lengths else 0
+
+    @classmethod
+    def from_database(cls):
+        """
+        Build an index of the latest version of each published project.
+        """
+        projects = (PublishedProject.objects.filter(is_latest_version=True)
+                    .only('id', 'title', 'abstract').prefetch_related('topics'))
+        return cls(
+            (project.id, {
+                'title': project.title,
+                'topics': ' '.join(t.description for t in project.topics.all()),
+                'abstract': strip_tags(project.abstract),
+            })
+            for project in projects
+        )
+
+    def search(self, terms):
+        """
+        Return a dictionary mapping the id of each project that
+        matches any of the given terms to its relevance score.
+        """
+        count = len(self.doc_lengths)
+        scores = defaultdict(float)
+
+        for term in set(terms):
+            if term not in self.postings:
+                continue
+            project_ids, frequencies = self.postings[term]
+            idf = math.log(1 + (count - len(project_ids) + 0.5) / (len(project_ids) + 0.5))
+            for project_id, tf in zip(project_ids, frequencies):
+                norm = 1 - self.b + self.b * self.doc_lengths[project_id] / (self.avg_length or 1)
+                scores[project_id] += idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+
+        return dict(scores)
+
+
+class SearchResults(Sequence):
+    """
+    Published projects in the order of a list of project ids.
+
+    Projects are only loaded from the database when a slice of the
+    results (such as a page) is accessed, and each project is given a
+    `relevance` attribute.
+
+    Parameters
+    ----------
+    project_ids : list of project ids, in the order of the results.
+    scores : dictionary mapping project ids to relevance scores.
+    """
+    def __init__(self, project_ids, scores):
+        self.project_ids = project_ids
+        self.scores = scores
+
+    def __len__(self):
+        return len(self.project_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            project_ids = self.project_ids[index]
+        else:
+            project_ids = [self.project_ids[index]]
+
+        projects = PublishedProject.objects.in_bulk(project_ids)
+        results = []
+        for project_id in project_ids:
+            # A project could have been deleted since it was found
+            if project_id in projects:
+                project = projects[project_id]
+                project.relevance = self.scores.get(project_id, 0.0)
+                results.append(project)
+
+        if isinstance(index, slice):
+            return results
+        return results[0]
+
+    def __iter__(self):
+        for start in range(0, len(self), RESULTS_CHUNK_SIZE):
+            yield from self[start:start + RESULTS_CHUNK_SIZE]
+
+
+class InvertedIndexSearchBackend(BaseSearchBackend):
+    """
+    Search published projects using an InvertedIndex held in memory.
+
+    The index is built on the first search in each process, and
+    rebuilt after it is invalidated or after SEARCH_INDEX_MAX_AGE
+    seconds.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = None
+        self._generation = None
+        self._build_time = None
+
+    def invalidate(self):
+        with self._lock:
+            self._index = None
+        cache = caches['shared']
+        cache.add(GENERATION_CACHE_KEY, 0, timeout=None)
+        try:
+            cache.incr(GENERATION_CACHE_KEY)
+        except ValueError:
+            pass
+
+    def get_index(self):
+        """
+        Return the current index, rebuilding it if necessary.
+        """
+        generation = caches['shared'].get(GENERATION_CACHE_KEY)
+        with self._lock:
+            if (self._index is None or self._generation != generation
+                    or time.monotonic() - self._build_time > settings.SEARCH_INDEX_MAX_AGE):
+                self._index = InvertedIndex.from_database()
+                self._generation = generation
+                self._build_time = time.monotonic()
+            return self._index
+
+    def search(self, resource_type, orderby, direction, search_term):
+        """
+        Return a SearchResults sequence of the matching projects.
+
+        Only the ids (and the ordering field) of the published projects
+        are queried to find and sort the results; the projects
+        themselves are loaded a page at a time.
+        """
+        published_projects = PublishedProject.objects.filter(resource_type__in=resource_type,
+                                                             is_latest_version=True)
+
+        terms = tokenize(search_term)
+        scores = self.get_index().search(terms) if terms else {}
+
+        def matches(project_id):
+            return not terms or project_id in scores
+
+        # Sorting
+        direction = '-' if direction == 'desc' else ''
+        order_string = '{}{}'.format(direction, orderby)
+
+        if orderby == 'relevance':
+            project_ids = [project_id for project_id
+                           in published_projects.order_by('-publish_datetime').values_list('id', flat=True)
+                           if matches(project_id)]
+            # Stable sort: equally relevant projects remain newest first
+            project_ids.sort(key=lambda project_id: -scores.get(project_id, 0.0))
+        else:
+            rows = [(project_id, value) for project_id, value
+                    in published_projects.order_by(order_string, 'id').values_list('id', orderby)
+                    if matches(project_id)]
+            # Projects with the same value of the ordering field are
+            # sorted by relevance
+            project_ids = []
+            for _, group in itertools.groupby(rows, key=lambda row: row[1]):
+                group_ids = [project_id for project_id, _ in group]
+                group_ids.sort(key=lambda project_id: -scores.get(project_id, 0.0))
+                project_ids += group_ids
+
+        return SearchResults(project_ids, scores)
@@ -0,0 +1,43 @@
+import operator
+import re
+from functools import reduce
+
+from django.db.models import F, Q
+from project.models import PublishedProject
+from search.backends.base import BaseSearchBackend
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Search published projects using PostgreSQL full-text search.
+
+    Projects are ranked against the stored search vector (see
+    PublishedProject.update_search_vector.)
+    """
+    def search(self, resource_type, orderby, direction, search_term):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        # Split search term by whitespace or punctuation
+        if search_term:
+            search_terms = re.split(r'\s*[\;\,\s]\s*', re.escape(search_term))
+            search_queries = [SearchQuery(term) for term in search_terms]
+            search_query = reduce(operator.and_, search_queries)
+            query = Q(resource_type__in=resource_type) & Q(search_vector=search_query)
+        else:
+            search_query = SearchQuery('')
+            query = Q(resource_type__in=resource_type)
+
+        # Filter projects by latest version and annotate relevance field
+        published_projects = PublishedProject.objects.filter(query, is_latest_version=True).annotate(
+            relevance=SearchRank(F('search_vector'), search_query))
+
+        # Sorting
+        direction = '-' if direction == 'desc' else ''
+        order_string = '{}{}'.format(direction, orderby)
+
+        if orderby == 'relevance':
+            published_projects = published_projects.order_by('-relevance', '-publish_datetime')
+        else:
+            published_projects = published_projects.order_by(order_string, '-relevance')
+
+        return published_projects
@@ -1,7 +1,12 @@
+from unittest import skipIf
+
+from django.db import connection
 from django.test import TestCase
 from django.utils.html import escape
 from django.urls import reverse
 
+from project.models import PublishedProject
+
 
 class TestProjectSearch(TestCase):
     """
@@ -93,6 +98,25 @@ def test_search_database(self):
         response = self.client.get(url + '?orderby=asdfghjk')
         self.assertEqual(response.status_code, 200)
 
+    @skipIf(connection.vendor != 'postgresql', "full-text search requires PostgreSQL")
+    def test_search_topic_update(self):
+        """
+        Test that topic changes are reflected in the stored search vector.
+        """
+        url = reverse('content_index')
+        project = PublishedProject.objects.get(slug='demoecg', version='10.5.24')
+
+        response = self.client.get(url + '?topic=fnord')
+        self.assert_no_link(response, '/content/demoecg/10.5.24/')
+
+        project.add_topic('fnord')
+        response = self.client.get(url + '?topic=fnord')
+        self.assert_link(response, '/content/demoecg/10.5.24/')
+
+        project.remove_topic('fnord')
+        response = self.client.get(url + '?topic=fnord')
+        self.assert_no_link(response, '/content/demoecg/10.5.24/')
+
     def assert_link(self, response, url):
         """
         Assert that a response contains a link to a given URL.
@@ -1,3 +1,66 @@
 from django.test import TestCase
 
-# Create your tests here.
+from project.models import PublishedProject
+from search.backends.index import InvertedIndex, InvertedIndexSearchBackend
+
+
+class TestInvertedIndex(TestCase):
+    """
+    Tests for the in-process search index.
+    """
+
+    def test_scoring(self):
+        """
+        Test that matches are ranked by field weight and frequency.
+        """
+        index = InvertedIndex([
+            (1, {'title': 'Sleep apnea database', 'topics': '', 'abstract': 'Recordings.'}),
+            (2, {'title': 'ECG toolbox', 'topics': 'sleep', 'abstract': 'Software.'}),
+            (3, {'title': 'Gait data', 'topics': '', 'abstract': 'Recorded during <b>sleep</b>.'}),
+            (4, {'title': 'Unrelated', 'topics': '', 'abstract': 'Nothing here.'}),
+        ])
+
+        scores = index.search(['sleep'])
+        self.assertEqual(set(scores), {1, 2, 3})
+        self.assertGreater(scores[1], scores[2])
+        self.assertGreater(scores[2], scores[3])
+
+        scores = index.search(['sleep', 'apnea'])
+        self.assertEqual(max(scores, key=scores.get), 1)
+
+        self.assertEqual(index.search(['fnord']), {})
+        self.assertEqual(InvertedIndex([]).search(['sleep']), {})
+
+    def test_invalidate(self):
+        """
+        Test that the backend rebuilds its index after invalidation.
+        """
+        backend = InvertedIndexSearchBackend()
+        project = PublishedProject.objects.get(slug='demoecg', version='10.5.24')
+        results = backend.search([0, 1, 2, 3], 'relevance', 'desc', 'fnord')
+        self.assertEqual(list(results), [])
+
+        project.add_topic('fnord')
+        backend.invalidate()
+        results = backend.search([0, 1, 2, 3], 'relevance', 'desc', 'fnord')
+        self.assertEqual(list(results), [project])
+
+    def test_ordering(self):
+        """
+        Test that results are sorted by relevance or by a field, and
+        that only the requested page of projects is loaded.
+        """
+        backend = InvertedIndexSearchBackend()
+        backend.invalidate()
+        expected = list(PublishedProject.objects.filter(is_latest_version=True).order_by('title'))
+
+        results = backend.search([0, 1, 2, 3], 'title', 'asc', '')
+        self.assertEqual(list(results), expected)
+        with self.assertNumQueries(1):
+            self.assertEqual(results[1:3], expected[1:3])
+
+        results = backend.search([0, 1, 2, 3], 'relevance', 'desc', 'demo ecg')
+        relevance = [project.relevance for project in results]
+        self.assertTrue(results)
+        self.assertEqual(relevance, sorted(relevance, reverse=True))
+        self.assertGreater(relevance[-1], 0)
@@ -35,10 +35,18 @@
     path('content/<project_slug>/get-zip/<version>/',
         project_views.serve_published_project_zip,
         name='serve_published_project_zip'),
+    re_path(r'^content/(?P<project_slug>[\w\-]+)/get-zip/(?P<version>[\d\.]+)/(?P<subdir>.+)/$',
+            project_views.serve_published_project_subdir_zip,
+            name='serve_published_project_subdir_zip'),
     path(
         'content/<project_slug>/view-license/<version>/',
         project_views.published_project_license,
         name='published_project_license'),
+    path(
+        'content/<project_slug>/cite/<version>/<citation_format>/',
+        project_views.published_project_citation,
+        name='published_project_citation',
+    ),
     path(
         'content/<project_slug>/view-dua/<version>/',
         project_views.published_project_dua,
@@ -114,6 +122,8 @@
                                           'kMGQtJyOMC2RiuBdB0tIk9cx2NId8Thr')},
     'published_files_panel': {'_query_': {'subdir': 'doc'}},
     'published_project_subdir': {'subdir': 'doc'},
+    'published_project_citation': {'citation_format': 'bib'},
+    'serve_published_project_subdir_zip': {'subdir': 'doc'},
     'serve_published_project_file': {'full_file_name': 'Makefile'},
     'display_published_project_file': {'full_file_name': 'Makefile'},
 
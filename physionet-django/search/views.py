@@ -1,16 +1,12 @@
-import operator
 import pdb
-import re
-from functools import reduce
 
-from django.conf import settings
-from django.db.models import Case, Count, IntegerField, Q, Sum, Value, When
 from django.http import Http404
 from django.shortcuts import redirect, render, reverse
 from django.templatetags.static import static
 from physionet.utility import paginate
 from project.models import PublishedProject, PublishedTopic
 from search import forms
+from search.backends import get_search_backend
 
 
 def topic_search(request):
@@ -53,108 +49,7 @@ def get_content(resource_type, orderby, direction, search_term):
     """
     Helper function to get content shown on a resource listing page
     """
-    if 'postgresql' in settings.DATABASES['default']['ENGINE']:
-        published_projects = get_content_postgres_full_text_search(resource_type, orderby, direction, search_term)
-    else:
-        published_projects = get_content_normal_search(resource_type, orderby, direction, search_term)
-
-    return published_projects
-
-
-def get_content_postgres_full_text_search(resource_type, orderby, direction, search_term):
-    from django.contrib.postgres.search import (
-        SearchQuery,
-        SearchRank,
-        SearchVector,
-    )
-
-    # Split search term by whitespace or punctuation
-    if search_term:
-        search_terms = re.split(r'\s*[\;\,\s]\s*', re.escape(search_term))
-        search_queries = [SearchQuery(term) for term in search_terms]
-        search_query = reduce(operator.and_, search_queries)
-        query = Q(resource_type__in=resource_type) & Q(search=search_query)
-    else:
-        search_query = SearchQuery('')
-        query = Q(resource_type__in=resource_type)
-
-    vector = (SearchVector('title', weight='A') + SearchVector('abstract', weight='B')
-              + SearchVector('topics__description', weight='C'))
-
-    # Filter projects by latest version and annotate relevance field
-    published_projects = PublishedProject.objects.annotate(search=vector).filter(query, is_latest_version=True)
-
-    # get distinct projects with subquery and also include relevance from published_projects
-    published_projects = PublishedProject.objects.filter(id__in=published_projects.values('id')).annotate(
-        relevance=SearchRank(vector, search_query)).distinct()
-
-    # Sorting
-    direction = '-' if direction == 'desc' else ''
-    order_string = '{}{}'.format(direction, orderby)
-
-    if orderby == 'relevance':
-        published_projects = published_projects.order_by('-relevance', '-publish_datetime')
-    else:
-        published_projects = published_projects.order_by(order_string, '-relevance')
-
-    return published_projects
-
-
-def get_content_normal_search(resource_type, orderby, direction, search_term):
-    # Word boundary for different database engines
-    wb = r'\b'
-    if 'postgresql' in settings.DATABASES['default']['ENGINE']:
-        wb = r'\y'
-
-    # Build query for resource type and keyword filtering
-    if len(search_term) == 0:
-        query = Q(resource_type__in=resource_type)
-    else:
-        search_term = re.split(r'\s*[\;\,\s]\s*', re.escape(search_term))
-        query = reduce(operator.or_, (Q(topics__description__iregex=r'{0}{1}{0}'.format(wb,
-            item)) for item in search_term))
-        query = query | reduce(operator.or_, (Q(abstract__iregex=r'{0}{1}{0}'.format(wb,
-            item)) for item in search_term))
-        query = query | reduce(operator.or_, (Q(title__iregex=r'{0}{1}{0}'.format(wb,
-            item)) for item in search_term))
-        query = query & Q(resource_type__in=resource_type)
-    published_projects = (PublishedProject.objects
-        .filter(query, is_latest_version=True)
-        .annotate(relevance=Count('core_project_id'))
-        .annotate(has_keys=Value(0, IntegerField()))
-    )
-
-    # Relevance
-    for t in search_term:
-        published_projects = published_projects.annotate(
-            has_keys=Case(
-                When(title__iregex=r"{0}{1}{0}".format(wb, t), then=Value(3)),
-                default=Value(0),
-                output_field=IntegerField(),
-            )
-            + Case(
-                When(topics__description__iregex=r"{0}{1}{0}".format(wb, t), then=Value(2)),
-                default=Value(0),
-                output_field=IntegerField(),
-            )
-            + Case(
-                When(abstract__iregex=r"{0}{1}{0}".format(wb, t), then=Value(1)),
-                default=Value(0),
-                output_field=IntegerField(),
-            )
-        ).annotate(has_keys=Sum("has_keys"))
-
-
-    # Sorting
-    direction = '-' if direction == 'desc' else ''
-    order_string = '{}{}'.format(direction, orderby)
-    if orderby == 'relevance':
-        published_projects = published_projects.order_by(direction+'has_keys',
-            order_string, '-publish_datetime')
-    else:
-        published_projects = published_projects.order_by(order_string)
-
-    return published_projects
+    return get_search_backend().search(resource_type, orderby, direction, search_term)
 
 
 def content_index(request, resource_type=None):
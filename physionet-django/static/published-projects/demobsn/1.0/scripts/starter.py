@@ -0,0 +1 @@
+gogogo
@@ -0,0 +1,311 @@
+struct sigcolor {
+    char *color;
+    char *class;
+    char *name;
+} ctab[] = {
+"red", "ECG", "Abdomen_1",
+"red", "ECG", "Abdomen_2",
+"red", "ECG", "Abdomen_3",
+"red", "ECG", "Abdomen_4",
+"green", "Resp", "Abdomen   [ABMV]",
+"green", "Resp", "ABDO RES",
+"blue", "BP", "ABP",
+"blue", "BP", "ABP_1/2",
+"blue", "BP", "ABP_2/2",
+"blue", "BP", "ABPDias",
+"blue", "BP", "ABPMean",
+"blue", "BP", "ABPSys",
+"blue", "BP", "AOBP",
+"blue", "BP", "AOBP_1/2",
+"blue", "BP", "AOBP_2/2",
+"blue", "BP", "AOBP Dias",
+"blue", "BP", "AOBP Mean",
+"blue", "BP", "AOBP Sys",
+"blue", "BP", "NBP_1/2",
+"blue", "BP", "NBP_2/2",
+"blue", "BP", "NBP",
+"blue", "BP", "NBPDias",
+"blue", "BP", "NBPMean",
+"blue", "BP", "NBPSys",
+"blue", "BP", "ABP Dias",
+"blue", "BP", "ABP Mean",
+"blue", "BP", "ABP Sys",
+"blue", "BP", "NBP Dias",
+"blue", "BP", "NBP Mean",
+"blue", "BP", "NBP Sys",
+"blue", "BP", "ABP ",
+"red", "ECG", "A-I",
+"green", "Resp", "AIRFLOW",
+"blue", "BP", "ART",
+"blue", "BP", "ART_1/2",
+"blue", "BP", "ART Dias",
+"blue", "BP", "ART Mean",
+"blue", "BP", "ART Sys",
+"blue", "BP", "ART ",
+"blue", "BP", "ART 1",
+"blue", "BP", "ART1 ",
+"blue", "BP", "ART^M                 ",
+"red", "ECG", "A-S",
+"red", "ECG", "avf",
+"red", "ECG", "aVF",
+"red", "ECG", "AVF",
+"red", "ECG", "AVF+",
+"red", "ECG", "avl",
+"red", "ECG", "aVL",
+"red", "ECG", "AVL",
+"red", "ECG", "avr",
+"red", "ECG", "aVR",
+"red", "ECG", "AVR",
+"darkgreen", "Temp", "BLOODT",
+"darkgreen", "Temp", "BLOODT_1/3",
+"darkgreen", "Temp", "BLOODT_2/3",
+"darkgreen", "Temp", "BLOODT_3/3",
+"blue", "BP", "BP",
+"blue", "BP", " BP",
+"pink", "noise", "BW noise, signal 0",
+"pink", "noise", "BW noise, signal 1",
+"darkred", "CO", "CO",
+"darkred", "CO", "CO_1/2",
+"darkred", "CO", "CO_1/3",
+"darkred", "CO", "CO_2/2",
+"darkred", "CO", "CO_2/3",
+"darkred", "CO", "CO_3/3",
+"purple", "CO2", "C02",
+"blue", "BP", "CVP",
+"blue", "BP", "CVP_1/2",
+"blue", "BP", "CVP_1/3",
+"blue", "BP", "CVP_2/2",
+"blue", "BP", "CVP_2/3",
+"blue", "BP", "CVP_3/3",
+"red", "ECG", "CC5",
+"red", "ECG", "chan 1",
+"red", "ECG", "chan 2",
+"red", "ECG", "chan 3",
+"red", "ECG", "CM2",
+"red", "ECG", "CM4",
+"red", "ECG", "CM5",
+"purple", "CO2", "Co2",
+"purple", "CO2", "CO2",
+"purple", "CO2", "CO2^M ",
+"red", "ECG", "CS12",
+"red", "ECG", "CS34",
+"red", "ECG", "CS56",
+"red", "ECG", "CS78",
+"red", "ECG", "CS90",
+"blue", "BP", "CVP",
+"blue", "BP", "CVP 3",
+"red", "ECG", "D3",
+"red", "ECG", "D4",
+"red", "ECG", "ECG",
+"red", "ECG", " ECG",
+"red", "ECG", "ECG0",
+"red", "ECG", "ECG1",
+"red", "ECG", "ECG 1",
+"red", "ECG", "ECG 2",
+"red", "ECG", "ECG 3",
+"red", "ECG", "ECG AVF",
+"red", "ECG", "ECG       [ECG1]",
+"red", "ECG", "ECG F",
+"red", "ECG", "ECG I",
+"red", "ECG", "ECG II",
+"red", "ECG", "ECG III",
+"red", "ECG", "ECG lead 1",
+"red", "ECG", "ECG lead 2",
+"red", "ECG", "ECG lead 3",
+"red", "ECG", "ECG Lead AVF",
+"red", "ECG", "ECG lead AVL",
+"red", "ECG", "ECG lead I",
+"red", "ECG", "ECG Lead I",
+"red", "ECG", "ECG lead II",
+"red", "ECG", "ECG lead II ",
+"red", "ECG", "ECG LeadII",
+"red", "ECG", "ECG Lead II",
+"red", "ECG", "ECG lead III",
+"red", "ECG", "ECG Lead III",
+"red", "ECG", "ECG lead V",
+"red", "ECG", "ECG Lead V",
+"red", "ECG", "ECG Lead V ",
+"red", "ECG", "ECG Lead V3",
+"red", "ECG", "ECG Lead V4",
+"red", "ECG", "ECG lead V5",
+"red", "ECG", "ECG Lead V5",
+"red", "ECG", "ECG lead V6",
+"red", "ECG", "ECG MCL",
+"red", "ECG", "ECG signal 0",
+"red", "ECG", "ECG signal 1",
+"red", "ECG", "ECG V",
+"red", "ECG", "ECG V3",
+"red", "ECG", "ECG V Lead",
+"grey", "Annot", "EDF Annotations",
+"yellow", "EEG", "EEG",
+"yellow", "EEG", "EEG C3-A2 [C3A2]",
+"yellow", "EEG", "EEG (C3-O1)",
+"yellow", "EEG", "EEG (C4-A1)",
+"yellow", "EEG", "EEG C4-A1 [C4A1]",
+"yellow", "EEG", "EEG Fpz-Cz",
+"yellow", "EEG", "EEG (O2-A1)",
+"yellow", "EEG", "EEG Pz-Oz",
+"yellow", "EEG", "EEG(sec)",
+"orange", "EMG", "EMG",
+"orange", "EMG", "EMG-Chin  [EMYG]",
+"orange", "EMG", "EMG submental",
+"orange", "EMG", "EMG Submental",
+"pink", "noise", "EM noise, signal 0",
+"pink", "noise", "EM noise, signal 1",
+"lightblue", "EOG", "EOG",
+"lightblue", "EOG", "EOG E1-A1 [EOGL]",
+"lightblue", "EOG", "EOG E2-A1 [EOGR]",
+"lightblue", "EOG", "EOG horizontal",
+"lightblue", "EOG", "EOG(L)",
+"lightblue", "EOG", "EOG(R)",
+"lightblue", "EOG", "EOG (right)",
+"red", "ECG", "E-S",
+"grey", "Annot", "Event marker",
+"green", "Resp", "Flow      [AFLO]",
+"grey", "Annot", "Hypnogram",
+"red", "ECG", "i",
+"red", "ECG", "I",
+"red", "ECG", "I ",
+"red", "ECG", "I+",
+"blue", "BP", "ICP",
+"grey", "Annot", "ID+Sync+Error",
+"red", "ECG", "ii",
+"red", "ECG", "II",
+"red", "ECG", "II ",
+"red", "ECG", "II+",
+"red", "ECG", "iii",
+"red", "ECG", "III",
+"red", "ECG", "III ",
+"red", "ECG", "III+",
+"blue", "BP", "LAP",
+"red", "ECG", "lead I",
+"red", "ECG", "lead II",
+"red", "ECG", "lead V",
+"pink", "noise", "MA noise, signal 0",
+"pink", "noise", "MA noise, signal 1",
+"red", "ECG", "MCL1",
+"red", "ECG", "MCL1 ",
+"red", "ECG", "MCL1+",
+"red", "ECG", "ML2",
+"red", "ECG", "ML5",
+"red", "ECG", "MLI",
+"red", "ECG", "MLII",
+"red", "ECG", "MLIII",
+"red", "ECG", "mod.V1",
+"red", "ECG", "MV2",
+"red", "ECG", "MV2   ",
+"blue", "BP", "P1",
+"blue", "BP", "P1 Dias",
+"blue", "BP", "P1 Mean",
+"blue", "BP", "P1 Sys",
+"blue", "BP", "PA",
+"blue", "BP", "PAP",
+"blue", "BP", "PAP_1/2",
+"blue", "BP", "PAP_2/2",
+"blue", "BP", "PAP ",
+"blue", "BP", "PAP Dias",
+"blue", "BP", "PAP Mean",
+"blue", "BP", "PAP Sys",
+"blue", "BP", "PAP 2",
+"blue", "BP", "PAWP",
+"blue", "BP", "PAWP_1/2",
+"blue", "BP", "PAWP_1/3",
+"blue", "BP", "PAWP_2/2",
+"blue", "BP", "PAWP_2/3",
+"blue", "BP", "PAWP_3/3",
+"darkblue", "PLETH", "PLETH",
+"darkblue", "PLETH", "PLETH ",
+"grey", "Pos", "Position",
+"orangered", "HR", "HR",
+"orangered", "HR", "HR_1/2",
+"orangered", "HR", "HR_1/3",
+"orangered", "HR", "HR_2/2",
+"orangered", "HR", "HR_2/3",
+"orangered", "HR", "HR_3/3",
+"orangered", "HR", "PR",
+"blue", "BP", "Pressure",
+"blue", "BP", "Pressure ",
+"blue", "BP", "Pressure1",
+"blue", "BP", "Pressure 1",
+"blue", "BP", "Pressure 2",
+"blue", "BP", "Pressure 3",
+"blue", "BP", "Pressure 4",
+"orangered", "HR", "Pulse",
+"orangered", "HR", "PULSE",
+"orangered", "HR", "PULSE_1/2",
+"orangered", "HR", "PULSE_1/3",
+"orangered", "HR", "PULSE_2/2",
+"orangered", "HR", "PULSE_2/3",
+"orangered", "HR", "PULSE_3/3",
+"orangered", "HR", "PVC Rate per Minute",
+"orangered", "HR", "PVC Rate per Minute_1/2",
+"orangered", "HR", "PVC Rate per Minute_1/3",
+"orangered", "HR", "PVC Rate per Minute_2/3",
+"orangered", "HR", "PVC Rate per Minute_3/3",
+"blue", "BP", "RAP",
+"green", "Resp", "RESP",
+"green", "Resp", "RESP_1/2",
+"green", "Resp", "RESP_1/3",
+"green", "Resp", "RESP_2/2",
+"green", "Resp", "RESP_2/3",
+"green", "Resp", "RESP_3/3",
+"green", "Resp", " RESP",
+"green", "Resp", "RESP ",
+"green", "Resp", "Resp A",
+"green", "Resp", "Resp (abdomen)",
+"green", "Resp", "Resp (abdominal)",
+"green", "Resp", "Resp C",
+"green", "Resp", "Resp (chest)",
+"green", "Resp", "Resp Imp",
+"green", "Resp", "Resp. Imp.",
+"green", "Resp", "Resp.Imp.",
+"green", "Resp", "RESP IMP",
+"green", "Resp", "Resp Inp.",
+"green", "Resp", "Resp N",
+"green", "Resp", "Resp (nasal)",
+"green", "Resp", "Resp oro-nasal",
+"green", "Resp", "Resp (sum)",
+"darkred", "O2", "SaO2",
+"darkred", "O2", "SaO2      [OSAT]",
+"darkred", "O2", "SO2",
+"grey", "Sound", "Sound",
+"darkred", "O2", "SpO2",
+"darkred", "O2", "SpO2_1/2",
+"darkred", "O2", "SpO2_1/3",
+"darkred", "O2", "SpO2_2/2",
+"darkred", "O2", "SpO2_2/3",
+"darkred", "O2", "SpO2_3/3",
+"green", "Resp", "Sum",
+"magenta", "SV", "SV",
+"darkgreen", "Temp", "Temp body",
+"green", "Resp", "Thorax_1",
+"green", "Resp", "Thorax_2",
+"green", "Resp", "Thorax    [CHMV]",
+"green", "Resp", "THOR RES",
+"blue", "BP", "UAP",
+"blue", "BP", "UAP Dias",
+"blue", "BP", "UAP Mean",
+"blue", "BP", "UAP Sys",
+"red", "ECG", "V",
+"red", "ECG", "V ",
+"red", "ECG", "V+",
+"red", "ECG", "v1",
+"red", "ECG", "V1",
+"red", "ECG", "V1-V2",
+"red", "ECG", "v2",
+"red", "ECG", "V2",
+"red", "ECG", "V2-V3",
+"red", "ECG", "v3",
+"red", "ECG", "V3",
+"red", "ECG", "v4",
+"red", "ECG", "V4",
+"red", "ECG", "V4-V5",
+"red", "ECG", "v5",
+"red", "ECG", "V5",
+"red", "ECG", "v6",
+"red", "ECG", "V6",
+"red", "ECG", "vx",
+"red", "ECG", "vy",
+"red", "ECG", "vz",
+NULL,   NULL,   NULL
+};
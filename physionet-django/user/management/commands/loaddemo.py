@@ -14,6 +14,7 @@
 from django.conf import settings
 from django.core.management import call_command
 from django.core.management.base import BaseCommand
+from django.db import connection
 from lightwave.views import DBCAL_FILE, ORIGINAL_DBCAL_FILE
 from physionet.utility import get_project_apps
 
@@ -64,6 +65,10 @@ def handle(self, *args, **options):
         demo_fixtures = find_demo_fixtures(project_apps)
         call_command('loaddata', *demo_fixtures, verbosity=1)
 
+        # Fixtures do not include the derived full-text search vectors
+        if connection.vendor == 'postgresql':
+            call_command('update_search_vectors', verbosity=0)
+
         # Copy the demo media and static content
         copy_demo_media()
         copy_demo_static()
@@ -0,0 +1,32 @@
+# Generated by Django 4.1.13 on 2026-10-18 04:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0057_alter_cloudinformation_aws_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DownloadToken',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token_hash', models.CharField(max_length=64, unique=True)),
+                ('creation_datetime', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.OneToOneField(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='download_token',
+                    to=settings.AUTH_USER_MODEL,
+                )),
+            ],
+            options={
+                'default_permissions': (),
+            },
+        ),
+    ]
@@ -1,5 +1,7 @@
+import hashlib
 import logging
 import os
+import secrets
 from datetime import timedelta
 
 from django.utils.crypto import get_random_string
@@ -1230,6 +1232,61 @@ class Meta:
         default_permissions = ()
 
 
+class DownloadToken(models.Model):
+    """
+    A secret token that a user may give, in place of their password,
+    when downloading files with HTTP authentication (for example,
+    using wget.)  Each user may have at most one token.
+
+    Only a hash of the token is stored.
+    """
+    user = models.OneToOneField('user.User', related_name='download_token',
+                                on_delete=models.CASCADE)
+    token_hash = models.CharField(max_length=64, unique=True)
+    creation_datetime = models.DateTimeField(default=timezone.now)
+
+    # All tokens start with this string, so that they can be told
+    # apart from passwords
+    PREFIX = 'dlt_'
+
+    class Meta:
+        default_permissions = ()
+
+    @staticmethod
+    def hash_token(token):
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    @classmethod
+    def generate(cls, user):
+        """
+        Create a new token for the user, replacing any existing token.
+
+        Returns the token, which cannot be retrieved later.
+        """
+        token = cls.PREFIX + secrets.token_urlsafe(32)
+        cls.objects.update_or_create(user=user, defaults={
+            'token_hash': cls.hash_token(token),
+            'creation_datetime': timezone.now(),
+        })
+        return token
+
+    @classmethod
+    def authenticate(cls, username, token):
+        """
+        Return the active user with the given username (or email
+        address) and download token, or None.
+        """
+        if not token.startswith(cls.PREFIX):
+            return None
+        if '@' in username:
+            users = Q(user__email=username.lower())
+        else:
+            users = Q(user__username=username.lower())
+        download_token = cls.objects.filter(users, token_hash=cls.hash_token(token),
+                                            user__is_active=True).select_related('user').first()
+        return download_token.user if download_token else None
+
+
 class CodeOfConduct(models.Model):
     name = models.CharField(max_length=100)
     slug = models.SlugField(max_length=120, unique=True)
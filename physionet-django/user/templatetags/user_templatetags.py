@@ -6,7 +6,7 @@
 
 @register.inclusion_tag('user/settings_tabs.html')
 def settings_tabs(hide_password_settings: bool):
-    default_tabs = ['Profile', 'Emails', 'Username', 'Cloud', 'ORCID', 'Credentialing', 'Training',
+    default_tabs = ['Profile', 'Emails', 'Username', 'Cloud', 'Downloads', 'ORCID', 'Credentialing', 'Training',
                     'Certification', 'Agreements']
     if not hide_password_settings:
         default_tabs.insert(1, 'Password')
@@ -15,6 +15,7 @@
     path("settings/emails/", views.edit_emails, name="edit_emails"),
     path("settings/username/", views.edit_username, name="edit_username"),
     path("settings/cloud/", views.edit_cloud, name="edit_cloud"),
+    path("settings/downloads/", views.edit_downloads, name="edit_downloads"),
     path("settings/orcid/", views.edit_orcid, name="edit_orcid"),
     path("authorcid/", views.auth_orcid, name="auth_orcid"),
     path(
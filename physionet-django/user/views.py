@@ -52,6 +52,7 @@
     CodeOfConductSignature,
     CloudInformation,
     CredentialApplication,
+    DownloadToken,
     LegacyCredential,
     Orcid,
     User,
@@ -852,7 +853,7 @@ def training_report(request, training_id):
     if settings.STORAGE_TYPE == StorageTypes.GCP:
         return redirect(training.completion_report.url)
 
-    return utility.serve_file(training.completion_report.path, attach=False)
+    return utility.serve_file(training.completion_report.path, attach=False, request=request)
 
 
 # TODO: remove this after 30 days of commit merge, we want let the old links that was sent to the referees work
@@ -940,6 +941,27 @@ def edit_cloud(request):
 
     return render(request, 'user/edit_cloud.html', {'form':form, 'user':user})
 
+
+@login_required
+def edit_downloads(request):
+    """
+    Page to create or revoke the user's download token.
+    """
+    user = request.user
+    token = None
+    if request.method == 'POST':
+        if 'generate_token' in request.POST:
+            token = DownloadToken.generate(user)
+            messages.success(request, 'A new download token has been created. Any previous token no longer works.')
+        elif 'revoke_token' in request.POST:
+            DownloadToken.objects.filter(user=user).delete()
+            messages.success(request, 'Your download token has been revoked.')
+
+    download_token = DownloadToken.objects.filter(user=user).first()
+    return render(request, 'user/edit_downloads.html',
+                  {'user': user, 'download_token': download_token, 'token': token})
+
+
 @login_required
 def view_agreements(request):
     """